@@ -1,9 +1,9 @@
-"""
-ASGI config for config project.
-"""
-import os
-from django.core.asgi import get_asgi_application
-
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
-
+"""
+ASGI config for config project.
+"""
+import os
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+
 application = get_asgi_application()
\ No newline at end of file
@@ -1,4 +1,4 @@
-"""
-Application Django pour la gestion des réservations de salles
-"""
+"""
+Application Django pour la gestion des réservations de salles
+"""
 default_app_config = 'reservations.apps.ReservationsConfig'
\ No newline at end of file
@@ -1,117 +1,160 @@
-"""
-Configuration de l'interface d'administration Django
-"""
-from django.contrib import admin
-from django.contrib.auth.admin import UserAdmin
-from .models import Utilisateur, Salle, Reservation, Notification, Rapport
-
-
-@admin.register(Utilisateur)
-class UtilisateurAdmin(UserAdmin):
-    """Administration personnalisée pour Utilisateur"""
-    list_display = ['username', 'email', 'first_name', 'last_name', 'type_utilisateur', 'is_active']
-    list_filter = ['type_utilisateur', 'is_active', 'is_staff']
-    search_fields = ['username', 'email', 'first_name', 'last_name']
-    
-    fieldsets = UserAdmin.fieldsets + (
-        ('Informations supplémentaires', {
-            'fields': ('type_utilisateur', 'niveau', 'departement')
-        }),
-    )
-    
-    add_fieldsets = UserAdmin.add_fieldsets + (
-        ('Informations supplémentaires', {
-            'fields': ('type_utilisateur', 'niveau', 'departement')
-        }),
-    )
-
-
-@admin.register(Salle)
-class SalleAdmin(admin.ModelAdmin):
-    """Administration pour Salle"""
-    list_display = ['nom', 'batiment', 'etage', 'capacite', 'type_salle', 'est_disponible']
-    list_filter = ['type_salle', 'batiment', 'est_disponible']
-    search_fields = ['nom', 'batiment']
-    list_editable = ['est_disponible']
-    
-    fieldsets = (
-        ('Informations générales', {
-            'fields': ('nom', 'batiment', 'etage', 'capacite', 'type_salle')
-        }),
-        ('Équipements et description', {
-            'fields': ('equipements', 'description')
-        }),
-        ('Disponibilité', {
-            'fields': ('est_disponible',)
-        }),
-    )
-
-
-@admin.register(Reservation)
-class ReservationAdmin(admin.ModelAdmin):
-    """Administration pour Reservation"""
-    list_display = ['salle', 'utilisateur', 'date_reservation', 'heure_debut', 'heure_fin', 'statut', 'created_at']
-    list_filter = ['statut', 'date_reservation', 'created_at']
-    search_fields = ['salle__nom', 'utilisateur__username', 'motif']
-    date_hierarchy = 'date_reservation'
-    
-    fieldsets = (
-        ('Informations principales', {
-            'fields': ('utilisateur', 'salle', 'statut')
-        }),
-        ('Créneau', {
-            'fields': ('date_reservation', 'heure_debut', 'heure_fin')
-        }),
-        ('Détails', {
-            'fields': ('motif', 'nombre_participants')
-        }),
-    )
-    
-    readonly_fields = ['created_at', 'updated_at']
-    
-    actions = ['valider_reservations', 'refuser_reservations']
-    
-    def valider_reservations(self, request, queryset):
-        """Action pour valider plusieurs réservations"""
-        count = 0
-        for reservation in queryset:
-            if reservation.statut == 'en_attente':
-                reservation.valider()
-                count += 1
-        self.message_user(request, f"{count} réservation(s) validée(s)")
-    valider_reservations.short_description = "Valider les réservations sélectionnées"
-    
-    def refuser_reservations(self, request, queryset):
-        """Action pour refuser plusieurs réservations"""
-        count = 0
-        for reservation in queryset:
-            if reservation.statut == 'en_attente':
-                reservation.refuser()
-                count += 1
-        self.message_user(request, f"{count} réservation(s) refusée(s)")
-    refuser_reservations.short_description = "Refuser les réservations sélectionnées"
-
-
-@admin.register(Notification)
-class NotificationAdmin(admin.ModelAdmin):
-    """Administration pour Notification"""
-    list_display = ['utilisateur', 'type_notification', 'message_court', 'created_at', 'est_lue']
-    list_filter = ['type_notification', 'est_lue', 'created_at']
-    search_fields = ['utilisateur__username', 'message']
-    date_hierarchy = 'created_at'
-    
-    def message_court(self, obj):
-        """Affiche un message court"""
-        return obj.message[:50] + '...' if len(obj.message) > 50 else obj.message
-    message_court.short_description = 'Message'
-
-
-@admin.register(Rapport)
-class RapportAdmin(admin.ModelAdmin):
-    """Administration pour Rapport"""
-    list_display = ['titre', 'type_rapport', 'date_debut', 'date_fin', 'created_at']
-    list_filter = ['type_rapport', 'created_at']
-    search_fields = ['titre']
-    date_hierarchy = 'created_at'
-    
+"""
+Configuration de l'interface d'administration Django
+"""
+from django.contrib import admin, messages
+from django.contrib.auth.admin import UserAdmin
+from django.db.models import Q
+from .models import Utilisateur, Salle, Reservation, SerieReservation, Notification, Rapport
+from . import transitions, recherche
+
+
+class RechercheTexteMixin:
+    """
+    Recherche de la liste par l'index plein texte (voir recherche.py) au lieu
+    d'un icontains par champ de search_fields
+    """
+    # Index plein texte du modèle administré
+    index_recherche = None
+    # Relations cherchées dans l'index de leur modèle : {champ: index}
+    index_lies = {}
+    # Champs égaux au texte entier, sans tenir compte de la casse
+    champs_exacts = ()
+    
+    def filtre_recherche(self, texte):
+        """Lignes correspondant au texte dans l'index, par une relation indexée ou un champ exact"""
+        filtre = recherche.filtre(self.index_recherche, texte)
+        for champ, index in self.index_lies.items():
+            lies = index.modele.objects.filter(recherche.filtre(index, texte)).values('pk')
+            filtre |= Q(**{f'{champ}__in': lies})
+        for champ in self.champs_exacts:
+            filtre |= Q(**{f'{champ}__iexact': texte.strip()})
+        return filtre
+    
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term.strip():
+            return super().get_search_results(request, queryset, search_term)
+        return queryset.filter(self.filtre_recherche(search_term)), False
+
+
+@admin.register(Utilisateur)
+class UtilisateurAdmin(UserAdmin):
+    """Administration personnalisée pour Utilisateur"""
+    list_display = ['username', 'email', 'first_name', 'last_name', 'type_utilisateur', 'is_active']
+    list_filter = ['type_utilisateur', 'is_active', 'is_staff']
+    search_fields = ['username', 'email', 'first_name', 'last_name']
+    
+    fieldsets = UserAdmin.fieldsets + (
+        ('Informations supplémentaires', {
+            'fields': ('type_utilisateur', 'niveau', 'departement')
+        }),
+    )
+    
+    add_fieldsets = UserAdmin.add_fieldsets + (
+        ('Informations supplémentaires', {
+            'fields': ('type_utilisateur', 'niveau', 'departement')
+        }),
+    )
+
+
+@admin.register(Salle)
+class SalleAdmin(RechercheTexteMixin, admin.ModelAdmin):
+    """Administration pour Salle"""
+    list_display = ['nom', 'batiment', 'etage', 'capacite', 'type_salle', 'est_disponible']
+    list_filter = ['type_salle', 'batiment', 'est_disponible']
+    search_fields = ['nom', 'batiment', 'description']
+    list_editable = ['est_disponible']
+    index_recherche = recherche.SALLES
+    
+    fieldsets = (
+        ('Informations générales', {
+            'fields': ('nom', 'batiment', 'etage', 'capacite', 'type_salle')
+        }),
+        ('Équipements et description', {
+            'fields': ('equipements', 'description')
+        }),
+        ('Disponibilité', {
+            'fields': ('est_disponible',)
+        }),
+    )
+
+
+@admin.register(Reservation)
+class ReservationAdmin(RechercheTexteMixin, admin.ModelAdmin):
+    """Administration pour Reservation"""
+    list_display = ['salle', 'utilisateur', 'date_reservation', 'heure_debut', 'heure_fin', 'statut', 'created_at']
+    list_filter = ['statut', 'date_reservation', 'created_at']
+    search_fields = ['salle__nom', 'utilisateur__username', 'motif']
+    date_hierarchy = 'date_reservation'
+    # Motif ou salle correspondant au texte, ou identifiant exact de l'utilisateur
+    index_recherche = recherche.RESERVATIONS
+    index_lies = {'salle': recherche.SALLES}
+    champs_exacts = ('utilisateur__username',)
+    
+    fieldsets = (
+        ('Informations principales', {
+            'fields': ('utilisateur', 'salle', 'statut')
+        }),
+        ('Créneau', {
+            'fields': ('date_reservation', 'heure_debut', 'heure_fin')
+        }),
+        ('Détails', {
+            'fields': ('motif', 'nombre_participants')
+        }),
+    )
+    
+    readonly_fields = ['created_at', 'updated_at']
+    
+    actions = ['valider_reservations', 'refuser_reservations']
+    
+    def valider_reservations(self, request, queryset):
+        """Action pour valider plusieurs réservations"""
+        validees, rejets = transitions.valider_reservations(queryset.values_list('pk', flat=True))
+        self.message_user(request, f"{len(validees)} réservation(s) validée(s)")
+        if rejets:
+            self.message_user(
+                request,
+                f"{len(rejets)} réservation(s) laissée(s) en attente (conflit ou date passée)",
+                messages.WARNING
+            )
+    valider_reservations.short_description = "Valider les réservations sélectionnées"
+    
+    def refuser_reservations(self, request, queryset):
+        """Action pour refuser plusieurs réservations"""
+        refusees = transitions.refuser_reservations(queryset.values_list('pk', flat=True))
+        self.message_user(request, f"{len(refusees)} réservation(s) refusée(s)")
+    refuser_reservations.short_description = "Refuser les réservations sélectionnées"
+
+
+@admin.register(SerieReservation)
+class SerieReservationAdmin(admin.ModelAdmin):
+    """Administration pour SerieReservation"""
+    list_display = ['salle', 'utilisateur', 'frequence', 'date_debut', 'date_fin', 'heure_debut', 'heure_fin']
+    list_filter = ['frequence', 'date_debut']
+    search_fields = ['salle__nom', 'utilisateur__username', 'motif']
+    
+    readonly_fields = ['created_at']
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    """Administration pour Notification"""
+    list_display = ['utilisateur', 'type_notification', 'message_court', 'created_at', 'est_lue']
+    list_filter = ['type_notification', 'est_lue', 'created_at']
+    search_fields = ['utilisateur__username', 'message']
+    date_hierarchy = 'created_at'
+    
+    def message_court(self, obj):
+        """Affiche un message court"""
+        return obj.message[:50] + '...' if len(obj.message) > 50 else obj.message
+    message_court.short_description = 'Message'
+
+
+@admin.register(Rapport)
+class RapportAdmin(admin.ModelAdmin):
+    """Administration pour Rapport"""
+    list_display = ['titre', 'type_rapport', 'date_debut', 'date_fin', 'created_at']
+    list_filter = ['type_rapport', 'created_at']
+    search_fields = ['titre']
+    date_hierarchy = 'created_at'
+    
     readonly_fields = ['created_at']
\ No newline at end of file
@@ -0,0 +1,191 @@
+"""
+API JSON en lecture seule (salles, disponibilités, recherche)
+
+Les réponses portent un ETag et un Last-Modified calculés à partir de la
+dernière modification des salles et des réservations : un client qui
+interroge en boucle (emplois du temps, écrans d'accueil) reçoit un 304
+sans que la réponse soit recalculée tant que rien n'a changé. Les réponses
+qui dépendent aussi de l'heure (créneaux libres du jour) changent en plus de
+version à chaque quart d'heure.
+"""
+import functools
+import hashlib
+from datetime import timedelta
+
+from django.contrib.auth.decorators import login_required
+from django.db.models import Max
+from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_GET
+
+from .compteurs import lire_compteurs
+from .disponibilite import creneaux_libres, debut_recherche
+from .forms import RechercheForm, CreneauxLibresForm
+from .models import Salle, Reservation, Compteur
+
+
+# Compteurs dont les variations signalent des créations/suppressions
+CLES_COMPTEURS = ('reservations', 'salles')
+
+CHAMPS_SALLE = ('id', 'nom', 'batiment', 'etage', 'capacite', 'type_salle', 'equipements', 'est_disponible')
+
+
+def _version(request):
+    """
+    Dernière modification et ETag des données, calculés une fois par requête
+
+    Les dates de mise à jour des lignes ne voient pas les suppressions : les
+    compteurs de salles et de réservations (valeur et date de dernière
+    variation) entrent donc aussi dans la version.
+    """
+    if not hasattr(request, '_version_api'):
+        maj_reservations = Reservation.objects.aggregate(maj=Max('updated_at'))['maj']
+        maj_salles = Salle.objects.aggregate(maj=Max('updated_at'))['maj']
+        compteurs = list(
+            Compteur.objects.filter(cle__in=CLES_COMPTEURS).order_by('cle').values_list('cle', 'valeur', 'updated_at')
+        )
+        if len(compteurs) < len(CLES_COMPTEURS):
+            # Première utilisation : les créer, puis les relire
+            lire_compteurs()
+            compteurs = list(
+                Compteur.objects.filter(cle__in=CLES_COMPTEURS).order_by('cle').values_list('cle', 'valeur', 'updated_at')
+            )
+        dates = [maj for maj in (maj_reservations, maj_salles) if maj]
+        dates += [maj for _, _, maj in compteurs]
+        empreinte = repr((maj_reservations, maj_salles, compteurs))
+        request._version_api = (
+            max(dates) if dates else None,
+            hashlib.md5(empreinte.encode()).hexdigest(),
+        )
+    return request._version_api
+
+
+def _version_horaire(request):
+    """
+    Version des réponses qui dépendent aussi de l'heure courante
+
+    Les créneaux libres du jour commencent au quart d'heure suivant
+    (debut_recherche) : la période en cours entre dans l'ETag, et son début
+    dans Last-Modified, pour qu'un client en boucle ne garde pas des
+    créneaux déjà passés.
+    """
+    if not hasattr(request, '_version_api_horaire'):
+        derniere, etag = _version(request)
+        maintenant = timezone.localtime()
+        periode = debut_recherche(maintenant)
+        # La période a commencé à la première minute qui donne le même quart d'heure
+        minutes = maintenant.hour * 60 + maintenant.minute - max(periode[1] - 14, 0)
+        debut = maintenant.replace(second=0, microsecond=0) - timedelta(minutes=minutes)
+        request._version_api_horaire = (
+            max(derniere, debut) if derniere else debut,
+            hashlib.md5(repr((etag, periode)).encode()).hexdigest(),
+        )
+    return request._version_api_horaire
+
+
+def reponse_json(donnees, status=200):
+    """JsonResponse compacte (sans espaces ni échappement des accents)"""
+    return JsonResponse(
+        donnees, status=status, safe=False,
+        json_dumps_params={'separators': (',', ':'), 'ensure_ascii': False}
+    )
+
+
+def api_conditionnelle(vue=None, horaire=False):
+    """
+    Vue GET authentifiée avec ETag/Last-Modified et réponses 304
+
+    Args:
+        horaire: La réponse dépend aussi de l'heure courante (voir _version_horaire)
+    """
+    if vue is None:
+        return functools.partial(api_conditionnelle, horaire=horaire)
+    version = _version_horaire if horaire else _version
+    vue = condition(
+        etag_func=lambda request, *args, **kwargs: version(request)[1],
+        last_modified_func=lambda request, *args, **kwargs: version(request)[0],
+    )(vue)
+    vue = cache_control(private=True, no_cache=True)(vue)
+    return login_required(require_GET(vue))
+
+
+def _heure(heure):
+    return heure.strftime('%H:%M')
+
+
+@api_conditionnelle
+def api_salles(request):
+    """Liste des salles"""
+    salles = Salle.objects.order_by('batiment', 'nom').values_list(*CHAMPS_SALLE)
+    return reponse_json({
+        'champs': CHAMPS_SALLE,
+        'salles': list(salles),
+    })
+
+
+@api_conditionnelle(horaire=True)
+def api_disponibilites_salle(request, pk):
+    """
+    Occupation et créneaux libres d'une salle sur une période
+
+    Paramètres : date_debut, date_fin (31 jours au plus), duree (minutes,
+    durée minimale d'un créneau libre, 30 par défaut).
+    """
+    salle = get_object_or_404(Salle, pk=pk)
+    donnees = request.GET.copy()
+    donnees.setdefault('duree', str(Reservation.DUREE_MIN))
+    form = CreneauxLibresForm(donnees)
+    if not form.is_valid():
+        return reponse_json({'erreurs': form.errors}, status=400)
+
+    date_debut = form.cleaned_data['date_debut']
+    date_fin = form.cleaned_data['date_fin']
+
+    occupe = {}
+    reservations = Reservation.objects.actives().filter(
+        salle=salle,
+        date_reservation__gte=date_debut,
+        date_reservation__lte=date_fin
+    ).order_by('date_reservation', 'heure_debut').values_list(
+        'date_reservation', 'heure_debut', 'heure_fin', 'statut'
+    )
+    for jour, debut, fin, statut in reservations:
+        occupe.setdefault(jour.isoformat(), []).append([_heure(debut), _heure(fin), statut])
+
+    libre = {}
+    for resultat in creneaux_libres(
+        date_debut, date_fin, form.cleaned_data['duree'], salles=Salle.objects.filter(pk=salle.pk)
+    ):
+        for creneau in resultat['creneaux']:
+            libre.setdefault(creneau.date.isoformat(), []).append(
+                [_heure(creneau.heure_debut), _heure(creneau.heure_fin)]
+            )
+
+    return reponse_json({
+        'salle': salle.pk,
+        'date_debut': date_debut.isoformat(),
+        'date_fin': date_fin.isoformat(),
+        'occupe': occupe,
+        'libre': libre,
+    })
+
+
+@api_conditionnelle
+def api_recherche(request):
+    """
+    Salles libres sur un créneau
+
+    Paramètres : ceux de RechercheForm (date_reservation, heure_debut,
+    heure_fin, capacite_min, type_salle, batiment).
+    """
+    form = RechercheForm(request.GET)
+    if not form.is_valid():
+        return reponse_json({'erreurs': form.errors}, status=400)
+
+    salles = form.salles_disponibles().order_by('batiment', 'nom').values_list(*CHAMPS_SALLE)
+    return reponse_json({
+        'champs': CHAMPS_SALLE,
+        'salles': list(salles),
+    })
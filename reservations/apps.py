@@ -1,14 +1,19 @@
-"""
-Configuration de l'application reservations
-"""
-from django.apps import AppConfig
-
-
-class ReservationsConfig(AppConfig):
-    default_auto_field = 'django.db.models.BigAutoField'
-    name = 'reservations'
-    verbose_name = "Gestion des Réservations"
-    
-    def ready(self):
-        """Importer les signaux quand l'app est prête"""
-        import reservations.signals
\ No newline at end of file
+"""
+Configuration de l'application reservations
+"""
+from django.apps import AppConfig
+
+
+class ReservationsConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'reservations'
+    verbose_name = "Gestion des Réservations"
+    
+    def ready(self):
+        """Importer les signaux quand l'app est prête"""
+        import reservations.signals
+        
+        # Index plein texte (SQLite) : tables et triggers recréés au besoin
+        from django.db.models.signals import post_migrate
+        from .recherche import installer_apres_migration
+        post_migrate.connect(installer_apres_migration, sender=self)
\ No newline at end of file
@@ -0,0 +1,255 @@
+"""
+Banc d'essai des chemins critiques (recherche, tableaux de bord, rapports,
+création de réservation, vérification de disponibilité)
+
+Chaque scénario est joué plusieurs fois, à travers le client de test de
+Django (middlewares, sessions et gabarits compris), sur la base
+configurée : de préférence un campus généré par generer_campus. Les
+durées et le nombre de requêtes SQL sont écrits en JSON pour comparer deux
+versions du code sur les mêmes données.
+
+Les réservations et rapports créés pendant la mesure sont supprimés à la fin.
+"""
+import json
+import platform
+import random
+import time
+from collections import namedtuple
+from datetime import date, time as heure, timedelta
+
+import django
+import numpy as np
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .campus import MATIERES
+from .models import Utilisateur, Salle, Reservation, Rapport
+
+
+Scenario = namedtuple('Scenario', ['nom', 'role', 'jouer'])
+
+# Motif des réservations créées par le banc d'essai (supprimées à la fin)
+MOTIF = "Banc d'essai"
+
+# Ratio de durée médiane au-delà duquel une différence est signalée
+SEUIL = 1.2
+
+
+class _Compteur:
+    """execute_wrapper : compte les requêtes SQL"""
+
+    def __init__(self):
+        self.requetes = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.requetes += 1
+        return execute(sql, params, many, context)
+
+
+class Contexte:
+    """Données de la base utilisées par les scénarios, et lignes créées à supprimer"""
+
+    def __init__(self, graine=0):
+        self.rng = random.Random(graine)
+        self.aujourd_hui = date.today()
+        dernier_jour = Reservation.objects.aggregate(fin=Max('date_reservation'))['fin']
+        self.dernier_jour = max(dernier_jour or self.aujourd_hui, self.aujourd_hui)
+        self.salles = list(Salle.objects.filter(est_disponible=True).order_by('pk'))
+        if not self.salles:
+            raise ValueError("Aucune salle disponible : générer d'abord un campus (generer_campus)")
+
+        self.clients = {}
+        for role in ('etudiant', 'professeur', 'administrateur'):
+            utilisateur = Utilisateur.objects.filter(type_utilisateur=role, is_active=True).order_by('pk').first()
+            if utilisateur is None:
+                raise ValueError(f"Aucun utilisateur de type {role} dans la base")
+            client = Client(SERVER_NAME='localhost')
+            client.force_login(utilisateur)
+            self.clients[role] = client
+
+        self.rapports_crees = []
+
+    def jour_a_venir(self, iteration):
+        """Un jour de la période déjà réservée, à partir d'aujourd'hui"""
+        etendue = (self.dernier_jour - self.aujourd_hui).days + 1
+        return self.aujourd_hui + timedelta(days=iteration % etendue)
+
+    def nettoyer(self):
+        """Supprime les lignes créées par les scénarios (signaux compris)"""
+        Reservation.objects.filter(date_reservation__gt=self.dernier_jour, motif=MOTIF).delete()
+        Rapport.objects.filter(pk__in=self.rapports_crees).delete()
+        self.rapports_crees.clear()
+
+
+def _rechercher_salles(contexte, client, iteration):
+    return client.get(reverse('rechercher_salles'), {
+        'date_reservation': contexte.jour_a_venir(iteration).isoformat(),
+        'heure_debut': '10:00',
+        'heure_fin': '12:00',
+        'capacite_min': 10,
+    })
+
+
+def _recherche_texte(contexte, client, iteration):
+    return client.get(reverse('recherche_globale'), {'q': MATIERES[iteration % len(MATIERES)]})
+
+
+def _dashboard(contexte, client, iteration):
+    return client.get(reverse('dashboard'))
+
+
+def _mes_reservations(contexte, client, iteration):
+    return client.get(reverse('mes_reservations'))
+
+
+def _generer_rapport(type_rapport):
+    def jouer(contexte, client, iteration):
+        reponse = client.post(reverse('generer_rapport'), {
+            'type_rapport': type_rapport,
+            'date_debut': (contexte.aujourd_hui - timedelta(days=90)).isoformat(),
+            'date_fin': contexte.aujourd_hui.isoformat(),
+        })
+        if reponse.status_code == 302:
+            contexte.rapports_crees.append(int(reponse.url.rstrip('/').rsplit('/', 1)[-1]))
+        return reponse
+    return jouer
+
+
+def _creer_reservation(contexte, client, iteration):
+    # Après la période réservée : le créneau est libre à chaque itération
+    salle = contexte.salles[iteration % len(contexte.salles)]
+    jour = contexte.dernier_jour + timedelta(days=1 + iteration // len(contexte.salles))
+    return client.post(reverse('creer_reservation'), {
+        'salle': salle.pk,
+        'date_reservation': jour.isoformat(),
+        'heure_debut': '10:00',
+        'heure_fin': '11:00',
+        'motif': MOTIF,
+        'nombre_participants': 1,
+    })
+
+
+def _verifier_disponibilite(contexte, client, iteration):
+    salle = contexte.rng.choice(contexte.salles)
+    debut = contexte.rng.randrange(8 * 4, 18 * 4)
+    salle.verifier_disponibilite(
+        contexte.jour_a_venir(contexte.rng.randrange(1000)),
+        heure(debut // 4, debut % 4 * 15),
+        heure(debut // 4 + 1, debut % 4 * 15),
+    )
+    return None
+
+
+SCENARIOS = [
+    Scenario('rechercher_salles', 'etudiant', _rechercher_salles),
+    Scenario('recherche_texte', 'administrateur', _recherche_texte),
+    Scenario('dashboard', 'etudiant', _dashboard),
+    Scenario('mes_reservations', 'etudiant', _mes_reservations),
+    Scenario('generer_rapport', 'administrateur', _generer_rapport('utilisation')),
+    Scenario('generer_rapport_occupation', 'administrateur', _generer_rapport('occupation')),
+    Scenario('creer_reservation', 'professeur', _creer_reservation),
+    Scenario('verifier_disponibilite', None, _verifier_disponibilite),
+]
+
+
+def _mesurer(scenario, contexte, repetitions, echauffement):
+    client = contexte.clients.get(scenario.role)
+    durees = []
+    requetes = []
+    erreurs = 0
+    for iteration in range(echauffement + repetitions):
+        compteur = _Compteur()
+        with connection.execute_wrapper(compteur):
+            debut = time.perf_counter()
+            reponse = scenario.jouer(contexte, client, iteration)
+            duree = time.perf_counter() - debut
+        if iteration < echauffement:
+            continue
+        durees.append(duree * 1000)
+        requetes.append(compteur.requetes)
+        if reponse is not None and reponse.status_code >= 400:
+            erreurs += 1
+
+    p50, p90 = np.percentile(durees, [50, 90])
+    return {
+        'repetitions': repetitions,
+        'min': min(durees),
+        'p50': p50,
+        'p90': p90,
+        'max': max(durees),
+        'moyenne': float(np.mean(durees)),
+        'requetes': int(np.median(requetes)),
+        'erreurs': erreurs,
+    }
+
+
+def executer(noms=None, repetitions=20, echauffement=2, graine=0):
+    """
+    Joue les scénarios (tous par défaut) et renvoie les résultats
+
+    Returns:
+        dict: Environnement, taille de la base et mesures par scénario
+            (durées en millisecondes)
+    """
+    scenarios = [scenario for scenario in SCENARIOS if not noms or scenario.nom in noms]
+    contexte = Contexte(graine)
+    mesures = {}
+    try:
+        for scenario in scenarios:
+            mesures[scenario.nom] = _mesurer(scenario, contexte, repetitions, echauffement)
+    finally:
+        contexte.nettoyer()
+
+    return {
+        'date': timezone.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'base': {
+            'salles': Salle.objects.count(),
+            'utilisateurs': Utilisateur.objects.count(),
+            'reservations': Reservation.objects.count(),
+        },
+        'mesures': mesures,
+    }
+
+
+def ecrire(resultats, chemin):
+    with open(chemin, 'w', encoding='utf-8') as fichier:
+        json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+
+
+def lire(chemin):
+    with open(chemin, encoding='utf-8') as fichier:
+        return json.load(fichier)
+
+
+Comparaison = namedtuple('Comparaison', ['nom', 'ancien', 'nouveau', 'ratio', 'requetes_avant', 'requetes_apres', 'verdict'])
+
+
+def comparer(ancien, nouveau, seuil=SEUIL):
+    """
+    Compare les durées médianes de deux résultats, scénario par scénario
+
+    verdict vaut 'regression' si la médiane a été multipliée par plus de
+    seuil, 'amelioration' si elle a été divisée par plus de seuil, '' sinon.
+    Les scénarios absents de l'un des deux résultats sont ignorés.
+    """
+    lignes = []
+    for nom, avant in ancien['mesures'].items():
+        apres = nouveau['mesures'].get(nom)
+        if apres is None:
+            continue
+        ratio = apres['p50'] / avant['p50'] if avant['p50'] else float('inf')
+        if ratio > seuil:
+            verdict = 'regression'
+        elif ratio < 1 / seuil:
+            verdict = 'amelioration'
+        else:
+            verdict = ''
+        lignes.append(Comparaison(
+            nom, avant['p50'], apres['p50'], ratio, avant['requetes'], apres['requetes'], verdict
+        ))
+    return lignes
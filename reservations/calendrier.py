@@ -0,0 +1,219 @@
+"""
+Flux iCalendar (.ics) des réservations d'une salle et d'un utilisateur
+
+Les événements sont écrits au fil de l'eau (StreamingHttpResponse sur un
+itérateur de tuples) : un flux couvrant des années d'historique n'est
+jamais construit en mémoire. Un ETag/Last-Modified par flux permet aux
+clients d'agenda qui interrogent toutes les quelques minutes de recevoir
+un 304.
+
+Les clients d'agenda ne partagent pas la session du navigateur : l'accès
+se fait par un jeton signé propre à l'utilisateur, passé dans l'URL.
+"""
+import hashlib
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core import signing
+from django.db.models import Count, Max
+from django.http import StreamingHttpResponse, HttpResponseForbidden
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils import timezone
+from django.views.decorators.http import condition, require_GET
+
+from .models import Utilisateur, Salle, Reservation
+
+
+SEL_JETON = 'reservations.calendrier'
+
+STATUTS_ICS = {
+    'confirmee': 'CONFIRMED',
+    'en_attente': 'TENTATIVE',
+    'annulee': 'CANCELLED',
+    'refusee': 'CANCELLED',
+}
+
+CHAMPS_EVENEMENT = (
+    'pk', 'date_reservation', 'heure_debut', 'heure_fin', 'statut', 'motif', 'updated_at',
+    'salle__nom', 'salle__batiment', 'utilisateur__first_name', 'utilisateur__last_name',
+)
+
+
+def jeton_calendrier(utilisateur):
+    """Jeton d'abonnement aux flux (signé, propre à l'utilisateur)"""
+    return signing.Signer(salt=SEL_JETON).sign(str(utilisateur.pk))
+
+
+def url_abonnement(request, nom_url, *args):
+    """URL absolue d'un flux, avec le jeton de l'utilisateur connecté"""
+    url = request.build_absolute_uri(reverse(nom_url, args=args))
+    return f"{url}?jeton={jeton_calendrier(request.user)}"
+
+
+def _abonne(request):
+    """Utilisateur connecté, ou titulaire du jeton passé dans l'URL (None sinon)"""
+    if request.user.is_authenticated:
+        return request.user
+    jeton = request.GET.get('jeton')
+    if not jeton:
+        return None
+    try:
+        pk = signing.Signer(salt=SEL_JETON).unsign(jeton)
+    except signing.BadSignature:
+        return None
+    return Utilisateur.objects.filter(pk=pk, is_active=True).first()
+
+
+def _texte(valeur):
+    """Échappement TEXT (RFC 5545 §3.3.11)"""
+    return (
+        str(valeur).replace('\\', '\\\\').replace(';', '\\;').replace(',', '\\,')
+        .replace('\r\n', '\\n').replace('\n', '\\n')
+    )
+
+
+def _ligne(contenu):
+    """Ligne de contenu pliée à 75 octets (RFC 5545 §3.1)"""
+    octets = contenu.encode()
+    if len(octets) <= 75:
+        return contenu + '\r\n'
+    morceaux = []
+    debut = 0
+    limite = 75
+    while debut < len(octets):
+        fin = min(debut + limite, len(octets))
+        # Ne pas couper un caractère UTF-8 en deux
+        while fin < len(octets) and (octets[fin] & 0xC0) == 0x80:
+            fin -= 1
+        morceaux.append(octets[debut:fin].decode())
+        debut = fin
+        limite = 74
+    return '\r\n '.join(morceaux) + '\r\n'
+
+
+def _horodatage(valeur):
+    return valeur.astimezone(dt_timezone.utc).strftime('%Y%m%dT%H%M%SZ')
+
+
+def _instant(jour, heure):
+    """
+    Date et heure locales (TIME_ZONE) d'une réservation, écrites en UTC
+
+    La forme UTC (…Z) n'a pas besoin de composant VTIMEZONE, qu'un TZID
+    exige (RFC 5545 §3.2.19) et sans lequel certains clients ignorent
+    l'événement ou le lisent en heure flottante.
+    """
+    return _horodatage(timezone.make_aware(datetime.combine(jour, heure)))
+
+
+def _evenements(lignes, nom_flux, domaine):
+    """Générateur du flux : en-tête, un VEVENT par tuple, pied"""
+    yield _ligne('BEGIN:VCALENDAR')
+    yield _ligne('VERSION:2.0')
+    yield _ligne('PRODID:-//Reservation de salles//FR')
+    yield _ligne('CALSCALE:GREGORIAN')
+    yield _ligne(f'X-WR-CALNAME:{_texte(nom_flux)}')
+    yield _ligne(f'X-WR-TIMEZONE:{settings.TIME_ZONE}')
+
+    for (pk, jour, debut, fin, statut, motif, maj,
+         salle, batiment, prenom, nom) in lignes:
+        yield ''.join([
+            _ligne('BEGIN:VEVENT'),
+            _ligne(f'UID:reservation-{pk}@{domaine}'),
+            _ligne(f'DTSTAMP:{_horodatage(maj)}'),
+            _ligne(f'LAST-MODIFIED:{_horodatage(maj)}'),
+            _ligne(f'DTSTART:{_instant(jour, debut)}'),
+            _ligne(f'DTEND:{_instant(jour, fin)}'),
+            _ligne(f'SUMMARY:{_texte(f"{salle} - {motif}")}'),
+            _ligne(f'LOCATION:{_texte(f"{salle} ({batiment})")}'),
+            _ligne(f'DESCRIPTION:{_texte(f"Réservé par {prenom} {nom}".strip())}'),
+            _ligne(f'STATUS:{STATUTS_ICS.get(statut, "CONFIRMED")}'),
+            _ligne('END:VEVENT'),
+        ])
+
+    yield _ligne('END:VCALENDAR')
+
+
+def _version(request, reservations):
+    """(Last-Modified, ETag) d'un flux, calculés une fois par requête"""
+    if not hasattr(request, '_version_calendrier'):
+        valeurs = reservations.aggregate(maj=Max('updated_at'), nombre=Count('id'))
+        empreinte = repr((request.path, valeurs['maj'], valeurs['nombre']))
+        request._version_calendrier = (
+            valeurs['maj'],
+            hashlib.md5(empreinte.encode()).hexdigest(),
+        )
+    return request._version_calendrier
+
+
+def _reservations_salle(pk):
+    return Reservation.objects.actives().filter(salle_id=pk)
+
+
+def _reservations_utilisateur(pk):
+    return Reservation.objects.filter(utilisateur_id=pk)
+
+
+def _flux(reservations, nom_flux, request, nom_fichier):
+    lignes = reservations.order_by('date_reservation', 'heure_debut').values_list(
+        *CHAMPS_EVENEMENT
+    ).iterator(chunk_size=2000)
+    reponse = StreamingHttpResponse(
+        _evenements(lignes, nom_flux, request.get_host().split(':')[0]),
+        content_type='text/calendar; charset=utf-8'
+    )
+    reponse['Content-Disposition'] = f'inline; filename="{nom_fichier}"'
+    reponse['Cache-Control'] = 'private, no-cache'
+    return reponse
+
+
+def _conditionnel(source):
+    """condition() avec la version du flux de la source donnée"""
+    return condition(
+        etag_func=lambda request, pk: _version(request, source(pk))[1],
+        last_modified_func=lambda request, pk: _version(request, source(pk))[0],
+    )
+
+
+def _peut_voir_utilisateur(abonne, pk):
+    return abonne.pk == pk or abonne.is_staff or abonne.type_utilisateur == 'administrateur'
+
+
+def _authentifie(autorise=None):
+    """
+    Exige une session ou un jeton valide (et l'autorisation donnée) avant
+    tout calcul de version : un 304 ne doit rien révéler à un tiers
+    """
+    def decorateur(vue):
+        def enveloppe(request, pk):
+            abonne = _abonne(request)
+            if abonne is None:
+                return HttpResponseForbidden("Jeton d'abonnement manquant ou invalide")
+            if autorise is not None and not autorise(abonne, pk):
+                return HttpResponseForbidden("Accès refusé à ce calendrier")
+            return vue(request, pk)
+        enveloppe.__doc__ = vue.__doc__
+        return enveloppe
+    return decorateur
+
+
+@require_GET
+@_authentifie()
+@_conditionnel(_reservations_salle)
+def calendrier_salle(request, pk):
+    """Flux .ics des réservations actives d'une salle"""
+    salle = get_object_or_404(Salle, pk=pk)
+    return _flux(_reservations_salle(pk), f"Salle {salle.nom}", request, f"salle-{pk}.ics")
+
+
+@require_GET
+@_authentifie(_peut_voir_utilisateur)
+@_conditionnel(_reservations_utilisateur)
+def calendrier_utilisateur(request, pk):
+    """Flux .ics des réservations d'un utilisateur (le sien, ou n'importe lequel pour un admin)"""
+    utilisateur = get_object_or_404(Utilisateur, pk=pk)
+    return _flux(
+        _reservations_utilisateur(pk), f"Réservations de {utilisateur.get_full_name()}",
+        request, f"reservations-{pk}.ics"
+    )
@@ -0,0 +1,252 @@
+"""
+Génération d'un campus synthétique (bâtiments, salles, utilisateurs,
+réservations) pour les bancs d'essai et les démonstrations
+
+Le campus est déterministe : à graine, tailles et date d'origine égales,
+les mêmes lignes sont produites. Les réservations actives d'une salle ne
+se chevauchent jamais.
+
+Les lignes sont insérées par bulk_create, sans signal : les compteurs, les
+statistiques journalières et l'index d'occupation sont recalculés à la fin,
+la version du catalogue des salles est changée (l'index plein texte est
+tenu à jour par ses triggers).
+"""
+import math
+import random
+from collections import namedtuple
+from datetime import date, time, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+from .catalogue import invalider_salles
+from .compteurs import recalculer_compteurs
+from .models import Utilisateur, Salle, Reservation
+from .occupation import reconstruire
+from .rapports import recalculer_statistiques
+
+
+TAILLE_LOT = 5000
+
+# Mot de passe de tous les comptes générés
+MOT_DE_PASSE = 'campus'
+
+# Réservations par salle et par jour, en moyenne (donne la longueur de la période)
+RESERVATIONS_PAR_JOUR = 4
+
+# Part de la période située après la date d'origine
+PART_A_VENIR = 0.25
+
+# Journée réservable, en minutes
+OUVERTURE = 8 * 60
+FERMETURE = 20 * 60
+
+# (type, poids, capacité min, capacité max)
+TYPES_SALLE = [
+    ('td', 40, 20, 40),
+    ('tp', 25, 12, 30),
+    ('reunion', 15, 6, 20),
+    ('amphi', 10, 100, 400),
+    ('conference', 10, 30, 120),
+]
+
+PRENOMS = [
+    'Aïcha', 'Amadou', 'Camille', 'Chloé', 'Fatou', 'Hugo', 'Inès', 'Ismaël', 'Jules', 'Léa',
+    'Lucas', 'Mamadou', 'Manon', 'Mariam', 'Nathan', 'Oumar', 'Sarah', 'Théo', 'Yasmine', 'Zoé',
+]
+NOMS = [
+    'Bamba', 'Bernard', 'Camara', 'Coulibaly', 'Diaby', 'Diallo', 'Dubois', 'Durand', 'Fofana', 'Koné',
+    'Leroy', 'Martin', 'Moreau', 'Ndiaye', 'Petit', 'Richard', 'Sanogo', 'Touré', 'Traoré', 'Yao',
+]
+DEPARTEMENTS = ['Informatique', 'Mathématiques', 'Physique', 'Chimie', 'Économie', 'Lettres']
+ACTIVITES = ['Cours', 'TD', 'TP', 'Soutenance', "Réunion d'équipe", 'Séminaire', 'Examen', 'Révisions']
+MATIERES = [
+    'algèbre linéaire', 'analyse', 'bases de données', 'réseaux', 'thermodynamique',
+    'chimie organique', 'microéconomie', 'littérature comparée', 'programmation web', 'statistiques',
+]
+
+Campus = namedtuple('Campus', ['batiments', 'salles', 'utilisateurs', 'reservations', 'premier_jour', 'dernier_jour'])
+
+
+def periode(salles, reservations, origine=None):
+    """
+    Premier et dernier jour couverts par les réservations générées
+
+    La période est assez longue pour RESERVATIONS_PAR_JOUR réservations par
+    salle et par jour ; un quart environ est à venir à partir de l'origine.
+    """
+    origine = origine or date.today()
+    jours = max(1, math.ceil(reservations / (max(salles, 1) * RESERVATIONS_PAR_JOUR)))
+    a_venir = int(jours * PART_A_VENIR)
+    premier_jour = origine - timedelta(days=jours - a_venir - 1)
+    return premier_jour, premier_jour + timedelta(days=jours - 1)
+
+
+def _lots(elements, taille_lot):
+    """Découpe un itérable en listes de taille_lot éléments"""
+    lot = []
+    for element in elements:
+        lot.append(element)
+        if len(lot) >= taille_lot:
+            yield lot
+            lot = []
+    if lot:
+        yield lot
+
+
+def _inserer(modele, elements, taille_lot):
+    """bulk_create par lots, une transaction par lot ; renvoie le nombre de lignes"""
+    total = 0
+    for lot in _lots(elements, taille_lot):
+        with transaction.atomic():
+            modele.objects.bulk_create(lot)
+        total += len(lot)
+    return total
+
+
+def _nom_batiment(indice):
+    if indice < 26:
+        return f"Bâtiment {chr(ord('A') + indice)}"
+    return f"Bâtiment {indice + 1}"
+
+
+def _salles(rng, batiments, nombre):
+    types = [type_salle for type_salle, *_ in TYPES_SALLE]
+    poids = [valeur for _, valeur, *_ in TYPES_SALLE]
+    capacites = {type_salle: (minimum, maximum) for type_salle, _, minimum, maximum in TYPES_SALLE}
+    libelles_types = dict(Salle.TYPE_CHOICES)
+    libelles_equipements = [libelle for _, libelle in Salle.EQUIPEMENT_CHOICES]
+
+    for indice in range(nombre):
+        batiment = _nom_batiment(indice % batiments)
+        etage = rng.randint(0, 4)
+        type_salle = rng.choices(types, poids)[0]
+        equipements = sorted(rng.sample(libelles_equipements, rng.randint(0, len(libelles_equipements))))
+        yield Salle(
+            nom=f"{batiment[9:]}{etage}-{indice + 1:04d}",
+            batiment=batiment,
+            etage=etage,
+            capacite=rng.randint(*capacites[type_salle]),
+            type_salle=type_salle,
+            equipements=equipements,
+            masque_equipements=Salle.masque_liste(equipements),
+            est_disponible=rng.random() >= 0.05,
+            description=f"{libelles_types[type_salle]} du {batiment}, étage {etage}. "
+                        f"{', '.join(equipements) or 'Sans équipement'}.",
+        )
+
+
+def _utilisateurs(rng, etudiants, professeurs, administrateurs):
+    # Un seul hachage (coûteux) partagé par tous les comptes
+    mot_de_passe = make_password(MOT_DE_PASSE)
+    niveaux = [niveau for niveau, _ in Utilisateur.NIVEAU_CHOICES]
+    for type_utilisateur, nombre in (
+        ('etudiant', etudiants), ('professeur', professeurs), ('administrateur', administrateurs)
+    ):
+        for indice in range(1, nombre + 1):
+            username = f"{type_utilisateur}{indice:05d}"
+            yield Utilisateur(
+                username=username,
+                password=mot_de_passe,
+                first_name=rng.choice(PRENOMS),
+                last_name=rng.choice(NOMS),
+                email=f"{username}@campus.example",
+                type_utilisateur=type_utilisateur,
+                niveau=rng.choice(niveaux) if type_utilisateur == 'etudiant' else None,
+                departement=rng.choice(DEPARTEMENTS) if type_utilisateur == 'professeur' else None,
+                is_staff=type_utilisateur == 'administrateur',
+            )
+
+
+def _statut(rng, type_utilisateur, a_venir):
+    tirage = rng.random()
+    if tirage < 0.08:
+        return 'annulee'
+    if a_venir:
+        if type_utilisateur == 'etudiant' and tirage < 0.5:
+            return 'en_attente'
+        return 'confirmee'
+    if type_utilisateur == 'etudiant' and tirage < 0.13:
+        return 'refusee'
+    return 'confirmee'
+
+
+def _reservations(rng, salles, demandeurs, nombre, premier_jour, dernier_jour, origine):
+    """
+    Réservations jour par jour, salle par salle : des créneaux successifs
+    séparés par des intervalles libres, jusqu'à en avoir produit nombre
+    """
+    produites = 0
+    jour = premier_jour
+    while produites < nombre and jour <= dernier_jour:
+        a_venir = jour >= origine
+        for salle_id, capacite in salles:
+            debut = OUVERTURE + rng.choice((0, 30, 60, 90))
+            while produites < nombre:
+                duree = rng.choice((60, 90, 120, 120, 180))
+                if debut + duree > FERMETURE:
+                    break
+                utilisateur_id, type_utilisateur = rng.choice(demandeurs)
+                fin = debut + duree
+                yield Reservation(
+                    utilisateur_id=utilisateur_id,
+                    type_utilisateur=type_utilisateur,
+                    salle_id=salle_id,
+                    date_reservation=jour,
+                    heure_debut=time(debut // 60, debut % 60),
+                    heure_fin=time(fin // 60, fin % 60),
+                    motif=f"{rng.choice(ACTIVITES)} de {rng.choice(MATIERES)}",
+                    statut=_statut(rng, type_utilisateur, a_venir),
+                    nombre_participants=rng.randint(1, capacite),
+                )
+                produites += 1
+                debut = fin + rng.choice((0, 15, 30, 60, 120))
+        jour += timedelta(days=1)
+
+
+def generer_campus(batiments=4, salles=40, etudiants=200, professeurs=40, administrateurs=2,
+                   reservations=10000, graine=0, origine=None, taille_lot=TAILLE_LOT):
+    """
+    Crée un campus synthétique dans une base sans salles
+
+    Args:
+        origine: Date « d'aujourd'hui » du campus (aujourd'hui par défaut) ;
+            les réservations à venir commencent ce jour-là
+
+    Returns:
+        Campus: Nombres de lignes créées et période couverte
+    """
+    if Salle.objects.exists():
+        raise ValueError("La base contient déjà des salles : générer le campus dans une base vide")
+    if batiments < 1 or salles < batiments:
+        raise ValueError("Il faut au moins un bâtiment et une salle par bâtiment")
+    if reservations and not (etudiants or professeurs):
+        raise ValueError("Des réservations demandent au moins un étudiant ou un professeur")
+
+    origine = origine or date.today()
+    rng = random.Random(graine)
+    premier_jour, dernier_jour = periode(salles, reservations, origine)
+
+    _inserer(Salle, _salles(rng, batiments, salles), taille_lot)
+    invalider_salles()
+    nb_utilisateurs = _inserer(
+        Utilisateur, _utilisateurs(rng, etudiants, professeurs, administrateurs), taille_lot
+    )
+
+    # Identifiants relus en base (bulk_create ne les renvoie pas sur toutes les bases)
+    lignes_salles = list(Salle.objects.order_by('pk').values_list('pk', 'capacite'))
+    demandeurs = list(
+        Utilisateur.objects.filter(type_utilisateur__in=['etudiant', 'professeur'])
+        .order_by('pk').values_list('pk', 'type_utilisateur')
+    )
+    nb_reservations = _inserer(
+        Reservation,
+        _reservations(rng, lignes_salles, demandeurs, reservations, premier_jour, dernier_jour, origine),
+        taille_lot
+    )
+
+    recalculer_compteurs()
+    recalculer_statistiques()
+    reconstruire()
+
+    return Campus(batiments, salles, nb_utilisateurs, nb_reservations, premier_jour, dernier_jour)
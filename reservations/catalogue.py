@@ -0,0 +1,79 @@
+"""
+Version du catalogue des salles, pour les caches qui en dépendent
+
+Les fragments de gabarit des listes de salles ({% cache %} dans
+salles/liste.html et partials/salles.html) et les facettes des filtres ont
+la version dans leur clé : changer la version rend toutes les anciennes
+entrées inaccessibles, sans avoir à les retrouver pour les supprimer. Elle
+change à chaque écriture d'une salle (signaux de Salle, imports par lots).
+"""
+import uuid
+from collections import Counter, namedtuple
+
+from django.core.cache import cache
+from django.db.models import Count
+
+from .models import Salle
+
+
+CLE_VERSION = 'reservations:salles:version'
+
+# Durée de vie des fragments (secondes) : l'invalidation se fait par la
+# version, ce délai libère seulement le cache des versions périmées
+DUREE_FRAGMENTS = 24 * 3600
+
+# batiments : [(bâtiment, nombre)] ; types : [(code, libellé, nombre)]
+Facettes = namedtuple('Facettes', ['batiments', 'types'])
+
+
+def _nouvelle_version():
+    # Unique, et non un compteur : si la clé est évincée du cache, repartir
+    # de 1 retrouverait des fragments d'une ancienne version encore en cache
+    return uuid.uuid4().hex
+
+
+def version_salles():
+    """Version courante du catalogue (créée à la première lecture)"""
+    version = cache.get(CLE_VERSION)
+    if version is None:
+        cache.add(CLE_VERSION, _nouvelle_version(), None)
+        version = cache.get(CLE_VERSION)
+    return version
+
+
+def invalider_salles():
+    """Change la version : les fragments en cache ne sont plus lus"""
+    cache.set(CLE_VERSION, _nouvelle_version(), None)
+
+
+def facettes_salles():
+    """
+    Bâtiments et types de salle proposés dans les filtres, avec leur nombre
+    de salles disponibles (une requête GROUP BY, en cache jusqu'à la
+    prochaine écriture d'une salle)
+
+    Returns:
+        Facettes: Bâtiments par nom, types dans l'ordre de Salle.TYPE_CHOICES ;
+            seuls ceux qui ont au moins une salle disponible y figurent
+    """
+    cle = f'reservations:salles:facettes:{version_salles()}'
+    facettes = cache.get(cle)
+    if facettes is None:
+        batiments = Counter()
+        types = Counter()
+        groupes = (
+            Salle.objects.filter(est_disponible=True)
+            .values('batiment', 'type_salle')
+            .annotate(nombre=Count('id'))
+            .order_by()
+            .values_list('batiment', 'type_salle', 'nombre')
+        )
+        for batiment, type_salle, nombre in groupes:
+            batiments[batiment] += nombre
+            types[type_salle] += nombre
+        facettes = Facettes(
+            batiments=sorted(batiments.items()),
+            types=[(code, libelle, types[code]) for code, libelle in Salle.TYPE_CHOICES if types[code]],
+        )
+        cache.set(cle, facettes, DUREE_FRAGMENTS)
+    return facettes
@@ -0,0 +1,241 @@
+"""
+Test de charge : des utilisateurs simulés réservent, cherchent des salles
+et consultent leur tableau de bord en même temps (pic d'inscriptions aux
+examens)
+
+Chaque utilisateur simulé est un thread avec son propre client de test
+(gestionnaire WSGI de Django, middlewares compris) et sa propre connexion
+à la base. Les réservations visent quelques salles sur quelques jours : la
+plupart des tentatives entrent en conflit, ce qui exerce le verrouillage.
+
+Après la charge, les réservations actives des salles et jours visés sont
+relues pour compter les doubles réservations (il ne doit y en avoir
+aucune). Les réservations créées sont ensuite supprimées.
+"""
+import logging
+import random
+import threading
+import time
+from collections import Counter, namedtuple
+from datetime import date, timedelta
+
+import numpy as np
+from django.db import connection
+from django.db.models import Max
+from django.test import Client
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Utilisateur, Salle, Reservation
+
+
+ACTIONS = ('creer_reservation', 'rechercher_salles', 'dashboard')
+
+# Motif des réservations créées par le test de charge (supprimées à la fin)
+MOTIF = 'Test de charge'
+
+# issue : 'ok', 'refus' (réservation refusée par le formulaire : conflit) ou 'erreur'
+Appel = namedtuple('Appel', ['action', 'duree', 'issue', 'cause'])
+
+Charge = namedtuple('Charge', ['jours', 'salles', 'poids', 'duree'])
+
+
+def _creneau(rng):
+    """Créneau d'une à deux heures, aligné sur la demi-heure, entre 8h et 20h"""
+    debut = rng.randrange(16, 38)
+    fin = debut + rng.choice((2, 3, 4))
+    return f"{debut // 2:02d}:{debut % 2 * 30:02d}", f"{fin // 2:02d}:{fin % 2 * 30:02d}"
+
+
+def _creer_reservation(client, rng, charge):
+    heure_debut, heure_fin = _creneau(rng)
+    return client.post(reverse('creer_reservation'), {
+        'salle': rng.choice(charge.salles),
+        'date_reservation': rng.choice(charge.jours).isoformat(),
+        'heure_debut': heure_debut,
+        'heure_fin': heure_fin,
+        'motif': MOTIF,
+        'nombre_participants': 1,
+    })
+
+
+def _rechercher_salles(client, rng, charge):
+    heure_debut, heure_fin = _creneau(rng)
+    return client.get(reverse('rechercher_salles'), {
+        'date_reservation': rng.choice(charge.jours).isoformat(),
+        'heure_debut': heure_debut,
+        'heure_fin': heure_fin,
+    })
+
+
+def _dashboard(client, rng, charge):
+    return client.get(reverse('dashboard'))
+
+
+JOUER = {
+    'creer_reservation': _creer_reservation,
+    'rechercher_salles': _rechercher_salles,
+    'dashboard': _dashboard,
+}
+
+
+def _issue(action, reponse):
+    """(issue, cause de l'erreur) d'une réponse"""
+    if action == 'creer_reservation' and reponse.status_code == 302:
+        return 'ok', ''
+    if reponse.status_code == 200:
+        # Formulaire de réservation réaffiché avec ses erreurs : créneau déjà pris
+        return ('refus' if action == 'creer_reservation' else 'ok'), ''
+    exc_info = getattr(reponse, 'exc_info', None)
+    if exc_info:
+        return 'erreur', f"{exc_info[0].__name__}: {exc_info[1]}"
+    return 'erreur', f"HTTP {reponse.status_code}"
+
+
+def _simuler(client, rng, charge, depart, appels):
+    """Corps d'un utilisateur simulé : des appels tirés au sort jusqu'à la fin de la charge"""
+    try:
+        depart.wait()
+        fin = time.perf_counter() + charge.duree
+        while time.perf_counter() < fin:
+            action = rng.choices(ACTIONS, charge.poids)[0]
+            debut = time.perf_counter()
+            try:
+                issue, cause = _issue(action, JOUER[action](client, rng, charge))
+            except Exception as erreur:
+                issue, cause = 'erreur', f"{type(erreur).__name__}: {erreur}"
+            appels.append(Appel(action, time.perf_counter() - debut, issue, cause))
+    finally:
+        connection.close()
+
+
+def doubles_reservations(jours, salles):
+    """
+    Réservations actives qui chevauchent une réservation précédente de la
+    même salle, le même jour (0 attendu)
+    """
+    doubles = 0
+    fins = {}
+    reservations = Reservation.objects.actives().filter(
+        date_reservation__in=jours, salle_id__in=salles
+    ).order_by('salle_id', 'date_reservation', 'heure_debut').values_list(
+        'salle_id', 'date_reservation', 'heure_debut', 'heure_fin'
+    )
+    for salle_id, jour, debut, fin in reservations:
+        cle = (salle_id, jour)
+        if cle in fins and debut < fins[cle]:
+            doubles += 1
+        fins[cle] = max(fins.get(cle, fin), fin)
+    return doubles
+
+
+def _statistiques(appels):
+    durees = np.array([appel.duree * 1000 for appel in appels])
+    p50, p95, p99 = np.percentile(durees, [50, 95, 99])
+    return {
+        'requetes': len(appels),
+        'p50': p50,
+        'p95': p95,
+        'p99': p99,
+        'max': durees.max(),
+        'erreurs': sum(appel.issue == 'erreur' for appel in appels),
+        'refus': sum(appel.issue == 'refus' for appel in appels),
+    }
+
+
+def executer(utilisateurs=50, duree=30, salles=10, jours=3, premier_jour=None,
+             poids=(1, 2, 2), graine=0, conserver=False):
+    """
+    Lance la charge et renvoie ses résultats
+
+    Args:
+        utilisateurs: Nombre d'utilisateurs simulés (threads), chacun
+            connecté avec un compte étudiant ou professeur distinct si possible
+        duree: Durée de la charge en secondes
+        salles: Nombre de salles visées par les réservations
+        jours: Nombre de jours visés, à partir de premier_jour (par défaut
+            le lendemain de la dernière réservation en base)
+        poids: Poids des actions, dans l'ordre de ACTIONS
+        conserver: Garder les réservations créées
+
+    Returns:
+        dict: Débit, taux d'erreur, percentiles par action (ms) et
+            nombre de doubles réservations
+    """
+    comptes = list(
+        Utilisateur.objects.filter(type_utilisateur__in=['etudiant', 'professeur'], is_active=True)
+        .order_by('pk')[:utilisateurs]
+    )
+    cibles = list(Salle.objects.filter(est_disponible=True).order_by('pk').values_list('pk', flat=True)[:salles])
+    if not comptes or not cibles:
+        raise ValueError("Il faut des salles disponibles et des utilisateurs : générer d'abord un campus (generer_campus)")
+
+    if premier_jour is None:
+        dernier = Reservation.objects.aggregate(fin=Max('date_reservation'))['fin']
+        premier_jour = max(dernier or date.today(), date.today()) + timedelta(days=1)
+    charge = Charge(
+        jours=[premier_jour + timedelta(days=decalage) for decalage in range(jours)],
+        salles=cibles,
+        poids=poids,
+        duree=duree,
+    )
+
+    # Connexions ouvertes avant le départ, depuis ce thread
+    clients = []
+    for indice in range(utilisateurs):
+        client = Client(SERVER_NAME='localhost', raise_request_exception=False)
+        client.force_login(comptes[indice % len(comptes)])
+        clients.append(client)
+
+    depart = threading.Barrier(utilisateurs + 1)
+    appels = []
+    threads = [
+        threading.Thread(
+            target=_simuler, args=(client, random.Random(f"{graine}-{indice}"), charge, depart, appels)
+        )
+        for indice, client in enumerate(clients)
+    ]
+    # Les erreurs sont comptées et regroupées par cause dans les résultats,
+    # sans trace de pile pour chacune
+    journal = logging.getLogger('django.request')
+    niveau = journal.level
+    journal.setLevel(logging.CRITICAL)
+    try:
+        for thread in threads:
+            thread.start()
+        depart.wait()
+        debut = time.perf_counter()
+        for thread in threads:
+            thread.join()
+        ecoule = time.perf_counter() - debut
+    finally:
+        journal.setLevel(niveau)
+
+    doubles = doubles_reservations(charge.jours, charge.salles)
+    if not conserver:
+        Reservation.objects.filter(date_reservation__in=charge.jours, motif=MOTIF).delete()
+
+    resultats = {
+        'date': timezone.now().isoformat(timespec='seconds'),
+        'utilisateurs': utilisateurs,
+        'duree': ecoule,
+        'salles': len(cibles),
+        'jours': [jour.isoformat() for jour in charge.jours],
+        'requetes': len(appels),
+        'debit': len(appels) / ecoule if ecoule else 0.0,
+        'erreurs': sum(appel.issue == 'erreur' for appel in appels),
+        'reservations_acceptees': sum(
+            appel.action == 'creer_reservation' and appel.issue == 'ok' for appel in appels
+        ),
+        'doubles_reservations': doubles,
+        'causes_erreurs': dict(Counter(appel.cause for appel in appels if appel.issue == 'erreur').most_common()),
+        'actions': {},
+    }
+    resultats['taux_erreur'] = resultats['erreurs'] / len(appels) if appels else 0.0
+    if appels:
+        resultats['global'] = _statistiques(appels)
+    for action in ACTIONS:
+        appels_action = [appel for appel in appels if appel.action == action]
+        if appels_action:
+            resultats['actions'][action] = _statistiques(appels_action)
+    return resultats
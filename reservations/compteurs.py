@@ -0,0 +1,77 @@
+"""
+Compteurs globaux du dashboard administrateur, maintenus incrémentalement
+"""
+from django.db.models import Case, F, Value, When
+from django.utils import timezone
+
+from .models import Utilisateur, Salle, Reservation, Compteur
+
+
+# Définition de chaque compteur : la requête qui donne sa valeur exacte
+DEFINITIONS = {
+    'reservations': lambda: Reservation.objects.all(),
+    'reservations_en_attente': lambda: Reservation.objects.filter(statut='en_attente'),
+    'salles': lambda: Salle.objects.all(),
+    'utilisateurs_actifs': lambda: Utilisateur.objects.filter(is_active=True),
+}
+
+
+def incrementer(cle, delta=1):
+    """
+    Ajoute delta à un compteur (UPDATE atomique, dans la transaction en cours)
+
+    updated_at est mis à jour aussi (auto_now ne s'applique pas à update()) :
+    il date la dernière création ou suppression comptée, ce que l'API
+    utilise pour son Last-Modified.
+
+    Si le compteur n'existe pas encore, rien n'est fait : il sera calculé
+    entièrement à sa première lecture.
+    """
+    ajuster({cle: delta})
+
+
+def ajuster(deltas):
+    """
+    Ajoute plusieurs variations {clé: delta} en un seul UPDATE
+
+    Mêmes règles qu'incrementer : compteurs absents ignorés, deltas nuls
+    sans requête.
+    """
+    deltas = {cle: delta for cle, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    if len(deltas) == 1:
+        variation = Value(*deltas.values())
+    else:
+        variation = Case(*[When(cle=cle, then=Value(delta)) for cle, delta in deltas.items()])
+    Compteur.objects.filter(cle__in=deltas).update(valeur=F('valeur') + variation, updated_at=timezone.now())
+
+
+def recalculer_compteurs(*cles):
+    """
+    Recalcule des compteurs depuis les tables (tous par défaut)
+
+    Returns:
+        dict: {clé: (ancienne valeur ou None, nouvelle valeur)}
+    """
+    anciens = dict(Compteur.objects.values_list('cle', 'valeur'))
+    resultats = {}
+    for cle in cles or DEFINITIONS:
+        valeur = DEFINITIONS[cle]().count()
+        Compteur.objects.update_or_create(cle=cle, defaults={'valeur': valeur})
+        resultats[cle] = (anciens.get(cle), valeur)
+    return resultats
+
+
+def lire_compteurs():
+    """
+    Valeurs de tous les compteurs en une requête
+
+    Les compteurs absents (première utilisation) sont calculés et enregistrés.
+    """
+    valeurs = dict(Compteur.objects.values_list('cle', 'valeur'))
+    manquants = [cle for cle in DEFINITIONS if cle not in valeurs]
+    if manquants:
+        for cle, (_, valeur) in recalculer_compteurs(*manquants).items():
+            valeurs[cle] = valeur
+    return valeurs
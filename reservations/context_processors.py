@@ -1,15 +1,19 @@
-"""
-Context processors pour ajouter des variables à tous les templates
-"""
-from .models import Notification
-
-
-def notifications_count(request):
-    """Ajoute le nombre de notifications non lues dans le contexte"""
-    if request.user.is_authenticated:
-        count = Notification.objects.filter(
-            utilisateur=request.user,
-            est_lue=False
-        ).count()
-        return {'notifications_non_lues': count}
-    return {'notifications_non_lues': 0}
\ No newline at end of file
+"""
+Context processors pour ajouter des variables à tous les templates
+"""
+
+
+def notifications_count(request):
+    """
+    Ajoute le nombre de notifications non lues dans le contexte
+    
+    Lu depuis le compteur dénormalisé de l'utilisateur (aucune requête COUNT).
+    La valeur est un callable : le template ne l'évalue que s'il affiche le
+    badge, et l'utilisateur n'est chargé que dans ce cas.
+    """
+    def compter():
+        if request.user.is_authenticated:
+            return request.user.notifications_non_lues
+        return 0
+    
+    return {'notifications_non_lues': compter}
@@ -0,0 +1,206 @@
+"""
+Moteur de disponibilité des salles
+S'appuie sur l'index d'occupation par quarts d'heure (occupation.py) et ne
+revient aux requêtes de plage que pour les bornes non alignées
+"""
+from collections import namedtuple
+from datetime import time, timedelta
+
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from .models import Salle, Reservation, OccupationJournaliere
+from .occupation import masques_jour, verdict, decoder, intervalles
+
+
+# Plage horaire dans laquelle on cherche des créneaux libres
+HEURE_OUVERTURE = time(8, 0)
+HEURE_FERMETURE = time(20, 0)
+
+Creneau = namedtuple('Creneau', ['date', 'heure_debut', 'heure_fin'])
+
+
+def _en_minutes(heure):
+    """Convertit une heure en minutes depuis minuit"""
+    return heure.hour * 60 + heure.minute
+
+
+def _en_heure(minutes):
+    """Convertit des minutes depuis minuit en heure"""
+    return time(minutes // 60, minutes % 60)
+
+
+def debut_recherche(a_partir_de):
+    """
+    (date, minute) à partir desquelles creneaux_libres cherche pour un
+    instant donné : ce jour-là, au quart d'heure suivant
+
+    Ne change qu'une fois par quart d'heure : c'est la part de l'heure
+    courante dans le résultat de creneaux_libres.
+    """
+    return a_partir_de.date(), (_en_minutes(a_partir_de) + 14) // 15 * 15
+
+
+def salles_disponibles(date_reservation, heure_debut, heure_fin,
+                       capacite_min=None, type_salle=None, batiment=None,
+                       equipements=None, salles=None):
+    """
+    Retourne les salles libres pour un créneau donné
+
+    Les masques d'occupation du jour sont lus en une requête et comparés au
+    créneau par opérations sur les bits. Seules les salles que l'index ne
+    suffit pas à trancher (bornes non alignées sur le quart d'heure) gardent
+    la sous-requête NOT EXISTS corrélée sur (salle, date_reservation).
+
+    Args:
+        date_reservation: Date du créneau
+        heure_debut: Heure de début
+        heure_fin: Heure de fin
+        capacite_min: Capacité minimale (optionnel)
+        type_salle: Type de salle (optionnel)
+        batiment: Bâtiment (optionnel)
+        equipements: Codes des équipements requis, tous présents (optionnel)
+        salles: QuerySet de départ (optionnel, toutes les salles par défaut)
+
+    Returns:
+        QuerySet: Salles disponibles (évalué paresseusement)
+    """
+    if salles is None:
+        salles = Salle.objects.all()
+
+    salles = salles.filter(est_disponible=True)
+
+    if capacite_min:
+        salles = salles.filter(capacite__gte=capacite_min)
+    if type_salle:
+        salles = salles.filter(type_salle=type_salle)
+    if batiment:
+        salles = salles.filter(batiment=batiment)
+    if equipements:
+        salles = salles.avec_equipements(equipements)
+
+    occupees = []
+    a_verifier = []
+    for salle_id, (plein, partiel) in masques_jour(date_reservation, salles).items():
+        libre = verdict(plein, partiel, heure_debut, heure_fin)
+        if libre is False:
+            occupees.append(salle_id)
+        elif libre is None:
+            a_verifier.append(salle_id)
+
+    if occupees:
+        salles = salles.exclude(pk__in=occupees)
+    if a_verifier:
+        conflits = Reservation.objects.chevauchant(
+            date_reservation, heure_debut, heure_fin
+        ).filter(salle=OuterRef('pk'))
+        salles = salles.exclude(Q(pk__in=a_verifier) & Exists(conflits))
+
+    return salles
+
+
+def creneaux_libres(date_debut, date_fin, duree,
+                    capacite_min=None, type_salle=None, batiment=None,
+                    heure_ouverture=HEURE_OUVERTURE, heure_fermeture=HEURE_FERMETURE,
+                    salles=None, a_partir_de=None):
+    """
+    Liste les créneaux libres de chaque salle sur une période
+
+    Deux requêtes dans le cas courant : les salles candidates, puis leurs
+    masques d'occupation sur la période. Les plages occupées sont tirées des
+    bits ; les journées dont une borne n'est pas alignée sur le quart
+    d'heure relisent leurs réservations (une requête de plus). Les trous
+    sont ensuite trouvés en mémoire par un balayage (sweep-line) sur chaque
+    couple (salle, date), bornés à la plage horaire : une réservation hors
+    de la plage (avant l'ouverture, après la fermeture) ne l'étend pas.
+
+    Args:
+        date_debut: Premier jour de la période
+        date_fin: Dernier jour de la période (inclus)
+        duree: Durée minimale d'un créneau libre, en minutes
+        capacite_min: Capacité minimale (optionnel)
+        type_salle: Type de salle (optionnel)
+        batiment: Bâtiment (optionnel)
+        heure_ouverture: Début de la plage horaire d'une journée
+        heure_fermeture: Fin de la plage horaire d'une journée
+        salles: QuerySet de départ (optionnel, toutes les salles par défaut)
+        a_partir_de: Instant à partir duquel chercher (maintenant par
+            défaut) : les jours passés sont ignorés et, ce jour-là, les
+            créneaux commencent au quart d'heure suivant
+
+    Returns:
+        list: Un dict {'salle', 'creneaux'} par salle ayant au moins un créneau libre
+    """
+    if salles is None:
+        salles = Salle.objects.all()
+
+    candidates = salles.filter(est_disponible=True)
+    if capacite_min:
+        candidates = candidates.filter(capacite__gte=capacite_min)
+    if type_salle:
+        candidates = candidates.filter(type_salle=type_salle)
+    if batiment:
+        candidates = candidates.filter(batiment=batiment)
+    salles = list(candidates)
+
+    # Intervalles occupés, groupés par (salle, date)
+    occupations = {}
+    a_preciser = set()
+    masques = OccupationJournaliere.objects.filter(
+        salle__in=candidates.values('pk'),
+        date__gte=date_debut,
+        date__lte=date_fin
+    ).values_list('salle_id', 'date', 'plein', 'partiel')
+    for salle_id, jour, plein, partiel in masques:
+        plein, partiel = decoder(plein), decoder(partiel)
+        if plein == partiel:
+            # Chaque quart d'heure touché est entièrement couvert : les bits sont exacts
+            occupations[(salle_id, jour)] = intervalles(plein)
+        else:
+            a_preciser.add((salle_id, jour))
+
+    if a_preciser:
+        reservations = Reservation.objects.actives().filter(
+            salle_id__in={salle_id for salle_id, _ in a_preciser},
+            date_reservation__in={jour for _, jour in a_preciser}
+        ).order_by('salle_id', 'date_reservation', 'heure_debut').values_list(
+            'salle_id', 'date_reservation', 'heure_debut', 'heure_fin'
+        )
+        for salle_id, jour, debut, fin in reservations:
+            if (salle_id, jour) in a_preciser:
+                occupations.setdefault((salle_id, jour), []).append(
+                    (_en_minutes(debut), _en_minutes(fin))
+                )
+
+    if a_partir_de is None:
+        a_partir_de = timezone.localtime()
+    ouverture = _en_minutes(heure_ouverture)
+    fermeture = _en_minutes(heure_fermeture)
+    # Aujourd'hui, pas de créneau avant le prochain quart d'heure
+    aujourdhui, premier_quart = debut_recherche(a_partir_de)
+    ouverture_aujourdhui = max(ouverture, premier_quart)
+    jours = [
+        date_debut + timedelta(days=i) for i in range((date_fin - date_debut).days + 1)
+        if date_debut + timedelta(days=i) >= aujourdhui
+    ]
+
+    resultats = []
+    for salle in salles:
+        creneaux = []
+        for jour in jours:
+            curseur = ouverture_aujourdhui if jour == aujourdhui else ouverture
+            # Intervalles triés par début
+            for debut, fin in occupations.get((salle.pk, jour), ()):
+                if debut >= fermeture:
+                    break
+                if fin <= curseur:
+                    continue
+                if min(debut, fermeture) - curseur >= duree:
+                    creneaux.append(Creneau(jour, _en_heure(curseur), _en_heure(debut)))
+                curseur = max(curseur, fin)
+            if fermeture - curseur >= duree:
+                creneaux.append(Creneau(jour, _en_heure(curseur), _en_heure(fermeture)))
+        if creneaux:
+            resultats.append({'salle': salle, 'creneaux': creneaux})
+
+    return resultats
@@ -0,0 +1,131 @@
+"""
+Exports CSV (réservations, données des rapports)
+
+Les lignes sont lues par values_list(...).iterator() et écrites une à une
+dans une StreamingHttpResponse : la mémoire reste constante quel que soit
+le nombre de lignes et le premier octet part tout de suite.
+"""
+import csv
+
+from django.db.models import CharField
+from django.db.models.functions import Cast
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import Reservation
+
+
+TAILLE_LOT = 2000
+LIGNES_PAR_ENVOI = 200
+
+COLONNES_RESERVATIONS = [
+    ('pk', 'ID'),
+    ('date_reservation', 'Date'),
+    ('heure_debut', 'Début'),
+    ('heure_fin', 'Fin'),
+    ('salle__nom', 'Salle'),
+    ('salle__batiment', 'Bâtiment'),
+    ('utilisateur__username', 'Identifiant'),
+    ('utilisateur__last_name', 'Nom'),
+    ('utilisateur__first_name', 'Prénom'),
+    ('type_utilisateur', "Type d'utilisateur"),
+    ('statut', 'Statut'),
+    ('nombre_participants', 'Participants'),
+    ('motif', 'Motif'),
+    ('created_at', 'Créée le'),
+]
+
+# Colonnes écrites telles que la base les rend en texte
+CHAMPS_TEXTE = {'date_reservation', 'heure_debut', 'heure_fin'}
+
+# Horodatage stocké en UTC : écrit à l'heure locale (TIME_ZONE)
+INDEX_CREATION = [champ for champ, _ in COLONNES_RESERVATIONS].index('created_at')
+FORMAT_CREATION = '%Y-%m-%d %H:%M:%S'
+
+
+class _Tampon:
+    """Pseudo-fichier : write() renvoie la ligne au lieu de la stocker"""
+
+    def write(self, valeur):
+        return valeur
+
+
+def reponse_csv(lignes, nom_fichier):
+    """
+    StreamingHttpResponse CSV (séparateur « ; » et BOM pour Excel)
+
+    Args:
+        lignes: Itérable de listes (la première est l'en-tête)
+        nom_fichier: Nom proposé au téléchargement
+    """
+    ecrivain = csv.writer(_Tampon(), delimiter=';')
+
+    def contenu():
+        # Envoi par paquets de lignes : un morceau par ligne coûte plus cher
+        # en passages dans la pile WSGI qu'en écriture CSV
+        paquet = ['﻿']
+        for ligne in lignes:
+            paquet.append(ecrivain.writerow(ligne))
+            if len(paquet) >= LIGNES_PAR_ENVOI:
+                yield ''.join(paquet)
+                paquet = []
+        yield ''.join(paquet)
+
+    reponse = StreamingHttpResponse(contenu(), content_type='text/csv; charset=utf-8')
+    reponse['Content-Disposition'] = f'attachment; filename="{nom_fichier}"'
+    return reponse
+
+
+def reservations_filtrees(date_debut=None, date_fin=None, salle=None, statut=None, type_utilisateur=None):
+    """Réservations correspondant aux filtres de l'export"""
+    reservations = Reservation.objects.all()
+    if date_debut:
+        reservations = reservations.filter(date_reservation__gte=date_debut)
+    if date_fin:
+        reservations = reservations.filter(date_reservation__lte=date_fin)
+    if salle:
+        reservations = reservations.filter(salle=salle)
+    if statut:
+        reservations = reservations.filter(statut=statut)
+    if type_utilisateur:
+        reservations = reservations.filter(type_utilisateur=type_utilisateur)
+    return reservations
+
+
+def lignes_reservations(reservations):
+    """
+    En-tête puis un tuple par réservation, lus par lots
+
+    Dates et heures sont lues comme texte (Cast) : les convertir en objets
+    Python pour les réécrire aussitôt en texte coûtait plus que la lecture.
+    La date de création fait exception : la base la rend en UTC, elle est
+    convertie à l'heure locale.
+    """
+    yield [titre for _, titre in COLONNES_RESERVATIONS]
+    textes = {f'{champ}_texte': Cast(champ, CharField()) for champ in CHAMPS_TEXTE}
+    lignes = reservations.order_by('date_reservation', 'heure_debut', 'pk').annotate(**textes).values_list(
+        *[f'{champ}_texte' if champ in CHAMPS_TEXTE else champ for champ, _ in COLONNES_RESERVATIONS]
+    ).iterator(chunk_size=TAILLE_LOT)
+    for ligne in lignes:
+        ligne = list(ligne)
+        ligne[INDEX_CREATION] = timezone.localtime(ligne[INDEX_CREATION]).strftime(FORMAT_CREATION)
+        yield ligne
+
+
+def lignes_rapport(rapport):
+    """
+    Données d'un rapport à plat : une ligne (section, clé, valeur...) par entrée
+
+    Les valeurs simples vont dans la section « resume », les dictionnaires
+    et les listes de paires/triplets donnent une section chacun.
+    """
+    yield ['Section', 'Clé', 'Valeur', 'Détail']
+    for section, valeur in rapport.donnees.items():
+        if isinstance(valeur, dict):
+            for cle, detail in valeur.items():
+                yield [section, cle, detail]
+        elif isinstance(valeur, list):
+            for element in valeur:
+                yield [section, *element] if isinstance(element, (list, tuple)) else [section, element]
+        else:
+            yield ['resume', section, valeur]
@@ -1,249 +1,515 @@
-"""
-Forms Django pour le système de réservation
-"""
-from django import forms
-from django.contrib.auth.forms import UserCreationForm
-from django.core.exceptions import ValidationError
-from .models import Utilisateur, Salle, Reservation
-
-
-class LoginForm(forms.Form):
-    """Form de connexion"""
-    username = forms.CharField(
-        label='Nom d\'utilisateur',
-        widget=forms.TextInput(attrs={
-            'class': 'form-control',
-            'placeholder': 'Votre nom d\'utilisateur'
-        })
-    )
-    password = forms.CharField(
-        label='Mot de passe',
-        widget=forms.PasswordInput(attrs={
-            'class': 'form-control',
-            'placeholder': 'Votre mot de passe'
-        })
-    )
-
-
-class InscriptionForm(UserCreationForm):
-    """Form d'inscription"""
-    email = forms.EmailField(required=True)
-    
-    class Meta:
-        model = Utilisateur
-        fields = ['username', 'email', 'first_name', 'last_name', 'password1', 
-                  'password2', 'type_utilisateur', 'niveau', 'departement']
-        widgets = {
-            'username': forms.TextInput(attrs={'class': 'form-control'}),
-            'email': forms.EmailInput(attrs={'class': 'form-control'}),
-            'first_name': forms.TextInput(attrs={'class': 'form-control'}),
-            'last_name': forms.TextInput(attrs={'class': 'form-control'}),
-            'type_utilisateur': forms.Select(attrs={'class': 'form-select'}),
-            'niveau': forms.Select(attrs={'class': 'form-select'}),
-            'departement': forms.TextInput(attrs={'class': 'form-control'}),
-        }
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields['password1'].widget.attrs['class'] = 'form-control'
-        self.fields['password2'].widget.attrs['class'] = 'form-control'
-
-
-class ReservationForm(forms.ModelForm):
-    """Form de création/modification de réservation"""
-    
-    class Meta:
-        model = Reservation
-        fields = ['salle', 'date_reservation', 'heure_debut', 'heure_fin', 
-                  'motif', 'nombre_participants']
-        widgets = {
-            'salle': forms.Select(attrs={'class': 'form-select'}),
-            'date_reservation': forms.DateInput(attrs={
-                'class': 'form-control',
-                'type': 'date',
-                'min': '',  # Sera rempli dynamiquement
-            }),
-            'heure_debut': forms.TimeInput(attrs={
-                'class': 'form-control',
-                'type': 'time'
-            }),
-            'heure_fin': forms.TimeInput(attrs={
-                'class': 'form-control',
-                'type': 'time'
-            }),
-            'motif': forms.Textarea(attrs={
-                'class': 'form-control',
-                'rows': 3,
-                'placeholder': 'Décrivez le motif de votre réservation...'
-            }),
-            'nombre_participants': forms.NumberInput(attrs={
-                'class': 'form-control',
-                'min': 1
-            }),
-        }
-    
-    def __init__(self, *args, **kwargs):
-        self.user = kwargs.pop('user', None)
-        self.salle = kwargs.pop('salle', None)
-        super().__init__(*args, **kwargs)
-        
-        # Limiter les salles disponibles
-        self.fields['salle'].queryset = Salle.objects.filter(est_disponible=True)
-        
-        # Si une salle est pré-sélectionnée
-        if self.salle:
-            self.fields['salle'].initial = self.salle
-            self.fields['salle'].disabled = True
-        
-        # Date minimale = aujourd'hui
-        from datetime import date
-        self.fields['date_reservation'].widget.attrs['min'] = date.today().isoformat()
-
-
-class SalleForm(forms.ModelForm):
-    """Form de création/modification de salle (admin)"""
-    
-    class Meta:
-        model = Salle
-        fields = ['nom', 'batiment', 'etage', 'capacite', 'type_salle', 
-                  'equipements', 'description', 'est_disponible']
-        widgets = {
-            'nom': forms.TextInput(attrs={'class': 'form-control'}),
-            'batiment': forms.TextInput(attrs={'class': 'form-control'}),
-            'etage': forms.NumberInput(attrs={'class': 'form-control'}),
-            'capacite': forms.NumberInput(attrs={'class': 'form-control'}),
-            'type_salle': forms.Select(attrs={'class': 'form-select'}),
-            'description': forms.Textarea(attrs={
-                'class': 'form-control',
-                'rows': 3
-            }),
-            'est_disponible': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
-        }
-    
-    # Champ pour les équipements (transformé en checkboxes)
-    equipement_videoprojecteur = forms.BooleanField(required=False, label='Vidéoprojecteur')
-    equipement_ordinateur = forms.BooleanField(required=False, label='Ordinateur')
-    equipement_tableau_blanc = forms.BooleanField(required=False, label='Tableau blanc')
-    equipement_ecran = forms.BooleanField(required=False, label='Écran')
-    equipement_microphone = forms.BooleanField(required=False, label='Microphone')
-    equipement_climatisation = forms.BooleanField(required=False, label='Climatisation')
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        
-        # Si on édite une salle existante, pré-cocher les équipements
-        if self.instance and self.instance.pk:
-            equipements = self.instance.equipements or []
-            self.fields['equipement_videoprojecteur'].initial = 'Vidéoprojecteur' in equipements
-            self.fields['equipement_ordinateur'].initial = 'Ordinateur' in equipements
-            self.fields['equipement_tableau_blanc'].initial = 'Tableau blanc' in equipements
-            self.fields['equipement_ecran'].initial = 'Écran' in equipements
-            self.fields['equipement_microphone'].initial = 'Microphone' in equipements
-            self.fields['equipement_climatisation'].initial = 'Climatisation' in equipements
-    
-    def save(self, commit=True):
-        instance = super().save(commit=False)
-        
-        # Construire la liste des équipements
-        equipements = []
-        if self.cleaned_data.get('equipement_videoprojecteur'):
-            equipements.append('Vidéoprojecteur')
-        if self.cleaned_data.get('equipement_ordinateur'):
-            equipements.append('Ordinateur')
-        if self.cleaned_data.get('equipement_tableau_blanc'):
-            equipements.append('Tableau blanc')
-        if self.cleaned_data.get('equipement_ecran'):
-            equipements.append('Écran')
-        if self.cleaned_data.get('equipement_microphone'):
-            equipements.append('Microphone')
-        if self.cleaned_data.get('equipement_climatisation'):
-            equipements.append('Climatisation')
-        
-        instance.equipements = equipements
-        
-        if commit:
-            instance.save()
-        
-        return instance
-
-
-class RechercheForm(forms.Form):
-    """Form de recherche de salles disponibles"""
-    date_reservation = forms.DateField(
-        label='Date',
-        widget=forms.DateInput(attrs={
-            'class': 'form-control',
-            'type': 'date',
-            'min': '',  # Sera rempli par JS
-        })
-    )
-    heure_debut = forms.TimeField(
-        label='Heure de début',
-        widget=forms.TimeInput(attrs={
-            'class': 'form-control',
-            'type': 'time'
-        })
-    )
-    heure_fin = forms.TimeField(
-        label='Heure de fin',
-        widget=forms.TimeInput(attrs={
-            'class': 'form-control',
-            'type': 'time'
-        })
-    )
-    capacite_min = forms.IntegerField(
-        label='Capacité minimale',
-        required=False,
-        widget=forms.NumberInput(attrs={
-            'class': 'form-control',
-            'placeholder': 'Ex: 30'
-        })
-    )
-    type_salle = forms.ChoiceField(
-        label='Type de salle',
-        required=False,
-        choices=[('', 'Tous')] + list(Salle.TYPE_CHOICES),
-        widget=forms.Select(attrs={'class': 'form-select'})
-    )
-    batiment = forms.CharField(
-        label='Bâtiment',
-        required=False,
-        widget=forms.TextInput(attrs={
-            'class': 'form-control',
-            'placeholder': 'Ex: Bâtiment A'
-        })
-    )
-    
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        from datetime import date
-        self.fields['date_reservation'].widget.attrs['min'] = date.today().isoformat()
-
-
-class RapportForm(forms.Form):
-    """Form de génération de rapport (admin)"""
-    date_debut = forms.DateField(
-        label='Date de début',
-        widget=forms.DateInput(attrs={
-            'class': 'form-control',
-            'type': 'date'
-        })
-    )
-    date_fin = forms.DateField(
-        label='Date de fin',
-        widget=forms.DateInput(attrs={
-            'class': 'form-control',
-            'type': 'date'
-        })
-    )
-    
-    def clean(self):
-        cleaned_data = super().clean()
-        date_debut = cleaned_data.get('date_debut')
-        date_fin = cleaned_data.get('date_fin')
-        
-        if date_debut and date_fin:
-            if date_fin < date_debut:
-                raise ValidationError('La date de fin doit être après la date de début')
-        
-        return cleaned_data
\ No newline at end of file
+"""
+Forms Django pour le système de réservation
+"""
+from django import forms
+from django.contrib.auth.forms import UserCreationForm
+from django.core.exceptions import ValidationError
+from .models import Utilisateur, Salle, Reservation, SerieReservation
+from .catalogue import facettes_salles
+
+
+class LoginForm(forms.Form):
+    """Form de connexion"""
+    username = forms.CharField(
+        label='Nom d\'utilisateur',
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Votre nom d\'utilisateur'
+        })
+    )
+    password = forms.CharField(
+        label='Mot de passe',
+        widget=forms.PasswordInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Votre mot de passe'
+        })
+    )
+
+
+class InscriptionForm(UserCreationForm):
+    """Form d'inscription"""
+    email = forms.EmailField(required=True)
+    
+    class Meta:
+        model = Utilisateur
+        fields = ['username', 'email', 'first_name', 'last_name', 'password1', 
+                  'password2', 'type_utilisateur', 'niveau', 'departement']
+        widgets = {
+            'username': forms.TextInput(attrs={'class': 'form-control'}),
+            'email': forms.EmailInput(attrs={'class': 'form-control'}),
+            'first_name': forms.TextInput(attrs={'class': 'form-control'}),
+            'last_name': forms.TextInput(attrs={'class': 'form-control'}),
+            'type_utilisateur': forms.Select(attrs={'class': 'form-select'}),
+            'niveau': forms.Select(attrs={'class': 'form-select'}),
+            'departement': forms.TextInput(attrs={'class': 'form-control'}),
+        }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields['password1'].widget.attrs['class'] = 'form-control'
+        self.fields['password2'].widget.attrs['class'] = 'form-control'
+
+
+class ReservationForm(forms.ModelForm):
+    """Form de création/modification de réservation"""
+    
+    class Meta:
+        model = Reservation
+        fields = ['salle', 'date_reservation', 'heure_debut', 'heure_fin', 
+                  'motif', 'nombre_participants']
+        widgets = {
+            'salle': forms.Select(attrs={'class': 'form-select'}),
+            'date_reservation': forms.DateInput(attrs={
+                'class': 'form-control',
+                'type': 'date',
+                'min': '',  # Sera rempli dynamiquement
+            }),
+            'heure_debut': forms.TimeInput(attrs={
+                'class': 'form-control',
+                'type': 'time'
+            }),
+            'heure_fin': forms.TimeInput(attrs={
+                'class': 'form-control',
+                'type': 'time'
+            }),
+            'motif': forms.Textarea(attrs={
+                'class': 'form-control',
+                'rows': 3,
+                'placeholder': 'Décrivez le motif de votre réservation...'
+            }),
+            'nombre_participants': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': 1
+            }),
+        }
+    
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        self.salle = kwargs.pop('salle', None)
+        super().__init__(*args, **kwargs)
+        
+        # Limiter les salles disponibles
+        self.fields['salle'].queryset = Salle.objects.filter(est_disponible=True)
+        
+        # Si une salle est pré-sélectionnée
+        if self.salle:
+            self.fields['salle'].initial = self.salle
+            self.fields['salle'].disabled = True
+        
+        # Date minimale = aujourd'hui
+        from datetime import date
+        self.fields['date_reservation'].widget.attrs['min'] = date.today().isoformat()
+
+
+class SerieReservationForm(forms.ModelForm):
+    """Form de création d'une série de réservations récurrentes"""
+    
+    # Nombre maximal d'occurrences dans une série
+    OCCURRENCES_MAX = 52
+    
+    dates_exclues = forms.CharField(
+        label='Dates exclues',
+        required=False,
+        help_text='Séparées par des virgules (ex: 01/11/2026, 11/11/2026)',
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Ex: 01/11/2026, 11/11/2026'
+        })
+    )
+    ignorer_conflits = forms.BooleanField(
+        label='Réserver quand même les dates libres si certaines sont en conflit',
+        required=False,
+        widget=forms.CheckboxInput(attrs={'class': 'form-check-input'})
+    )
+    
+    class Meta:
+        model = SerieReservation
+        fields = ['salle', 'frequence', 'date_debut', 'date_fin', 'heure_debut',
+                  'heure_fin', 'motif', 'nombre_participants']
+        widgets = {
+            'salle': forms.Select(attrs={'class': 'form-select'}),
+            'frequence': forms.Select(attrs={'class': 'form-select'}),
+            'date_debut': forms.DateInput(attrs={
+                'class': 'form-control',
+                'type': 'date'
+            }),
+            'date_fin': forms.DateInput(attrs={
+                'class': 'form-control',
+                'type': 'date'
+            }),
+            'heure_debut': forms.TimeInput(attrs={
+                'class': 'form-control',
+                'type': 'time'
+            }),
+            'heure_fin': forms.TimeInput(attrs={
+                'class': 'form-control',
+                'type': 'time'
+            }),
+            'motif': forms.Textarea(attrs={
+                'class': 'form-control',
+                'rows': 3,
+                'placeholder': 'Décrivez le motif de votre réservation...'
+            }),
+            'nombre_participants': forms.NumberInput(attrs={
+                'class': 'form-control',
+                'min': 1
+            }),
+        }
+    
+    def __init__(self, *args, **kwargs):
+        self.user = kwargs.pop('user', None)
+        super().__init__(*args, **kwargs)
+        
+        self.fields['salle'].queryset = Salle.objects.filter(est_disponible=True)
+        
+        from datetime import date
+        self.fields['date_debut'].widget.attrs['min'] = date.today().isoformat()
+        self.fields['date_fin'].widget.attrs['min'] = date.today().isoformat()
+    
+    def clean_dates_exclues(self):
+        """Convertit la liste saisie en dates ISO"""
+        champ_date = forms.DateField()
+        dates = []
+        for valeur in self.cleaned_data.get('dates_exclues', '').split(','):
+            valeur = valeur.strip()
+            if valeur:
+                dates.append(champ_date.clean(valeur).isoformat())
+        return dates
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        date_debut = cleaned_data.get('date_debut')
+        date_fin = cleaned_data.get('date_fin')
+        
+        if date_debut and date_fin and date_fin < date_debut:
+            raise ValidationError('La date de fin doit être après la date de début')
+        
+        return cleaned_data
+    
+    def _post_clean(self):
+        super()._post_clean()
+        serie = self.instance
+        serie.exceptions = self.cleaned_data.get('dates_exclues', [])
+        if self.user is not None:
+            serie.utilisateur = self.user
+        
+        if self.errors:
+            return
+        
+        # Mêmes règles qu'une réservation simple, vérifiées une seule fois
+        # sur la première occurrence (le créneau est identique pour toutes)
+        try:
+            Reservation(
+                salle=serie.salle,
+                date_reservation=serie.date_debut,
+                heure_debut=serie.heure_debut,
+                heure_fin=serie.heure_fin,
+                nombre_participants=serie.nombre_participants,
+            ).verifier_regles()
+        except ValidationError as e:
+            self.add_error(None, e.messages)
+            return
+        
+        nombre = len(serie.dates())
+        if nombre == 0:
+            self.add_error(None, 'La série ne contient aucune date')
+        elif nombre > self.OCCURRENCES_MAX:
+            self.add_error(None, f'Une série ne peut pas dépasser {self.OCCURRENCES_MAX} occurrences')
+
+
+class SalleForm(forms.ModelForm):
+    """Form de création/modification de salle (admin)"""
+    
+    class Meta:
+        model = Salle
+        fields = ['nom', 'batiment', 'etage', 'capacite', 'type_salle', 
+                  'equipements', 'description', 'est_disponible']
+        widgets = {
+            'nom': forms.TextInput(attrs={'class': 'form-control'}),
+            'batiment': forms.TextInput(attrs={'class': 'form-control'}),
+            'etage': forms.NumberInput(attrs={'class': 'form-control'}),
+            'capacite': forms.NumberInput(attrs={'class': 'form-control'}),
+            'type_salle': forms.Select(attrs={'class': 'form-select'}),
+            'description': forms.Textarea(attrs={
+                'class': 'form-control',
+                'rows': 3
+            }),
+            'est_disponible': forms.CheckboxInput(attrs={'class': 'form-check-input'}),
+        }
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        
+        # Une case à cocher par équipement filtrable (equipement_<code>),
+        # pré-cochée si on édite une salle qui en est dotée
+        masque = Salle.masque_liste(self.instance.equipements) if self.instance.pk else 0
+        for rang, (code, libelle) in enumerate(Salle.EQUIPEMENT_CHOICES):
+            self.fields[f'equipement_{code}'] = forms.BooleanField(
+                required=False, label=libelle, initial=bool(masque & (1 << rang))
+            )
+    
+    def save(self, commit=True):
+        instance = super().save(commit=False)
+        
+        # Construire la liste des équipements : cases cochées, plus les
+        # équipements hors liste déjà présents (import, administration)
+        equipements = [
+            libelle for code, libelle in Salle.EQUIPEMENT_CHOICES
+            if self.cleaned_data.get(f'equipement_{code}')
+        ]
+        equipements += [
+            equipement for equipement in self.initial.get('equipements') or []
+            if not Salle.masque_liste([equipement])
+        ]
+        
+        instance.equipements = equipements
+        
+        if commit:
+            instance.save()
+        
+        return instance
+
+
+class RechercheForm(forms.Form):
+    """Form de recherche de salles disponibles"""
+    date_reservation = forms.DateField(
+        label='Date',
+        widget=forms.DateInput(attrs={
+            'class': 'form-control',
+            'type': 'date',
+            'min': '',  # Sera rempli par JS
+        })
+    )
+    heure_debut = forms.TimeField(
+        label='Heure de début',
+        widget=forms.TimeInput(attrs={
+            'class': 'form-control',
+            'type': 'time'
+        })
+    )
+    heure_fin = forms.TimeField(
+        label='Heure de fin',
+        widget=forms.TimeInput(attrs={
+            'class': 'form-control',
+            'type': 'time'
+        })
+    )
+    capacite_min = forms.IntegerField(
+        label='Capacité minimale',
+        required=False,
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Ex: 30'
+        })
+    )
+    type_salle = forms.ChoiceField(
+        label='Type de salle',
+        required=False,
+        choices=[('', 'Tous')] + list(Salle.TYPE_CHOICES),
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    batiment = forms.ChoiceField(
+        label='Bâtiment',
+        required=False,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    equipements = forms.MultipleChoiceField(
+        label='Équipements',
+        required=False,
+        choices=Salle.EQUIPEMENT_CHOICES,
+        widget=forms.CheckboxSelectMultiple(attrs={'class': 'form-check-input'})
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from datetime import date
+        self.fields['date_reservation'].widget.attrs['min'] = date.today().isoformat()
+        # Bâtiments ayant des salles disponibles (facettes en cache)
+        self.fields['batiment'].choices = [('', 'Tous')] + [
+            (batiment, f'{batiment} ({nombre})') for batiment, nombre in facettes_salles().batiments
+        ]
+    
+    def salles_disponibles(self):
+        """Salles libres correspondant aux critères (form valide requis)"""
+        from .disponibilite import salles_disponibles
+        
+        return salles_disponibles(
+            self.cleaned_data['date_reservation'],
+            self.cleaned_data['heure_debut'],
+            self.cleaned_data['heure_fin'],
+            capacite_min=self.cleaned_data.get('capacite_min'),
+            type_salle=self.cleaned_data.get('type_salle'),
+            batiment=self.cleaned_data.get('batiment'),
+            equipements=self.cleaned_data.get('equipements'),
+        )
+
+
+class CreneauxLibresForm(forms.Form):
+    """Form de recherche de créneaux libres sur une période"""
+    DUREE_CHOICES = [
+        (minutes, f"{minutes // 60}h{minutes % 60:02d}" if minutes >= 60 else f"{minutes} min")
+        for minutes in range(Reservation.DUREE_MIN, Reservation.DUREE_MAX + 1, 30)
+    ]
+    
+    # Période maximale explorée en une recherche (en jours)
+    PERIODE_MAX = 31
+    
+    date_debut = forms.DateField(
+        label='Du',
+        widget=forms.DateInput(attrs={
+            'class': 'form-control',
+            'type': 'date'
+        })
+    )
+    date_fin = forms.DateField(
+        label='Au',
+        widget=forms.DateInput(attrs={
+            'class': 'form-control',
+            'type': 'date'
+        })
+    )
+    duree = forms.TypedChoiceField(
+        label='Durée minimale',
+        choices=DUREE_CHOICES,
+        coerce=int,
+        initial=60,
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    capacite_min = forms.IntegerField(
+        label='Capacité minimale',
+        required=False,
+        min_value=1,
+        widget=forms.NumberInput(attrs={
+            'class': 'form-control',
+            'placeholder': 'Ex: 30'
+        })
+    )
+    type_salle = forms.ChoiceField(
+        label='Type de salle',
+        required=False,
+        choices=[('', 'Tous')] + list(Salle.TYPE_CHOICES),
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        from datetime import date
+        self.fields['date_debut'].widget.attrs['min'] = date.today().isoformat()
+        self.fields['date_fin'].widget.attrs['min'] = date.today().isoformat()
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        date_debut = cleaned_data.get('date_debut')
+        date_fin = cleaned_data.get('date_fin')
+        
+        if date_debut and date_fin:
+            from datetime import date
+            if date_debut < date.today():
+                raise ValidationError('La date de début ne peut pas être dans le passé')
+            if date_fin < date_debut:
+                raise ValidationError('La date de fin doit être après la date de début')
+            if (date_fin - date_debut).days >= self.PERIODE_MAX:
+                raise ValidationError(f'La période ne peut pas dépasser {self.PERIODE_MAX} jours')
+        
+        return cleaned_data
+    
+    def creneaux_libres(self):
+        """Créneaux libres par salle (form valide requis)"""
+        from .disponibilite import creneaux_libres
+        
+        return creneaux_libres(
+            self.cleaned_data['date_debut'],
+            self.cleaned_data['date_fin'],
+            self.cleaned_data['duree'],
+            capacite_min=self.cleaned_data.get('capacite_min'),
+            type_salle=self.cleaned_data.get('type_salle'),
+        )
+
+
+class RapportForm(forms.Form):
+    """Form de génération de rapport (admin)"""
+    type_rapport = forms.ChoiceField(
+        label='Type de rapport',
+        choices=[
+            ('utilisation', 'Utilisation (réservations par statut, utilisateur, salle)'),
+            ('occupation', "Occupation (taux d'occupation des salles)"),
+        ],
+        initial='utilisation',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    date_debut = forms.DateField(
+        label='Date de début',
+        widget=forms.DateInput(attrs={
+            'class': 'form-control',
+            'type': 'date'
+        })
+    )
+    date_fin = forms.DateField(
+        label='Date de fin',
+        widget=forms.DateInput(attrs={
+            'class': 'form-control',
+            'type': 'date'
+        })
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        date_debut = cleaned_data.get('date_debut')
+        date_fin = cleaned_data.get('date_fin')
+        
+        if date_debut and date_fin:
+            if date_fin < date_debut:
+                raise ValidationError('La date de fin doit être après la date de début')
+        
+        return cleaned_data
+
+
+class ExportReservationsForm(forms.Form):
+    """Filtres de l'export CSV des réservations (admin)"""
+    date_debut = forms.DateField(
+        label='Du',
+        required=False,
+        widget=forms.DateInput(attrs={
+            'class': 'form-control',
+            'type': 'date',
+            'min': '',  # Dates passées autorisées (pas de minimum posé par main.js)
+        })
+    )
+    date_fin = forms.DateField(
+        label='Au',
+        required=False,
+        widget=forms.DateInput(attrs={
+            'class': 'form-control',
+            'type': 'date',
+            'min': '',  # Dates passées autorisées (pas de minimum posé par main.js)
+        })
+    )
+    salle = forms.ModelChoiceField(
+        label='Salle',
+        required=False,
+        queryset=Salle.objects.all(),
+        empty_label='Toutes',
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    statut = forms.ChoiceField(
+        label='Statut',
+        required=False,
+        choices=[('', 'Tous')] + list(Reservation.STATUT_CHOICES),
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    type_utilisateur = forms.ChoiceField(
+        label="Type d'utilisateur",
+        required=False,
+        choices=[('', 'Tous')] + list(Utilisateur.TYPE_CHOICES),
+        widget=forms.Select(attrs={'class': 'form-select'})
+    )
+    
+    def clean(self):
+        cleaned_data = super().clean()
+        date_debut = cleaned_data.get('date_debut')
+        date_fin = cleaned_data.get('date_fin')
+        
+        if date_debut and date_fin and date_fin < date_debut:
+            raise ValidationError('La date de fin doit être après la date de début')
+        
+        return cleaned_data
@@ -0,0 +1,425 @@
+"""
+Import en masse de salles et de réservations (CSV ou JSON)
+
+Les lignes sont traitées par lots : validation en Python sans requête par
+ligne (salles et utilisateurs du lot lus en une requête), conflits
+cherchés en une passe par couple (salle, jour) contre la base et contre
+les lignes du fichier déjà acceptées, puis écriture par bulk_create dans
+une transaction par lot.
+
+bulk_create n'envoie pas les signaux : compteurs, agrégat journalier,
+index d'occupation, cache des tableaux de bord et version du catalogue
+des salles sont mis à jour en une fois par lot. Aucune notification n'est créée pour les réservations
+importées.
+"""
+import csv
+import json
+import re
+from collections import defaultdict, namedtuple
+from datetime import date, datetime, time
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Utilisateur, Salle, Reservation, VerrouCreneau
+from .rapports import ajuster_statistiques, deltas_reservations
+from .statistiques import invalider_statistiques
+from .catalogue import invalider_salles
+from .occupation import filtres_couples, reconstruire_jours
+from . import compteurs
+
+
+TAILLE_LOT = 5000
+
+# Numéro de ligne dans le fichier (ligne physique en CSV, position en JSON)
+# et messages d'erreur de la ligne rejetée
+ErreurLigne = namedtuple('ErreurLigne', ['ligne', 'messages'])
+ResultatImport = namedtuple('ResultatImport', ['lues', 'importees', 'erreurs'])
+
+VALEURS_VRAIES = {'1', 'true', 'vrai', 'oui', 'o', 'yes', 'y', 'x'}
+VALEURS_FAUSSES = {'0', 'false', 'faux', 'non', 'n', 'no', ''}
+
+
+def lire_fichier(chemin):
+    """
+    Lignes d'un fichier d'import : itérateur de (numéro de ligne, dict)
+
+    JSON : une liste d'objets. CSV : une ligne d'en-tête, séparateur « ; »
+    ou « , » (déduit de l'en-tête), encodage UTF-8 avec ou sans BOM.
+    """
+    if str(chemin).lower().endswith('.json'):
+        with open(chemin, encoding='utf-8-sig') as fichier:
+            donnees = json.load(fichier)
+        if not isinstance(donnees, list):
+            raise ValueError("Le fichier JSON doit contenir une liste d'objets")
+        for numero, ligne in enumerate(donnees, start=1):
+            yield numero, ligne if isinstance(ligne, dict) else {}
+        return
+
+    with open(chemin, encoding='utf-8-sig', newline='') as fichier:
+        entete = fichier.readline()
+        fichier.seek(0)
+        separateur = ';' if entete.count(';') >= entete.count(',') else ','
+        lecteur = csv.DictReader(fichier, delimiter=separateur)
+        for ligne in lecteur:
+            yield lecteur.line_num, {
+                cle.strip(): valeur.strip() if isinstance(valeur, str) else valeur
+                for cle, valeur in ligne.items() if cle
+            }
+
+
+def _par_lots(lignes, taille):
+    lignes = iter(lignes)
+    while lot := list(islice(lignes, taille)):
+        yield lot
+
+
+def _valeur(donnees, cle):
+    """Valeur d'une colonne, None si absente ou vide"""
+    valeur = donnees.get(cle)
+    if valeur is None or (isinstance(valeur, str) and not valeur.strip()):
+        return None
+    return valeur.strip() if isinstance(valeur, str) else valeur
+
+
+def _obligatoire(donnees, cle):
+    valeur = _valeur(donnees, cle)
+    if valeur is None:
+        raise ValidationError({cle: "Ce champ est obligatoire"})
+    return valeur
+
+
+def _entier(donnees, cle, defaut=None):
+    valeur = _valeur(donnees, cle)
+    if valeur is None:
+        if defaut is None:
+            raise ValidationError({cle: "Ce champ est obligatoire"})
+        return defaut
+    try:
+        return int(valeur)
+    except (TypeError, ValueError):
+        raise ValidationError({cle: f"Nombre entier attendu : « {valeur} »"})
+
+
+def _booleen(donnees, cle, defaut):
+    valeur = _valeur(donnees, cle)
+    if valeur is None:
+        return defaut
+    if isinstance(valeur, bool):
+        return valeur
+    texte = str(valeur).lower()
+    if texte in VALEURS_VRAIES:
+        return True
+    if texte in VALEURS_FAUSSES:
+        return False
+    raise ValidationError({cle: f"Valeur oui/non attendue : « {valeur} »"})
+
+
+def _date(donnees, cle):
+    valeur = str(_obligatoire(donnees, cle))
+    try:
+        return date.fromisoformat(valeur)
+    except ValueError:
+        pass
+    try:
+        return datetime.strptime(valeur, '%d/%m/%Y').date()
+    except ValueError:
+        pass
+    raise ValidationError({cle: f"Date attendue (AAAA-MM-JJ ou JJ/MM/AAAA) : « {valeur} »"})
+
+
+def _heure(donnees, cle):
+    valeur = str(_obligatoire(donnees, cle))
+    try:
+        heure = time.fromisoformat(valeur)
+    except ValueError:
+        raise ValidationError({cle: f"Heure attendue (HH:MM) : « {valeur} »"})
+    return heure.replace(second=0, microsecond=0, tzinfo=None)
+
+
+def _choix(donnees, cle, choix, defaut=None):
+    valeur = _valeur(donnees, cle)
+    if valeur is None:
+        if defaut is None:
+            raise ValidationError({cle: "Ce champ est obligatoire"})
+        return defaut
+    if valeur not in choix:
+        raise ValidationError({cle: f"« {valeur} » n'est pas un choix valide ({', '.join(choix)})"})
+    return valeur
+
+
+def _equipements(donnees):
+    valeur = _valeur(donnees, 'equipements')
+    if valeur is None:
+        return []
+    if isinstance(valeur, list):
+        return [str(element).strip() for element in valeur if str(element).strip()]
+    return [element.strip() for element in re.split(r'[|,]', str(valeur)) if element.strip()]
+
+
+def messages_erreur(erreur):
+    """Messages d'une ValidationError, préfixés par le champ concerné"""
+    if hasattr(erreur, 'error_dict'):
+        return [
+            message if champ == '__all__' else f"{champ} : {message}"
+            for champ, messages in erreur.message_dict.items()
+            for message in messages
+        ]
+    return list(erreur.messages)
+
+
+def _construire(constructeur, numero, donnees, erreurs):
+    """Objet construit pour une ligne, ou None (l'erreur est ajoutée au rapport)"""
+    try:
+        return constructeur(donnees)
+    except ValidationError as erreur:
+        erreurs.append(ErreurLigne(numero, messages_erreur(erreur)))
+        return None
+
+
+# Salles
+
+TYPES_SALLE = [valeur for valeur, _ in Salle.TYPE_CHOICES]
+
+
+def _salle(donnees):
+    equipements = _equipements(donnees)
+    salle = Salle(
+        nom=str(_obligatoire(donnees, 'nom')),
+        batiment=str(_obligatoire(donnees, 'batiment')),
+        etage=_entier(donnees, 'etage', defaut=0),
+        capacite=_entier(donnees, 'capacite'),
+        type_salle=_choix(donnees, 'type_salle', TYPES_SALLE),
+        equipements=equipements,
+        # bulk_create ne passe pas par Salle.save()
+        masque_equipements=Salle.masque_liste(equipements),
+        est_disponible=_booleen(donnees, 'est_disponible', True),
+        description=str(_valeur(donnees, 'description') or ''),
+    )
+    if salle.capacite < 1:
+        raise ValidationError({'capacite': "La capacité doit être d'au moins 1"})
+    for champ in ('nom', 'batiment'):
+        longueur = Salle._meta.get_field(champ).max_length
+        if len(getattr(salle, champ)) > longueur:
+            raise ValidationError({champ: f"{longueur} caractères au plus"})
+    return salle
+
+
+def importer_salles(lignes, taille_lot=TAILLE_LOT, simulation=False):
+    """
+    Importe des salles
+
+    Colonnes : nom, batiment, capacite, type_salle (obligatoires), etage,
+    equipements (liste JSON ou valeurs séparées par « | » ou « , »),
+    est_disponible, description. Une salle dont le nom existe déjà (en base
+    ou plus haut dans le fichier) est rejetée.
+
+    Args:
+        lignes: Itérable de (numéro de ligne, dict), voir lire_fichier
+        taille_lot: Nombre de lignes par transaction
+        simulation: Si True, valide sans rien écrire
+
+    Returns:
+        ResultatImport
+    """
+    noms = set(Salle.objects.values_list('nom', flat=True))
+    lues = importees = 0
+    erreurs = []
+
+    for lot in _par_lots(lignes, taille_lot):
+        lues += len(lot)
+        salles = []
+        for numero, donnees in lot:
+            salle = _construire(_salle, numero, donnees, erreurs)
+            if salle is None:
+                continue
+            if salle.nom in noms:
+                erreurs.append(ErreurLigne(numero, [f"nom : une salle « {salle.nom} » existe déjà"]))
+                continue
+            noms.add(salle.nom)
+            salles.append(salle)
+
+        if salles and not simulation:
+            with transaction.atomic():
+                Salle.objects.bulk_create(salles, batch_size=1000)
+                compteurs.incrementer('salles', len(salles))
+                transaction.on_commit(invalider_salles)
+        importees += len(salles)
+
+    return ResultatImport(lues, importees, erreurs)
+
+
+# Réservations
+
+STATUTS = [valeur for valeur, _ in Reservation.STATUT_CHOICES]
+
+
+def _utilisateurs(noms):
+    return {
+        utilisateur.username: utilisateur
+        for utilisateur in Utilisateur.objects.filter(username__in=noms).only('pk', 'username', 'type_utilisateur')
+    }
+
+
+def importer_reservations(lignes, taille_lot=TAILLE_LOT, simulation=False):
+    """
+    Importe des réservations
+
+    Colonnes : salle (nom), utilisateur (identifiant), date_reservation,
+    heure_debut, heure_fin, motif, nombre_participants (obligatoires),
+    statut (statut initial de l'utilisateur par défaut).
+
+    Les règles de Reservation.verifier_regles s'appliquent (pas de date
+    passée, durée, capacité). Pour chaque lot, les verrous (salle, date)
+    sont posés, les réservations actives des couples du lot sont lues en
+    une requête, puis chaque ligne est comparée, dans l'ordre du fichier,
+    aux réservations existantes et aux lignes déjà acceptées : la première
+    ligne d'un conflit l'emporte, les suivantes sont rejetées.
+
+    Args:
+        lignes: Itérable de (numéro de ligne, dict), voir lire_fichier
+        taille_lot: Nombre de lignes par transaction
+        simulation: Si True, valide (conflits compris) sans rien écrire
+
+    Returns:
+        ResultatImport
+    """
+    salles = {salle.nom: salle for salle in Salle.objects.only('pk', 'nom', 'capacite', 'est_disponible')}
+    utilisateurs = {}
+    # Créneaux acceptés lors des lots précédents, en simulation seulement :
+    # sinon ils sont en base et relus avec les autres
+    simules = defaultdict(list)
+    lues = importees = 0
+    erreurs = []
+
+    def construire(donnees):
+        nom_salle = str(_obligatoire(donnees, 'salle'))
+        salle = salles.get(nom_salle)
+        if salle is None:
+            raise ValidationError({'salle': f"Salle inconnue : « {nom_salle} »"})
+        if not salle.est_disponible:
+            raise ValidationError({'salle': f"La salle « {nom_salle} » est hors service"})
+        identifiant = str(_obligatoire(donnees, 'utilisateur'))
+        utilisateur = utilisateurs.get(identifiant)
+        if utilisateur is None:
+            raise ValidationError({'utilisateur': f"Utilisateur inconnu : « {identifiant} »"})
+
+        reservation = Reservation(
+            utilisateur=utilisateur,
+            type_utilisateur=utilisateur.type_utilisateur,
+            salle=salle,
+            date_reservation=_date(donnees, 'date_reservation'),
+            heure_debut=_heure(donnees, 'heure_debut'),
+            heure_fin=_heure(donnees, 'heure_fin'),
+            motif=str(_obligatoire(donnees, 'motif')),
+            nombre_participants=_entier(donnees, 'nombre_participants'),
+            statut=_choix(donnees, 'statut', STATUTS, defaut=Reservation.statut_initial(utilisateur)),
+        )
+        if reservation.nombre_participants < 1:
+            raise ValidationError({'nombre_participants': "Au moins 1 participant"})
+        reservation.verifier_regles()
+        return reservation
+
+    for lot in _par_lots(lignes, taille_lot):
+        lues += len(lot)
+        manquants = {
+            str(donnees.get('utilisateur', '')).strip() for _, donnees in lot
+        } - utilisateurs.keys()
+        if manquants:
+            # Les identifiants inconnus restent à None : pas de nouvelle requête au lot suivant
+            utilisateurs.update(dict.fromkeys(manquants))
+            utilisateurs.update(_utilisateurs(manquants))
+
+        candidates = []
+        for numero, donnees in lot:
+            reservation = _construire(construire, numero, donnees, erreurs)
+            if reservation is not None:
+                candidates.append((numero, reservation))
+
+        with transaction.atomic():
+            acceptees = _sans_conflits(candidates, erreurs, simules if simulation else None)
+            if acceptees and not simulation:
+                _enregistrer(acceptees)
+        importees += len(acceptees)
+
+    return ResultatImport(lues, importees, erreurs)
+
+
+def _sans_conflits(candidates, erreurs, simules=None):
+    """
+    Réservations du lot sans conflit, dans l'ordre du fichier
+
+    Args:
+        candidates: [(numéro de ligne, réservation)] valides
+        erreurs: Rapport auquel ajouter les lignes en conflit
+        simules: {(salle_id, date): [(début, fin)]} des lots précédents non
+            enregistrés (simulation), complété avec ce lot
+    """
+    couples = {
+        (reservation.salle_id, reservation.date_reservation)
+        for _, reservation in candidates if reservation.statut in Reservation.STATUTS_ACTIFS
+    }
+    occupes = defaultdict(list)
+    if couples:
+        if simules is None:
+            VerrouCreneau.verrouiller_couples(couples)
+        for filtre in filtres_couples(couples):
+            existantes = Reservation.objects.actives().filter(filtre).values_list(
+                'salle_id', 'date_reservation', 'heure_debut', 'heure_fin'
+            )
+            for salle_id, jour, debut, fin in existantes:
+                occupes[(salle_id, jour)].append((debut, fin))
+        if simules is not None:
+            for couple in couples:
+                occupes[couple].extend(simules[couple])
+
+    acceptees = []
+    for numero, reservation in candidates:
+        if reservation.statut in Reservation.STATUTS_ACTIFS:
+            couple = (reservation.salle_id, reservation.date_reservation)
+            creneaux = occupes[couple]
+            conflit = next(
+                ((debut, fin) for debut, fin in creneaux
+                 if debut < reservation.heure_fin and fin > reservation.heure_debut),
+                None
+            )
+            if conflit:
+                erreurs.append(ErreurLigne(numero, [
+                    f"Salle déjà réservée de {conflit[0]:%H:%M} à {conflit[1]:%H:%M}"
+                ]))
+                continue
+            creneaux.append((reservation.heure_debut, reservation.heure_fin))
+            if simules is not None:
+                simules[couple].append((reservation.heure_debut, reservation.heure_fin))
+        acceptees.append(reservation)
+    return acceptees
+
+
+def _enregistrer(reservations):
+    """bulk_create d'un lot et effets de bord des signaux post_save"""
+    Reservation.objects.bulk_create(reservations, batch_size=1000)
+
+    compteurs.incrementer('reservations', len(reservations))
+    compteurs.incrementer(
+        'reservations_en_attente',
+        sum(1 for reservation in reservations if reservation.statut == 'en_attente')
+    )
+    ajuster_statistiques(deltas_reservations(reservations))
+    # Couples verrouillés par _sans_conflits
+    couples = {
+        (reservation.salle_id, reservation.date_reservation)
+        for reservation in reservations if reservation.statut in Reservation.STATUTS_ACTIFS
+    }
+    reconstruire_jours(couples, verrouilles=couples)
+    utilisateur_ids = {reservation.utilisateur_id for reservation in reservations}
+    transaction.on_commit(lambda: invalider_statistiques(*utilisateur_ids))
+
+
+def ecrire_rapport(erreurs, chemin):
+    """Rapport d'erreurs CSV : une ligne par ligne rejetée"""
+    with open(chemin, 'w', encoding='utf-8-sig', newline='') as fichier:
+        ecrivain = csv.writer(fichier, delimiter=';')
+        ecrivain.writerow(['Ligne', 'Erreurs'])
+        for erreur in erreurs:
+            ecrivain.writerow([erreur.ligne, ' | '.join(erreur.messages)])
@@ -0,0 +1,61 @@
+"""
+Crée un campus synthétique déterministe (bancs d'essai, démonstration)
+"""
+import time
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.campus import TAILLE_LOT, MOT_DE_PASSE, generer_campus
+
+
+class Command(BaseCommand):
+    help = (
+        "Crée des bâtiments, salles, utilisateurs et réservations synthétiques "
+        "dans une base sans salles (mêmes données pour une même graine)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batiments', type=int, default=4, help="Nombre de bâtiments (4 par défaut)")
+        parser.add_argument('--salles', type=int, default=40, help="Nombre total de salles (40 par défaut)")
+        parser.add_argument('--etudiants', type=int, default=200, help="Nombre d'étudiants (200 par défaut)")
+        parser.add_argument('--professeurs', type=int, default=40, help="Nombre de professeurs (40 par défaut)")
+        parser.add_argument(
+            '--administrateurs', type=int, default=2, help="Nombre d'administrateurs (2 par défaut)"
+        )
+        parser.add_argument(
+            '--reservations', type=int, default=10000, help="Nombre de réservations (10000 par défaut)"
+        )
+        parser.add_argument('--graine', type=int, default=0, help="Graine du générateur (0 par défaut)")
+        parser.add_argument(
+            '--origine', type=date.fromisoformat,
+            help="Date d'aujourd'hui du campus (AAAA-MM-JJ), aujourd'hui par défaut"
+        )
+        parser.add_argument(
+            '--taille-lot', type=int, default=TAILLE_LOT,
+            help=f"Lignes par transaction ({TAILLE_LOT} par défaut)"
+        )
+
+    def handle(self, *args, **options):
+        tailles = ('batiments', 'salles', 'etudiants', 'professeurs', 'administrateurs', 'reservations')
+        if any(options[option] < 0 for option in tailles) or options['taille_lot'] < 1:
+            raise CommandError("Les tailles doivent être positives")
+
+        debut = time.perf_counter()
+        try:
+            campus = generer_campus(
+                **{option: options[option] for option in tailles},
+                graine=options['graine'],
+                origine=options['origine'],
+                taille_lot=options['taille_lot'],
+            )
+        except ValueError as erreur:
+            raise CommandError(str(erreur))
+        duree = time.perf_counter() - debut
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{campus.batiments} bâtiment(s), {campus.salles} salle(s), {campus.utilisateurs} utilisateur(s), "
+            f"{campus.reservations} réservation(s) du {campus.premier_jour} au {campus.dernier_jour}, "
+            f"en {duree:.1f} s"
+        ))
+        self.stdout.write(f"Mot de passe des comptes (etudiant00001, professeur00001...) : {MOT_DE_PASSE}")
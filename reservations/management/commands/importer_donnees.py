@@ -0,0 +1,71 @@
+"""
+Importe des salles ou des réservations depuis un fichier CSV ou JSON
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.importation import (
+    TAILLE_LOT, lire_fichier, importer_salles, importer_reservations, ecrire_rapport
+)
+
+
+IMPORTS = {
+    'salles': importer_salles,
+    'reservations': importer_reservations,
+}
+
+ERREURS_AFFICHEES = 20
+
+
+class Command(BaseCommand):
+    help = (
+        "Importe des salles ou des réservations (CSV avec en-tête ou liste JSON) "
+        "par lots, sans signal par ligne ; les lignes invalides ou en conflit sont rejetées "
+        "et listées dans le rapport d'erreurs"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('type', choices=sorted(IMPORTS), help="Données à importer")
+        parser.add_argument('fichier', help="Fichier .csv ou .json")
+        parser.add_argument(
+            '--taille-lot', type=int, default=TAILLE_LOT,
+            help=f"Lignes par transaction ({TAILLE_LOT} par défaut)"
+        )
+        parser.add_argument(
+            '--simulation', action='store_true',
+            help="Valide le fichier (conflits compris) sans rien écrire"
+        )
+        parser.add_argument('--rapport', help="Fichier CSV où écrire les lignes rejetées")
+
+    def handle(self, *args, **options):
+        if options['taille_lot'] < 1:
+            raise CommandError("--taille-lot doit être positif")
+
+        debut = time.perf_counter()
+        try:
+            resultat = IMPORTS[options['type']](
+                lire_fichier(options['fichier']),
+                taille_lot=options['taille_lot'],
+                simulation=options['simulation']
+            )
+        except (OSError, ValueError) as erreur:
+            raise CommandError(f"Lecture de {options['fichier']} impossible : {erreur}")
+        duree = time.perf_counter() - debut
+
+        for erreur in resultat.erreurs[:ERREURS_AFFICHEES]:
+            self.stdout.write(self.style.WARNING(f"Ligne {erreur.ligne} : {' ; '.join(erreur.messages)}"))
+        if len(resultat.erreurs) > ERREURS_AFFICHEES:
+            self.stdout.write(self.style.WARNING(
+                f"... et {len(resultat.erreurs) - ERREURS_AFFICHEES} autre(s) ligne(s) rejetée(s)"
+            ))
+        if options['rapport'] and resultat.erreurs:
+            ecrire_rapport(resultat.erreurs, options['rapport'])
+            self.stdout.write(f"Rapport d'erreurs : {options['rapport']}")
+
+        verbe = "valide(s) (simulation)" if options['simulation'] else "importée(s)"
+        self.stdout.write(self.style.SUCCESS(
+            f"{resultat.importees} ligne(s) sur {resultat.lues} {verbe}, "
+            f"{len(resultat.erreurs)} rejetée(s), en {duree:.1f} s "
+            f"({resultat.lues / duree if duree else 0:.0f} lignes/s)"
+        ))
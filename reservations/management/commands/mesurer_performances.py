@@ -0,0 +1,93 @@
+"""
+Mesure les chemins critiques et écrit les résultats en JSON, ou compare deux résultats
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.banc_essai import SCENARIOS, SEUIL, executer, ecrire, lire, comparer
+
+
+class Command(BaseCommand):
+    help = (
+        "Joue les scénarios du banc d'essai à travers le client de test et écrit "
+        "les durées (ms) et nombres de requêtes SQL en JSON ; avec --comparer, "
+        "compare deux fichiers de résultats"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'scenarios', nargs='*', metavar='scenario',
+            help=f"Scénarios à jouer, tous par défaut ({', '.join(scenario.nom for scenario in SCENARIOS)})"
+        )
+        parser.add_argument('--sortie', help="Fichier JSON où écrire les résultats")
+        parser.add_argument('--repetitions', type=int, default=20, help="Mesures par scénario (20 par défaut)")
+        parser.add_argument(
+            '--echauffement', type=int, default=2,
+            help="Exécutions non mesurées avant les mesures (2 par défaut)"
+        )
+        parser.add_argument('--graine', type=int, default=0, help="Graine des tirages aléatoires")
+        parser.add_argument(
+            '--comparer', nargs=2, metavar=('ANCIEN', 'NOUVEAU'),
+            help="Compare deux fichiers de résultats au lieu de mesurer"
+        )
+        parser.add_argument(
+            '--seuil', type=float, default=SEUIL,
+            help=f"Ratio des médianes signalé comme régression ({SEUIL} par défaut)"
+        )
+
+    def handle(self, *args, **options):
+        if options['comparer']:
+            self.afficher_comparaison(*options['comparer'], seuil=options['seuil'])
+            return
+        if options['repetitions'] < 1 or options['echauffement'] < 0:
+            raise CommandError("--repetitions doit être positif et --echauffement positif ou nul")
+        inconnus = set(options['scenarios']) - {scenario.nom for scenario in SCENARIOS}
+        if inconnus:
+            raise CommandError(f"Scénario(s) inconnu(s) : {', '.join(sorted(inconnus))}")
+
+        try:
+            resultats = executer(
+                options['scenarios'], options['repetitions'], options['echauffement'], options['graine']
+            )
+        except ValueError as erreur:
+            raise CommandError(str(erreur))
+
+        base = resultats['base']
+        self.stdout.write(
+            f"{base['salles']} salle(s), {base['utilisateurs']} utilisateur(s), "
+            f"{base['reservations']} réservation(s)"
+        )
+        for nom, mesure in resultats['mesures'].items():
+            ligne = (
+                f"{nom:<28} p50 {mesure['p50']:8.1f} ms   p90 {mesure['p90']:8.1f} ms   "
+                f"{mesure['requetes']:3d} requête(s) SQL"
+            )
+            if mesure['erreurs']:
+                self.stdout.write(self.style.ERROR(f"{ligne}   {mesure['erreurs']} erreur(s)"))
+            else:
+                self.stdout.write(ligne)
+
+        if options['sortie']:
+            ecrire(resultats, options['sortie'])
+            self.stdout.write(self.style.SUCCESS(f"Résultats écrits dans {options['sortie']}"))
+
+    def afficher_comparaison(self, ancien, nouveau, seuil):
+        try:
+            avant, apres = lire(ancien), lire(nouveau)
+        except (OSError, ValueError) as erreur:
+            raise CommandError(f"Lecture des résultats impossible : {erreur}")
+
+        if avant['base'] != apres['base']:
+            self.stdout.write(self.style.WARNING(
+                f"Bases différentes : {avant['base']} / {apres['base']}, les durées ne sont pas comparables"
+            ))
+        for ligne in comparer(avant, apres, seuil):
+            texte = (
+                f"{ligne.nom:<28} {ligne.ancien:8.1f} -> {ligne.nouveau:8.1f} ms  x{ligne.ratio:5.2f}   "
+                f"SQL {ligne.requetes_avant} -> {ligne.requetes_apres}"
+            )
+            if ligne.verdict == 'regression' or ligne.requetes_apres > ligne.requetes_avant:
+                self.stdout.write(self.style.ERROR(f"{texte}   régression"))
+            elif ligne.verdict == 'amelioration':
+                self.stdout.write(self.style.SUCCESS(f"{texte}   amélioration"))
+            else:
+                self.stdout.write(texte)
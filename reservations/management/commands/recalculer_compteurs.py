@@ -0,0 +1,41 @@
+"""
+Recalcule les compteurs globaux pour corriger une éventuelle dérive
+"""
+from django.core.management.base import BaseCommand
+
+from reservations.compteurs import DEFINITIONS, recalculer_compteurs
+from reservations.notifications import recalculer_non_lues
+
+
+# Compteur par utilisateur (Utilisateur.notifications_non_lues)
+NON_LUES = 'notifications_non_lues'
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcule les compteurs du dashboard administrateur et les compteurs de "
+        "notifications non lues depuis les tables"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'cles', nargs='*', choices=sorted(DEFINITIONS) + [NON_LUES], metavar='cle',
+            help="Compteurs à recalculer (tous par défaut)"
+        )
+
+    def handle(self, *args, **options):
+        cles = options['cles'] or [*DEFINITIONS, NON_LUES]
+        globaux = [cle for cle in cles if cle != NON_LUES]
+        if globaux:
+            for cle, (ancienne, nouvelle) in recalculer_compteurs(*globaux).items():
+                if ancienne is not None and ancienne != nouvelle:
+                    self.stdout.write(self.style.WARNING(f"{cle}: {ancienne} -> {nouvelle} (dérive corrigée)"))
+                else:
+                    self.stdout.write(f"{cle}: {nouvelle}")
+
+        if NON_LUES in cles:
+            corriges = recalculer_non_lues()
+            if corriges:
+                self.stdout.write(self.style.WARNING(f"{NON_LUES}: {corriges} utilisateur(s) corrigé(s) (dérive corrigée)"))
+            else:
+                self.stdout.write(f"{NON_LUES}: à jour")
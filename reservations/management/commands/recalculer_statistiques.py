@@ -0,0 +1,22 @@
+"""
+Reconstruit l'agrégat journalier des réservations (backfill)
+"""
+from django.core.management.base import BaseCommand
+
+from reservations.rapports import recalculer_statistiques
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit les statistiques journalières depuis les réservations "
+        "(à lancer après une migration, un import ou une écriture qui contourne les signaux, "
+        "de préférence hors charge)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--du', dest='date_debut', help="Premier jour (AAAA-MM-JJ), tout l'historique par défaut")
+        parser.add_argument('--au', dest='date_fin', help="Dernier jour (AAAA-MM-JJ), tout l'historique par défaut")
+
+    def handle(self, *args, **options):
+        lignes = recalculer_statistiques(options['date_debut'], options['date_fin'])
+        self.stdout.write(self.style.SUCCESS(f"{lignes} ligne(s) de statistiques écrite(s)"))
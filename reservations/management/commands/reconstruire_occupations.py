@@ -0,0 +1,21 @@
+"""
+Reconstruit l'index d'occupation par quarts d'heure
+"""
+from django.core.management.base import BaseCommand
+
+from reservations.occupation import reconstruire
+
+
+class Command(BaseCommand):
+    help = (
+        "Reconstruit les masques d'occupation des salles depuis les réservations actives "
+        "(à lancer après un import ou une écriture hors de l'application)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--du', dest='date_debut', help="Premier jour (AAAA-MM-JJ), tout l'historique par défaut")
+        parser.add_argument('--au', dest='date_fin', help="Dernier jour (AAAA-MM-JJ), tout l'historique par défaut")
+
+    def handle(self, *args, **options):
+        journees = reconstruire(options['date_debut'], options['date_fin'])
+        self.stdout.write(self.style.SUCCESS(f"{journees} journée(s) occupée(s) indexée(s)"))
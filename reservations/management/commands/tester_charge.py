@@ -0,0 +1,85 @@
+"""
+Test de charge : réservations, recherches et tableaux de bord simultanés
+"""
+import json
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from reservations.charge import ACTIONS, executer
+
+
+class Command(BaseCommand):
+    help = (
+        "Simule des utilisateurs concurrents (threads) qui réservent, cherchent des salles "
+        "et consultent leur tableau de bord ; affiche les latences p50/p95/p99, le débit, "
+        "le taux d'erreur et les doubles réservations trouvées après la charge"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--utilisateurs', type=int, default=50, help="Utilisateurs simulés (50 par défaut)")
+        parser.add_argument('--duree', type=float, default=30, help="Durée en secondes (30 par défaut)")
+        parser.add_argument('--salles', type=int, default=10, help="Salles visées par les réservations (10 par défaut)")
+        parser.add_argument('--jours', type=int, default=3, help="Jours visés par les réservations (3 par défaut)")
+        parser.add_argument(
+            '--premier-jour', type=date.fromisoformat,
+            help="Premier jour visé (AAAA-MM-JJ), le lendemain de la dernière réservation par défaut"
+        )
+        parser.add_argument(
+            '--poids', type=int, nargs=len(ACTIONS), default=[1, 2, 2], metavar='POIDS',
+            help=f"Poids des actions {', '.join(ACTIONS)} (1 2 2 par défaut)"
+        )
+        parser.add_argument('--graine', type=int, default=0, help="Graine des tirages aléatoires")
+        parser.add_argument('--sortie', help="Fichier JSON où écrire les résultats")
+        parser.add_argument(
+            '--conserver', action='store_true', help="Garder les réservations créées (supprimées par défaut)"
+        )
+
+    def handle(self, *args, **options):
+        if min(options['utilisateurs'], options['salles'], options['jours']) < 1 or options['duree'] <= 0:
+            raise CommandError("Utilisateurs, salles, jours et durée doivent être positifs")
+        if min(options['poids']) < 0 or not sum(options['poids']):
+            raise CommandError("--poids : au moins un poids positif, aucun négatif")
+        if options['premier_jour'] and options['premier_jour'] < date.today():
+            raise CommandError("--premier-jour ne peut pas être dans le passé")
+
+        self.stdout.write(
+            f"{options['utilisateurs']} utilisateur(s) simulé(s) pendant {options['duree']:g} s..."
+        )
+        try:
+            resultats = executer(
+                utilisateurs=options['utilisateurs'],
+                duree=options['duree'],
+                salles=options['salles'],
+                jours=options['jours'],
+                premier_jour=options['premier_jour'],
+                poids=options['poids'],
+                graine=options['graine'],
+                conserver=options['conserver'],
+            )
+        except ValueError as erreur:
+            raise CommandError(str(erreur))
+
+        for nom, mesure in [*resultats['actions'].items(), ('total', resultats.get('global'))]:
+            if mesure is None:
+                continue
+            self.stdout.write(
+                f"{nom:<18} {mesure['requetes']:6d} requête(s)   p50 {mesure['p50']:7.1f}   "
+                f"p95 {mesure['p95']:7.1f}   p99 {mesure['p99']:7.1f} ms   "
+                f"{mesure['erreurs']} erreur(s), {mesure['refus']} refus"
+            )
+        for cause, nombre in resultats['causes_erreurs'].items():
+            self.stdout.write(self.style.WARNING(f"{nombre} x {cause}"))
+        self.stdout.write(
+            f"Débit : {resultats['debit']:.1f} requêtes/s, taux d'erreur : {resultats['taux_erreur']:.2%}, "
+            f"{resultats['reservations_acceptees']} réservation(s) acceptée(s)"
+        )
+
+        if options['sortie']:
+            with open(options['sortie'], 'w', encoding='utf-8') as fichier:
+                json.dump(resultats, fichier, indent=2, ensure_ascii=False)
+            self.stdout.write(f"Résultats écrits dans {options['sortie']}")
+
+        if resultats['doubles_reservations']:
+            raise CommandError(f"{resultats['doubles_reservations']} double(s) réservation(s) trouvée(s)")
+        self.stdout.write(self.style.SUCCESS("Aucune double réservation"))
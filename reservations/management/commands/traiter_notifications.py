@@ -0,0 +1,39 @@
+"""
+Worker de la boîte d'envoi : crée les notifications en attente par lots
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from reservations.notifications import traiter_evenements
+
+
+class Command(BaseCommand):
+    help = "Transforme les événements de réservation en attente en notifications"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--taille-lot', type=int, default=500,
+            help="Nombre d'événements traités par transaction (défaut: 500)"
+        )
+        parser.add_argument(
+            '--continu', action='store_true',
+            help="Tourne en boucle au lieu de s'arrêter quand la file est vide"
+        )
+        parser.add_argument(
+            '--intervalle', type=float, default=2.0,
+            help="Pause en secondes quand la file est vide, en mode continu (défaut: 2)"
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        while True:
+            traites = traiter_evenements(options['taille_lot'])
+            total += traites
+            if traites:
+                continue
+            if not options['continu']:
+                break
+            time.sleep(options['intervalle'])
+
+        self.stdout.write(self.style.SUCCESS(f"{total} notification(s) créée(s)"))
@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-18 08:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VerrouCreneau',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date_reservation', models.DateField(verbose_name='Date de réservation')),
+                ('version', models.PositiveIntegerField(default=0, verbose_name='Version')),
+                ('salle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='verrous', to='reservations.salle', verbose_name='Salle')),
+            ],
+            options={
+                'verbose_name': 'Verrou de créneau',
+                'verbose_name_plural': 'Verrous de créneau',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='verroucreneau',
+            constraint=models.UniqueConstraint(fields=('salle', 'date_reservation'), name='unique_verrou_salle_date'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.0 on 2026-10-18 08:05
+
+import django.core.validators
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0002_verroucreneau'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SerieReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('frequence', models.CharField(choices=[('hebdomadaire', 'Chaque semaine'), ('bihebdomadaire', 'Toutes les deux semaines')], default='hebdomadaire', max_length=20, verbose_name='Fréquence')),
+                ('date_debut', models.DateField(verbose_name='Première occurrence')),
+                ('date_fin', models.DateField(verbose_name="Jusqu'au")),
+                ('heure_debut', models.TimeField(verbose_name='Heure de début')),
+                ('heure_fin', models.TimeField(verbose_name='Heure de fin')),
+                ('motif', models.TextField(verbose_name='Motif')),
+                ('nombre_participants', models.PositiveIntegerField(validators=[django.core.validators.MinValueValidator(1)], verbose_name='Nombre de participants')),
+                ('exceptions', models.JSONField(blank=True, default=list, help_text='Dates exclues de la série (format ISO)', verbose_name='Exceptions')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Date de création')),
+                ('salle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to='reservations.salle', verbose_name='Salle')),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='series', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Série de réservations',
+                'verbose_name_plural': 'Séries de réservations',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddField(
+            model_name='reservation',
+            name='serie',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='reservations', to='reservations.seriereservation', verbose_name='Série'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-18 08:06
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0003_seriereservation'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EvenementReservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('type_evenement', models.CharField(choices=[('creation', 'Création'), ('modification', 'Modification')], max_length=20, verbose_name='Type')),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('confirmee', 'Confirmée'), ('annulee', 'Annulée'), ('refusee', 'Refusée')], max_length=20, verbose_name='Statut de la réservation')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name="Date de l'événement")),
+                ('reservation', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='evenements', to='reservations.reservation', verbose_name='Réservation')),
+                ('utilisateur', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='evenements_reservation', to=settings.AUTH_USER_MODEL, verbose_name='Utilisateur')),
+            ],
+            options={
+                'verbose_name': 'Événement de réservation',
+                'verbose_name_plural': 'Événements de réservation',
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.0 on 2026-10-18 08:07
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def initialiser_compteurs(apps, schema_editor):
+    Utilisateur = apps.get_model('reservations', 'Utilisateur')
+    Notification = apps.get_model('reservations', 'Notification')
+    non_lues = Notification.objects.filter(
+        utilisateur=OuterRef('pk'), est_lue=False
+    ).order_by().values('utilisateur').annotate(total=Count('id')).values('total')
+    Utilisateur.objects.update(notifications_non_lues=Coalesce(Subquery(non_lues), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0004_evenementreservation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='utilisateur',
+            name='notifications_non_lues',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Compteur dénormalisé, tenu à jour à chaque création/lecture', verbose_name='Notifications non lues'),
+        ),
+        migrations.RunPython(initialiser_compteurs, migrations.RunPython.noop),
+    ]
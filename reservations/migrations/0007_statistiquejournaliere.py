@@ -0,0 +1,62 @@
+# Generated by Django 5.0 on 2026-10-18 08:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import ExtractHour, ExtractMinute
+
+
+def construire_agregat(apps, schema_editor):
+    # Même calcul que reservations.rapports.recalculer_statistiques(), figé ici
+    Reservation = apps.get_model('reservations', 'Reservation')
+    StatistiqueJournaliere = apps.get_model('reservations', 'StatistiqueJournaliere')
+
+    def minutes(champ):
+        return ExtractHour(champ) * 60 + ExtractMinute(champ)
+
+    groupes = Reservation.objects.order_by().values(
+        'date_reservation', 'salle_id', 'statut', 'utilisateur__type_utilisateur'
+    ).annotate(total=Count('id'), total_minutes=Sum(minutes('heure_fin') - minutes('heure_debut')))
+    StatistiqueJournaliere.objects.bulk_create([
+        StatistiqueJournaliere(
+            date=groupe['date_reservation'],
+            salle_id=groupe['salle_id'],
+            statut=groupe['statut'],
+            type_utilisateur=groupe['utilisateur__type_utilisateur'],
+            nombre=groupe['total'],
+            minutes=groupe['total_minutes'],
+        )
+        for groupe in groupes.iterator(chunk_size=5000)
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0006_compteur'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StatistiqueJournaliere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('statut', models.CharField(choices=[('en_attente', 'En attente'), ('confirmee', 'Confirmée'), ('annulee', 'Annulée'), ('refusee', 'Refusée')], max_length=20, verbose_name='Statut')),
+                ('type_utilisateur', models.CharField(choices=[('etudiant', 'Étudiant'), ('professeur', 'Professeur'), ('administrateur', 'Administrateur')], max_length=20, verbose_name="Type d'utilisateur")),
+                ('nombre', models.IntegerField(default=0, verbose_name='Nombre de réservations')),
+                ('minutes', models.IntegerField(default=0, verbose_name='Minutes réservées')),
+                ('salle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='statistiques_journalieres', to='reservations.salle', verbose_name='Salle')),
+            ],
+            options={
+                'verbose_name': 'Statistique journalière',
+                'verbose_name_plural': 'Statistiques journalières',
+                'ordering': ['date', 'salle'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='statistiquejournaliere',
+            constraint=models.UniqueConstraint(fields=('date', 'salle', 'statut', 'type_utilisateur'), name='unique_statistique_journaliere'),
+        ),
+        migrations.RunPython(construire_agregat, migrations.RunPython.noop),
+    ]
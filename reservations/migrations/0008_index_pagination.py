@@ -0,0 +1,29 @@
+# Generated by Django 5.0 on 2026-10-18 08:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0007_statistiquejournaliere'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['utilisateur', '-created_at'], name='reservation_utilisa_682c08_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['utilisateur', '-date_reservation', '-heure_debut'], name='reservation_utilisa_fd72ff_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['statut', 'date_reservation', 'heure_debut'], name='reservation_statut_3e067b_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='salle',
+            index=models.Index(fields=['batiment', 'nom'], name='reservation_batimen_5fc814_idx'),
+        ),
+    ]
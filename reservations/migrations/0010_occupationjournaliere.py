@@ -0,0 +1,65 @@
+# Generated by Django 5.0 on 2026-10-18 08:24
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def construire_index(apps, schema_editor):
+    # Même calcul que reservations.occupation.reconstruire(), figé ici
+    Reservation = apps.get_model('reservations', 'Reservation')
+    OccupationJournaliere = apps.get_model('reservations', 'OccupationJournaliere')
+
+    def bits(premier, dernier):
+        return ((1 << (dernier - premier)) - 1) << premier if dernier > premier else 0
+
+    masques = {}
+    reservations = Reservation.objects.filter(statut__in=['en_attente', 'confirmee']).values_list(
+        'salle_id', 'date_reservation', 'heure_debut', 'heure_fin'
+    )
+    for salle_id, jour, debut, fin in reservations.iterator(chunk_size=5000):
+        debut = debut.hour * 60 + debut.minute
+        fin = fin.hour * 60 + fin.minute
+        plein, partiel = masques.get((salle_id, jour), (0, 0))
+        masques[(salle_id, jour)] = (
+            plein | bits(-(-debut // 15), fin // 15),
+            partiel | bits(debut // 15, -(-fin // 15)),
+        )
+
+    OccupationJournaliere.objects.bulk_create([
+        OccupationJournaliere(
+            salle_id=salle_id, date=jour,
+            plein=plein.to_bytes(12, 'little'), partiel=partiel.to_bytes(12, 'little')
+        )
+        for (salle_id, jour), (plein, partiel) in masques.items() if partiel
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0009_index_updated_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OccupationJournaliere',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Date')),
+                ('plein', models.BinaryField(max_length=12, verbose_name="Quarts d'heure entièrement occupés")),
+                ('partiel', models.BinaryField(max_length=12, verbose_name="Quarts d'heure au moins partiellement occupés")),
+                ('salle', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='occupations', to='reservations.salle', verbose_name='Salle')),
+            ],
+            options={
+                'verbose_name': 'Occupation journalière',
+                'verbose_name_plural': 'Occupations journalières',
+                'ordering': ['date', 'salle'],
+                'indexes': [models.Index(fields=['date'], name='reservation_date_e6452b_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='occupationjournaliere',
+            constraint=models.UniqueConstraint(fields=('salle', 'date'), name='unique_occupation_salle_date'),
+        ),
+        migrations.RunPython(construire_index, migrations.RunPython.noop),
+    ]
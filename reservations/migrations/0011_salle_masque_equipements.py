@@ -0,0 +1,47 @@
+# Generated by Django 5.0 on 2026-10-18 08:47
+
+from django.db import migrations, models
+
+
+def calculer_masques(apps, schema_editor):
+    # Même calcul que Salle.masque_liste(), figé ici
+    Salle = apps.get_model('reservations', 'Salle')
+    choix = [
+        ('videoprojecteur', 'Vidéoprojecteur'),
+        ('ordinateur', 'Ordinateur'),
+        ('tableau_blanc', 'Tableau blanc'),
+        ('ecran', 'Écran'),
+        ('microphone', 'Microphone'),
+        ('climatisation', 'Climatisation'),
+    ]
+    bits = {}
+    for rang, (code, libelle) in enumerate(choix):
+        bits[code.casefold()] = 1 << rang
+        bits[libelle.casefold()] = 1 << rang
+
+    salles = list(Salle.objects.only('pk', 'equipements'))
+    for salle in salles:
+        salle.masque_equipements = 0
+        for equipement in salle.equipements or []:
+            salle.masque_equipements |= bits.get(str(equipement).strip().casefold(), 0)
+    Salle.objects.bulk_update(salles, ['masque_equipements'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0010_occupationjournaliere'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='salle',
+            name='masque_equipements',
+            field=models.PositiveIntegerField(default=0, editable=False, help_text='Équipements de EQUIPEMENT_CHOICES présents, calculé depuis equipements', verbose_name='Masque des équipements'),
+        ),
+        migrations.AddIndex(
+            model_name='salle',
+            index=models.Index(fields=['masque_equipements'], name='reservation_masque__d1dd5b_idx'),
+        ),
+        migrations.RunPython(calculer_masques, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0 on 2026-10-18 10:12
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def figer_types(apps, schema_editor):
+    # Type actuel du demandeur : c'est aussi celui que l'agrégat journalier
+    # utilisait jusqu'ici
+    Reservation = apps.get_model('reservations', 'Reservation')
+    Utilisateur = apps.get_model('reservations', 'Utilisateur')
+    Reservation.objects.update(type_utilisateur=Subquery(
+        Utilisateur.objects.filter(pk=OuterRef('utilisateur_id')).values('type_utilisateur')[:1]
+    ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reservations', '0011_salle_masque_equipements'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='type_utilisateur',
+            field=models.CharField(choices=[('etudiant', 'Étudiant'), ('professeur', 'Professeur'), ('administrateur', 'Administrateur')], default='etudiant', editable=False, help_text="Type du demandeur à la création, figé (clé de l'agrégat journalier)", max_length=20, verbose_name="Type d'utilisateur"),
+            preserve_default=False,
+        ),
+        migrations.RunPython(figer_types, migrations.RunPython.noop),
+    ]
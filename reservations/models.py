@@ -1,473 +1,1065 @@
-"""
-Modèles Django pour le système de réservation de salles
-"""
-from django.db import models
-from django.contrib.auth.models import AbstractUser
-from django.core.validators import MinValueValidator, MaxValueValidator
-from django.core.exceptions import ValidationError
-from django.utils import timezone
-from django.db.models import Q
-from datetime import datetime, timedelta, date
-
-
-class Utilisateur(AbstractUser):
-    """
-    Modèle utilisateur personnalisé étendant AbstractUser
-    Gère les étudiants, professeurs et administrateurs
-    """
-    TYPE_CHOICES = [
-        ('etudiant', 'Étudiant'),
-        ('professeur', 'Professeur'),
-        ('administrateur', 'Administrateur'),
-    ]
-    
-    NIVEAU_CHOICES = [
-        ('L1', 'Licence 1'),
-        ('L2', 'Licence 2'),
-        ('L3', 'Licence 3'),
-        ('M1', 'Master 1'),
-        ('M2', 'Master 2'),
-    ]
-    
-    type_utilisateur = models.CharField(
-        max_length=20,
-        choices=TYPE_CHOICES,
-        default='etudiant',
-        verbose_name="Type d'utilisateur"
-    )
-    
-    niveau = models.CharField(
-        max_length=10,
-        choices=NIVEAU_CHOICES,
-        blank=True,
-        null=True,
-        verbose_name="Niveau d'études",
-        help_text="Pour les étudiants uniquement"
-    )
-    
-    departement = models.CharField(
-        max_length=100,
-        blank=True,
-        null=True,
-        verbose_name="Département",
-        help_text="Pour les professeurs uniquement"
-    )
-    
-    class Meta:
-        verbose_name = "Utilisateur"
-        verbose_name_plural = "Utilisateurs"
-        ordering = ['last_name', 'first_name']
-    
-    def __str__(self):
-        return f"{self.get_full_name()} ({self.get_type_utilisateur_display()})"
-    
-    def clean(self):
-        """Validation personnalisée"""
-        super().clean()
-        
-        if self.type_utilisateur == 'etudiant' and not self.niveau:
-            raise ValidationError({
-                'niveau': 'Le niveau est requis pour les étudiants'
-            })
-        
-        if self.type_utilisateur == 'professeur' and not self.departement:
-            raise ValidationError({
-                'departement': 'Le département est requis pour les professeurs'
-            })
-
-
-class Salle(models.Model):
-    """
-    Modèle représentant une salle de conférence
-    """
-    TYPE_CHOICES = [
-        ('amphi', 'Amphithéâtre'),
-        ('td', 'Salle de TD'),
-        ('tp', 'Salle de TP'),
-        ('conference', 'Salle de conférence'),
-        ('reunion', 'Salle de réunion'),
-    ]
-    
-    nom = models.CharField(
-        max_length=100,
-        unique=True,
-        verbose_name="Nom de la salle"
-    )
-    
-    batiment = models.CharField(
-        max_length=100,
-        verbose_name="Bâtiment"
-    )
-    
-    etage = models.IntegerField(
-        default=0,
-        verbose_name="Étage"
-    )
-    
-    capacite = models.PositiveIntegerField(
-        validators=[MinValueValidator(1)],
-        verbose_name="Capacité",
-        help_text="Nombre maximum de personnes"
-    )
-    
-    type_salle = models.CharField(
-        max_length=20,
-        choices=TYPE_CHOICES,
-        verbose_name="Type de salle"
-    )
-    
-    equipements = models.JSONField(
-        default=list,
-        blank=True,
-        verbose_name="Équipements",
-        help_text="Liste des équipements disponibles"
-    )
-    
-    est_disponible = models.BooleanField(
-        default=True,
-        verbose_name="Est disponible"
-    )
-    
-    description = models.TextField(
-        blank=True,
-        verbose_name="Description"
-    )
-    
-    created_at = models.DateTimeField(
-        auto_now_add=True,
-        verbose_name="Date de création"
-    )
-    
-    updated_at = models.DateTimeField(
-        auto_now=True,
-        verbose_name="Dernière modification"
-    )
-    
-    class Meta:
-        verbose_name = "Salle"
-        verbose_name_plural = "Salles"
-        ordering = ['batiment', 'nom']
-        indexes = [
-            models.Index(fields=['batiment', 'type_salle']),
-            models.Index(fields=['est_disponible']),
-        ]
-    
-    def __str__(self):
-        return f"{self.nom} ({self.batiment})"
-    
-    def verifier_disponibilite(self, date_reservation, heure_debut, heure_fin, reservation_id=None):
-        """
-        Vérifie si la salle est disponible pour un créneau donné
-        
-        Args:
-            date_reservation: Date de la réservation
-            heure_debut: Heure de début
-            heure_fin: Heure de fin
-            reservation_id: ID de la réservation à exclure (pour modification)
-        
-        Returns:
-            bool: True si disponible, False sinon
-        """
-        if not self.est_disponible:
-            return False
-        
-        # Construire la requête de conflit
-        conflits = self.reservations.filter(
-            date_reservation=date_reservation,
-            statut__in=['en_attente', 'confirmee']
-        ).filter(
-            Q(heure_debut__lt=heure_fin, heure_fin__gt=heure_debut)
-        )
-        
-        # Exclure la réservation en cours de modification
-        if reservation_id:
-            conflits = conflits.exclude(id=reservation_id)
-        
-        return not conflits.exists()
-
-
-class Reservation(models.Model):
-    """
-    Modèle représentant une réservation de salle
-    """
-    STATUT_CHOICES = [
-        ('en_attente', 'En attente'),
-        ('confirmee', 'Confirmée'),
-        ('annulee', 'Annulée'),
-        ('refusee', 'Refusée'),
-    ]
-    
-    utilisateur = models.ForeignKey(
-        Utilisateur,
-        on_delete=models.CASCADE,
-        related_name='reservations',
-        verbose_name="Utilisateur"
-    )
-    
-    salle = models.ForeignKey(
-        Salle,
-        on_delete=models.CASCADE,
-        related_name='reservations',
-        verbose_name="Salle"
-    )
-    
-    date_reservation = models.DateField(
-        verbose_name="Date de réservation"
-    )
-    
-    heure_debut = models.TimeField(
-        verbose_name="Heure de début"
-    )
-    
-    heure_fin = models.TimeField(
-        verbose_name="Heure de fin"
-    )
-    
-    motif = models.TextField(
-        verbose_name="Motif",
-        help_text="Raison de la réservation"
-    )
-    
-    statut = models.CharField(
-        max_length=20,
-        choices=STATUT_CHOICES,
-        default='en_attente',
-        verbose_name="Statut"
-    )
-    
-    nombre_participants = models.PositiveIntegerField(
-        validators=[MinValueValidator(1)],
-        verbose_name="Nombre de participants"
-    )
-    
-    created_at = models.DateTimeField(
-        auto_now_add=True,
-        verbose_name="Date de création"
-    )
-    
-    updated_at = models.DateTimeField(
-        auto_now=True,
-        verbose_name="Dernière modification"
-    )
-    
-    class Meta:
-        verbose_name = "Réservation"
-        verbose_name_plural = "Réservations"
-        ordering = ['-date_reservation', '-heure_debut']
-        indexes = [
-            models.Index(fields=['date_reservation', 'statut']),
-            models.Index(fields=['utilisateur', 'statut']),
-            models.Index(fields=['salle', 'date_reservation']),
-        ]
-    
-    def __str__(self):
-        return f"{self.salle.nom} - {self.date_reservation} à {self.heure_debut}"
-    
-    def clean(self):
-        """Validation personnalisée"""
-        super().clean()
-        
-        # Vérifier que la date n'est pas dans le passé
-        if self.date_reservation and self.date_reservation < date.today():
-            raise ValidationError({
-                'date_reservation': "La date ne peut pas être dans le passé"
-            })
-        
-        # Vérifier que heure_fin > heure_debut
-        if self.heure_debut and self.heure_fin and self.heure_fin <= self.heure_debut:
-            raise ValidationError({
-                'heure_fin': "L'heure de fin doit être après l'heure de début"
-            })
-        
-        # Calculer et vérifier la durée
-        if self.heure_debut and self.heure_fin:
-            debut = datetime.combine(date.today(), self.heure_debut)
-            fin = datetime.combine(date.today(), self.heure_fin)
-            duree = (fin - debut).total_seconds() / 60
-            
-            if duree < 30:
-                raise ValidationError("Durée minimale : 30 minutes")
-            
-            if duree > 240:
-                raise ValidationError("Durée maximale : 4 heures")
-        
-        # Vérifier la capacité
-        if self.salle and self.nombre_participants:
-            if self.nombre_participants > self.salle.capacite:
-                raise ValidationError({
-                    'nombre_participants': f"La salle a une capacité de {self.salle.capacite} personnes"
-                })
-        
-        # Vérifier la disponibilité
-        if all([self.salle, self.date_reservation, self.heure_debut, self.heure_fin]):
-            if not self.salle.verifier_disponibilite(
-                self.date_reservation,
-                self.heure_debut,
-                self.heure_fin,
-                self.pk
-            ):
-                raise ValidationError("La salle n'est pas disponible pour ce créneau")
-    
-    def peut_etre_modifiee(self):
-        """Vérifie si la réservation peut être modifiée (>2h avant)"""
-        if not self.date_reservation or not self.heure_debut:
-            return False
-        
-        debut_reservation = datetime.combine(
-            self.date_reservation,
-            self.heure_debut
-        )
-        debut_reservation = timezone.make_aware(debut_reservation)
-        
-        return debut_reservation - timezone.now() > timedelta(hours=2)
-    
-    def valider(self):
-        """Valide la réservation"""
-        self.statut = 'confirmee'
-        self.save()
-    
-    def annuler(self):
-        """Annule la réservation"""
-        self.statut = 'annulee'
-        self.save()
-    
-    def refuser(self):
-        """Refuse la réservation"""
-        self.statut = 'refusee'
-        self.save()
-    
-    def save(self, *args, **kwargs):
-        """Override save pour déterminer le statut initial"""
-        # Si c'est une nouvelle réservation
-        if not self.pk and not kwargs.get('force_insert', False):
-            # Déterminer le statut selon le type d'utilisateur
-            if self.utilisateur.type_utilisateur in ['professeur', 'administrateur']:
-                self.statut = 'confirmee'
-            else:
-                self.statut = 'en_attente'
-        
-        # Validation complète
-        self.full_clean()
-        
-        super().save(*args, **kwargs)
-
-
-class Notification(models.Model):
-    """
-    Modèle pour les notifications utilisateur
-    """
-    TYPE_CHOICES = [
-        ('confirmation', 'Confirmation'),
-        ('rappel', 'Rappel'),
-        ('modification', 'Modification'),
-        ('annulation', 'Annulation'),
-    ]
-    
-    utilisateur = models.ForeignKey(
-        Utilisateur,
-        on_delete=models.CASCADE,
-        related_name='notifications',
-        verbose_name="Utilisateur"
-    )
-    
-    reservation = models.ForeignKey(
-        Reservation,
-        on_delete=models.CASCADE,
-        related_name='notifications',
-        null=True,
-        blank=True,
-        verbose_name="Réservation"
-    )
-    
-    type_notification = models.CharField(
-        max_length=20,
-        choices=TYPE_CHOICES,
-        verbose_name="Type"
-    )
-    
-    message = models.TextField(
-        verbose_name="Message"
-    )
-    
-    est_lue = models.BooleanField(
-        default=False,
-        verbose_name="Est lue"
-    )
-    
-    created_at = models.DateTimeField(
-        auto_now_add=True,
-        verbose_name="Date d'envoi"
-    )
-    
-    class Meta:
-        verbose_name = "Notification"
-        verbose_name_plural = "Notifications"
-        ordering = ['-created_at']
-        indexes = [
-            models.Index(fields=['utilisateur', 'est_lue']),
-        ]
-    
-    def __str__(self):
-        return f"{self.get_type_notification_display()} - {self.utilisateur.get_full_name()}"
-    
-    def marquer_comme_lue(self):
-        """Marque la notification comme lue"""
-        self.est_lue = True
-        self.save()
-
-
-class Rapport(models.Model):
-    """
-    Modèle pour les rapports statistiques
-    """
-    TYPE_CHOICES = [
-        ('utilisation', 'Utilisation'),
-        ('statistiques', 'Statistiques'),
-        ('occupation', 'Occupation'),
-    ]
-    
-    administrateur = models.ForeignKey(
-        Utilisateur,
-        on_delete=models.CASCADE,
-        related_name='rapports_crees',
-        limit_choices_to={'is_staff': True},
-        verbose_name="Administrateur"
-    )
-    
-    titre = models.CharField(
-        max_length=200,
-        verbose_name="Titre"
-    )
-    
-    type_rapport = models.CharField(
-        max_length=20,
-        choices=TYPE_CHOICES,
-        verbose_name="Type"
-    )
-    
-    date_debut = models.DateField(
-        verbose_name="Date de début"
-    )
-    
-    date_fin = models.DateField(
-        verbose_name="Date de fin"
-    )
-    
-    donnees = models.JSONField(
-        default=dict,
-        verbose_name="Données",
-        help_text="Données statistiques du rapport"
-    )
-    
-    created_at = models.DateTimeField(
-        auto_now_add=True,
-        verbose_name="Date de génération"
-    )
-    
-    class Meta:
-        verbose_name = "Rapport"
-        verbose_name_plural = "Rapports"
-        ordering = ['-created_at']
-    
-    def __str__(self):
+"""
+Modèles Django pour le système de réservation de salles
+"""
+from django.db import models, transaction, IntegrityError
+from django.contrib.auth.models import AbstractUser
+from django.core.validators import MinValueValidator, MaxValueValidator
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+from datetime import datetime, timedelta, date
+
+
+class Utilisateur(AbstractUser):
+    """
+    Modèle utilisateur personnalisé étendant AbstractUser
+    Gère les étudiants, professeurs et administrateurs
+    """
+    TYPE_CHOICES = [
+        ('etudiant', 'Étudiant'),
+        ('professeur', 'Professeur'),
+        ('administrateur', 'Administrateur'),
+    ]
+    
+    NIVEAU_CHOICES = [
+        ('L1', 'Licence 1'),
+        ('L2', 'Licence 2'),
+        ('L3', 'Licence 3'),
+        ('M1', 'Master 1'),
+        ('M2', 'Master 2'),
+    ]
+    
+    type_utilisateur = models.CharField(
+        max_length=20,
+        choices=TYPE_CHOICES,
+        default='etudiant',
+        verbose_name="Type d'utilisateur"
+    )
+    
+    niveau = models.CharField(
+        max_length=10,
+        choices=NIVEAU_CHOICES,
+        blank=True,
+        null=True,
+        verbose_name="Niveau d'études",
+        help_text="Pour les étudiants uniquement"
+    )
+    
+    departement = models.CharField(
+        max_length=100,
+        blank=True,
+        null=True,
+        verbose_name="Département",
+        help_text="Pour les professeurs uniquement"
+    )
+    
+    notifications_non_lues = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Notifications non lues",
+        help_text="Compteur dénormalisé, tenu à jour à chaque création/lecture"
+    )
+    
+    class Meta:
+        verbose_name = "Utilisateur"
+        verbose_name_plural = "Utilisateurs"
+        ordering = ['last_name', 'first_name']
+    
+    def __str__(self):
+        return f"{self.get_full_name()} ({self.get_type_utilisateur_display()})"
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Mémorise l'état actif chargé pour tenir le compteur d'utilisateurs actifs"""
+        instance = super().from_db(db, field_names, values)
+        instance._actif_origine = instance.__dict__.get('is_active')
+        return instance
+    
+    def clean(self):
+        """Validation personnalisée"""
+        super().clean()
+        
+        if self.type_utilisateur == 'etudiant' and not self.niveau:
+            raise ValidationError({
+                'niveau': 'Le niveau est requis pour les étudiants'
+            })
+        
+        if self.type_utilisateur == 'professeur' and not self.departement:
+            raise ValidationError({
+                'departement': 'Le département est requis pour les professeurs'
+            })
+    
+    def recalculer_notifications_non_lues(self):
+        """Recalcule le compteur de notifications non lues depuis la table"""
+        self.notifications_non_lues = self.notifications.filter(est_lue=False).count()
+        Utilisateur.objects.filter(pk=self.pk).update(
+            notifications_non_lues=self.notifications_non_lues
+        )
+
+
+class ReservationQuerySet(models.QuerySet):
+    """
+    QuerySet des réservations avec la règle de chevauchement partagée
+    """
+    
+    def actives(self):
+        """Réservations qui occupent la salle (en attente ou confirmées)"""
+        return self.filter(statut__in=Reservation.STATUTS_ACTIFS)
+    
+    def chevauchant(self, date_reservation, heure_debut, heure_fin):
+        """
+        Réservations actives qui chevauchent le créneau donné
+        
+        Deux créneaux se chevauchent si chacun commence avant la fin de l'autre.
+        Le filtre sur date_reservation permet d'utiliser l'index (salle, date_reservation).
+        """
+        return self.actives().filter(
+            date_reservation=date_reservation,
+            heure_debut__lt=heure_fin,
+            heure_fin__gt=heure_debut
+        )
+
+
+class SalleQuerySet(models.QuerySet):
+    """
+    QuerySet des salles avec le filtre par équipements
+    """
+    
+    def avec_equipements(self, codes):
+        """
+        Salles dotées de tous les équipements donnés (codes de EQUIPEMENT_CHOICES)
+        
+        Une salle convient si son masque contient le masque demandé : la liste
+        de ces masques (au plus 2^6) est cherchée par l'index sur
+        masque_equipements, sans lire le JSON des équipements.
+        """
+        requis = Salle.masque_codes(codes)
+        if not requis:
+            return self
+        return self.filter(masque_equipements__in=Salle.masques_contenant(requis))
+
+
+class Salle(models.Model):
+    """
+    Modèle représentant une salle de conférence
+    """
+    TYPE_CHOICES = [
+        ('amphi', 'Amphithéâtre'),
+        ('td', 'Salle de TD'),
+        ('tp', 'Salle de TP'),
+        ('conference', 'Salle de conférence'),
+        ('reunion', 'Salle de réunion'),
+    ]
+    
+    # Équipements filtrables : le i-ème donne le bit i de masque_equipements
+    # (ne pas réordonner, ajouter à la fin)
+    EQUIPEMENT_CHOICES = [
+        ('videoprojecteur', 'Vidéoprojecteur'),
+        ('ordinateur', 'Ordinateur'),
+        ('tableau_blanc', 'Tableau blanc'),
+        ('ecran', 'Écran'),
+        ('microphone', 'Microphone'),
+        ('climatisation', 'Climatisation'),
+    ]
+    
+    nom = models.CharField(
+        max_length=100,
+        unique=True,
+        verbose_name="Nom de la salle"
+    )
+    
+    batiment = models.CharField(
+        max_length=100,
+        verbose_name="Bâtiment"
+    )
+    
+    etage = models.IntegerField(
+        default=0,
+        verbose_name="Étage"
+    )
+    
+    capacite = models.PositiveIntegerField(
+        validators=[MinValueValidator(1)],
+        verbose_name="Capacité",
+        help_text="Nombre maximum de personnes"
+    )
+    
+    type_salle = models.CharField(
+        max_length=20,
+        choices=TYPE_CHOICES,
+        verbose_name="Type de salle"
+    )
+    
+    equipements = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Équipements",
+        help_text="Liste des équipements disponibles"
+    )
+    
+    est_disponible = models.BooleanField(
+        default=True,
+        verbose_name="Est disponible"
+    )
+    
+    masque_equipements = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name="Masque des équipements",
+        help_text="Équipements de EQUIPEMENT_CHOICES présents, calculé depuis equipements"
+    )
+    
+    description = models.TextField(
+        blank=True,
+        verbose_name="Description"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Dernière modification"
+    )
+    
+    objects = SalleQuerySet.as_manager()
+    
+    class Meta:
+        verbose_name = "Salle"
+        verbose_name_plural = "Salles"
+        ordering = ['batiment', 'nom']
+        indexes = [
+            models.Index(fields=['batiment', 'type_salle']),
+            models.Index(fields=['est_disponible']),
+            models.Index(fields=['batiment', 'nom']),
+            models.Index(fields=['masque_equipements']),
+        ]
+    
+    def __str__(self):
+        return f"{self.nom} ({self.batiment})"
+    
+    def save(self, *args, **kwargs):
+        """Override save pour tenir masque_equipements à jour"""
+        self.masque_equipements = self.masque_liste(self.equipements)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and 'equipements' in update_fields:
+            kwargs['update_fields'] = {*update_fields, 'masque_equipements'}
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def masque_codes(cls, codes):
+        """Masque de codes d'équipement (codes inconnus ignorés)"""
+        bits = {code: 1 << rang for rang, (code, _) in enumerate(cls.EQUIPEMENT_CHOICES)}
+        masque = 0
+        for code in codes or []:
+            masque |= bits.get(code, 0)
+        return masque
+    
+    @classmethod
+    def masque_liste(cls, equipements):
+        """
+        Masque d'une liste d'équipements libre (champ equipements)
+        
+        Un équipement compte s'il porte le libellé ou le code d'un choix, sans
+        tenir compte de la casse ; les autres restent dans la liste sans bit.
+        """
+        codes = {}
+        for code, libelle in cls.EQUIPEMENT_CHOICES:
+            codes[code.casefold()] = code
+            codes[libelle.casefold()] = code
+        return cls.masque_codes(
+            codes.get(str(equipement).strip().casefold()) for equipement in equipements or []
+        )
+    
+    @classmethod
+    def masques_contenant(cls, requis):
+        """Tous les masques possibles qui contiennent le masque requis"""
+        return [
+            masque for masque in range(1 << len(cls.EQUIPEMENT_CHOICES))
+            if masque & requis == requis
+        ]
+    
+    def verifier_disponibilite(self, date_reservation, heure_debut, heure_fin, reservation_id=None):
+        """
+        Vérifie si la salle est disponible pour un créneau donné
+        
+        Args:
+            date_reservation: Date de la réservation
+            heure_debut: Heure de début
+            heure_fin: Heure de fin
+            reservation_id: ID de la réservation à exclure (pour modification)
+        
+        Returns:
+            bool: True si disponible, False sinon
+        """
+        if not self.est_disponible:
+            return False
+        
+        # Index d'occupation : tranche sans requête de plage dans la plupart des cas
+        from .occupation import verifier
+        
+        libre = verifier(self.pk, date_reservation, heure_debut, heure_fin)
+        if libre or (libre is False and not reservation_id):
+            return libre
+        
+        # Bornes non alignées, ou conflit qui peut être la réservation modifiée
+        conflits = self.reservations.chevauchant(date_reservation, heure_debut, heure_fin)
+        
+        # Exclure la réservation en cours de modification
+        if reservation_id:
+            conflits = conflits.exclude(id=reservation_id)
+        
+        return not conflits.exists()
+
+
+class Reservation(models.Model):
+    """
+    Modèle représentant une réservation de salle
+    """
+    STATUT_CHOICES = [
+        ('en_attente', 'En attente'),
+        ('confirmee', 'Confirmée'),
+        ('annulee', 'Annulée'),
+        ('refusee', 'Refusée'),
+    ]
+    
+    # Statuts qui bloquent le créneau
+    STATUTS_ACTIFS = ['en_attente', 'confirmee']
+    
+    # Durées autorisées (en minutes)
+    DUREE_MIN = 30
+    DUREE_MAX = 240
+    
+    utilisateur = models.ForeignKey(
+        Utilisateur,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        verbose_name="Utilisateur"
+    )
+    
+    type_utilisateur = models.CharField(
+        max_length=20,
+        choices=Utilisateur.TYPE_CHOICES,
+        editable=False,
+        verbose_name="Type d'utilisateur",
+        help_text="Type du demandeur à la création, figé (clé de l'agrégat journalier)"
+    )
+    
+    salle = models.ForeignKey(
+        Salle,
+        on_delete=models.CASCADE,
+        related_name='reservations',
+        verbose_name="Salle"
+    )
+    
+    date_reservation = models.DateField(
+        verbose_name="Date de réservation"
+    )
+    
+    heure_debut = models.TimeField(
+        verbose_name="Heure de début"
+    )
+    
+    heure_fin = models.TimeField(
+        verbose_name="Heure de fin"
+    )
+    
+    motif = models.TextField(
+        verbose_name="Motif",
+        help_text="Raison de la réservation"
+    )
+    
+    statut = models.CharField(
+        max_length=20,
+        choices=STATUT_CHOICES,
+        default='en_attente',
+        verbose_name="Statut"
+    )
+    
+    nombre_participants = models.PositiveIntegerField(
+        validators=[MinValueValidator(1)],
+        verbose_name="Nombre de participants"
+    )
+    
+    serie = models.ForeignKey(
+        'SerieReservation',
+        on_delete=models.SET_NULL,
+        related_name='reservations',
+        null=True,
+        blank=True,
+        verbose_name="Série"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Dernière modification"
+    )
+    
+    objects = ReservationQuerySet.as_manager()
+    
+    # Champs dont la valeur enregistrée est mémorisée (compteurs, statistiques)
+    CHAMPS_SUIVIS = ('salle_id', 'date_reservation', 'heure_debut', 'heure_fin', 'statut')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        """Mémorise l'état chargé pour détecter les changements à la sauvegarde"""
+        instance = super().from_db(db, field_names, values)
+        instance._memoriser_origine()
+        return instance
+    
+    def _memoriser_origine(self):
+        self._origine = {champ: self.__dict__.get(champ) for champ in self.CHAMPS_SUIVIS}
+    
+    def origine(self, champ):
+        """Valeur d'un champ suivi telle qu'en base (avant la sauvegarde en cours)"""
+        return getattr(self, '_origine', {}).get(champ, getattr(self, champ))
+    
+    @staticmethod
+    def calculer_duree(heure_debut, heure_fin):
+        """Durée en minutes entre deux heures"""
+        return (heure_fin.hour * 60 + heure_fin.minute) - (heure_debut.hour * 60 + heure_debut.minute)
+    
+    class Meta:
+        verbose_name = "Réservation"
+        verbose_name_plural = "Réservations"
+        ordering = ['-date_reservation', '-heure_debut']
+        indexes = [
+            models.Index(fields=['date_reservation', 'statut']),
+            models.Index(fields=['utilisateur', 'statut']),
+            models.Index(fields=['salle', 'date_reservation']),
+            # Pagination par curseur (mes réservations, validation)
+            models.Index(fields=['utilisateur', '-date_reservation', '-heure_debut']),
+            models.Index(fields=['statut', 'date_reservation', 'heure_debut']),
+            # Last-Modified de l'API
+            models.Index(fields=['updated_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.salle.nom} - {self.date_reservation} à {self.heure_debut}"
+    
+    def clean(self):
+        """Validation personnalisée"""
+        super().clean()
+        
+        self.verifier_regles()
+        
+        # Vérifier la disponibilité
+        if all([self.salle, self.date_reservation, self.heure_debut, self.heure_fin]):
+            if not self.salle.verifier_disponibilite(
+                self.date_reservation,
+                self.heure_debut,
+                self.heure_fin,
+                self.pk
+            ):
+                raise ValidationError("La salle n'est pas disponible pour ce créneau")
+    
+    def verifier_regles(self):
+        """
+        Vérifie les règles métier indépendantes des autres réservations
+        (date, durée, capacité), sans requête de disponibilité
+        """
+        # Vérifier que la date n'est pas dans le passé
+        if self.date_reservation and self.date_reservation < date.today():
+            raise ValidationError({
+                'date_reservation': "La date ne peut pas être dans le passé"
+            })
+        
+        # Vérifier que heure_fin > heure_debut
+        if self.heure_debut and self.heure_fin and self.heure_fin <= self.heure_debut:
+            raise ValidationError({
+                'heure_fin': "L'heure de fin doit être après l'heure de début"
+            })
+        
+        # Calculer et vérifier la durée
+        if self.heure_debut and self.heure_fin:
+            debut = datetime.combine(date.today(), self.heure_debut)
+            fin = datetime.combine(date.today(), self.heure_fin)
+            duree = (fin - debut).total_seconds() / 60
+            
+            if duree < self.DUREE_MIN:
+                raise ValidationError("Durée minimale : 30 minutes")
+            
+            if duree > self.DUREE_MAX:
+                raise ValidationError("Durée maximale : 4 heures")
+        
+        # Vérifier la capacité
+        if self.salle and self.nombre_participants:
+            if self.nombre_participants > self.salle.capacite:
+                raise ValidationError({
+                    'nombre_participants': f"La salle a une capacité de {self.salle.capacite} personnes"
+                })
+    
+    @staticmethod
+    def statut_initial(utilisateur):
+        """Statut d'une nouvelle réservation selon le type d'utilisateur"""
+        if utilisateur.type_utilisateur in ['professeur', 'administrateur']:
+            return 'confirmee'
+        return 'en_attente'
+    
+    def peut_etre_modifiee(self):
+        """Vérifie si la réservation peut être modifiée (>2h avant)"""
+        if not self.date_reservation or not self.heure_debut:
+            return False
+        
+        debut_reservation = datetime.combine(
+            self.date_reservation,
+            self.heure_debut
+        )
+        debut_reservation = timezone.make_aware(debut_reservation)
+        
+        return debut_reservation - timezone.now() > timedelta(hours=2)
+    
+    def valider(self):
+        """Valide la réservation"""
+        self.statut = 'confirmee'
+        self.save()
+    
+    def annuler(self):
+        """Annule la réservation"""
+        self.statut = 'annulee'
+        self.save()
+    
+    def refuser(self):
+        """Refuse la réservation"""
+        self.statut = 'refusee'
+        self.save()
+    
+    def save(self, *args, **kwargs):
+        """Override save pour déterminer le statut initial"""
+        # Si c'est une nouvelle réservation
+        if not self.pk and not kwargs.get('force_insert', False):
+            # Déterminer le statut selon le type d'utilisateur
+            self.statut = self.statut_initial(self.utilisateur)
+        if not self.type_utilisateur:
+            self.type_utilisateur = self.utilisateur.type_utilisateur
+        
+        with transaction.atomic():
+            # Sérialiser les écritures sur la même salle/date : la vérification
+            # de disponibilité et l'insertion se font sous le même verrou.
+            # L'ancien couple d'une réservation active est verrouillé aussi :
+            # son index d'occupation est recalculé par le signal post_save
+            couples = set()
+            if self.statut in self.STATUTS_ACTIFS and self.salle_id and self.date_reservation:
+                couples.add((self.salle_id, self.date_reservation))
+            if self.pk and self.origine('statut') in self.STATUTS_ACTIFS:
+                couples.add((self.origine('salle_id'), self.origine('date_reservation')))
+            for salle_id, jour in sorted(couples):
+                VerrouCreneau.verrouiller(salle_id, jour)
+            self._verrouilles = couples
+            
+            # Validation complète
+            self.full_clean()
+            
+            super().save(*args, **kwargs)
+        
+        # Les signaux post_save ont vu l'ancien état : mémoriser le nouveau
+        self._memoriser_origine()
+
+
+class VerrouCreneau(models.Model):
+    """
+    Verrou de réservation pour une salle et une date
+    
+    Une ligne par couple (salle, date). La mettre à jour en début de transaction
+    pose un verrou d'écriture (verrou de ligne sur PostgreSQL/MySQL, verrou de
+    base sur SQLite) jusqu'au commit : deux réservations concurrentes sur la
+    même salle et la même date ne peuvent plus passer la vérification de
+    disponibilité en même temps.
+    """
+    salle = models.ForeignKey(
+        Salle,
+        on_delete=models.CASCADE,
+        related_name='verrous',
+        verbose_name="Salle"
+    )
+    
+    date_reservation = models.DateField(
+        verbose_name="Date de réservation"
+    )
+    
+    version = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Version"
+    )
+    
+    class Meta:
+        verbose_name = "Verrou de créneau"
+        verbose_name_plural = "Verrous de créneau"
+        constraints = [
+            models.UniqueConstraint(
+                fields=['salle', 'date_reservation'],
+                name='unique_verrou_salle_date'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"Verrou salle {self.salle_id} - {self.date_reservation}"
+    
+    @classmethod
+    def verrouiller(cls, salle_id, date_reservation):
+        """
+        Pose le verrou (salle, date) pour la transaction en cours
+        
+        Doit être appelé dans un transaction.atomic(). L'UPDATE est la première
+        écriture de la transaction : il bloque les autres écrivains jusqu'au commit.
+        """
+        verrous = cls.objects.filter(salle_id=salle_id, date_reservation=date_reservation)
+        if verrous.update(version=models.F('version') + 1):
+            return
+        
+        # Première réservation sur ce couple : créer la ligne de verrou
+        try:
+            with transaction.atomic():
+                cls.objects.create(salle_id=salle_id, date_reservation=date_reservation)
+        except IntegrityError:
+            # Créée en parallèle par une autre transaction
+            verrous.update(version=models.F('version') + 1)
+    
+    @classmethod
+    def verrouiller_dates(cls, salle_id, dates):
+        """
+        Pose les verrous d'une salle pour plusieurs dates en deux requêtes
+        (réservations en série)
+        """
+        cls.verrouiller_couples([(salle_id, jour) for jour in dates])
+    
+    @classmethod
+    def verrouiller_couples(cls, couples):
+        """
+        Pose les verrous de plusieurs couples (salle, date) en deux requêtes
+        
+        L'UPDATE porte sur le produit salles × dates : il peut verrouiller
+        quelques couples de trop, jamais de moins.
+        """
+        couples = set(couples)
+        if not couples:
+            return
+        cls.objects.bulk_create(
+            [cls(salle_id=salle_id, date_reservation=jour) for salle_id, jour in couples],
+            ignore_conflicts=True
+        )
+        cls.objects.filter(
+            salle_id__in={salle_id for salle_id, _ in couples},
+            date_reservation__in={jour for _, jour in couples}
+        ).update(version=models.F('version') + 1)
+
+
+class SerieReservation(models.Model):
+    """
+    Modèle représentant une série de réservations récurrentes
+    (même salle, même créneau, chaque semaine ou toutes les deux semaines)
+    """
+    FREQUENCE_CHOICES = [
+        ('hebdomadaire', 'Chaque semaine'),
+        ('bihebdomadaire', 'Toutes les deux semaines'),
+    ]
+    
+    # Intervalle entre deux occurrences (en jours)
+    INTERVALLES = {
+        'hebdomadaire': 7,
+        'bihebdomadaire': 14,
+    }
+    
+    utilisateur = models.ForeignKey(
+        Utilisateur,
+        on_delete=models.CASCADE,
+        related_name='series',
+        verbose_name="Utilisateur"
+    )
+    
+    salle = models.ForeignKey(
+        Salle,
+        on_delete=models.CASCADE,
+        related_name='series',
+        verbose_name="Salle"
+    )
+    
+    frequence = models.CharField(
+        max_length=20,
+        choices=FREQUENCE_CHOICES,
+        default='hebdomadaire',
+        verbose_name="Fréquence"
+    )
+    
+    date_debut = models.DateField(
+        verbose_name="Première occurrence"
+    )
+    
+    date_fin = models.DateField(
+        verbose_name="Jusqu'au"
+    )
+    
+    heure_debut = models.TimeField(
+        verbose_name="Heure de début"
+    )
+    
+    heure_fin = models.TimeField(
+        verbose_name="Heure de fin"
+    )
+    
+    motif = models.TextField(
+        verbose_name="Motif"
+    )
+    
+    nombre_participants = models.PositiveIntegerField(
+        validators=[MinValueValidator(1)],
+        verbose_name="Nombre de participants"
+    )
+    
+    exceptions = models.JSONField(
+        default=list,
+        blank=True,
+        verbose_name="Exceptions",
+        help_text="Dates exclues de la série (format ISO)"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de création"
+    )
+    
+    class Meta:
+        verbose_name = "Série de réservations"
+        verbose_name_plural = "Séries de réservations"
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f"{self.salle.nom} - {self.get_frequence_display()} du {self.date_debut} au {self.date_fin}"
+    
+    def dates(self):
+        """Dates des occurrences de la série, exceptions exclues"""
+        exceptions = set(self.exceptions or [])
+        intervalle = timedelta(days=self.INTERVALLES[self.frequence])
+        
+        dates = []
+        jour = self.date_debut
+        while jour <= self.date_fin:
+            if jour.isoformat() not in exceptions:
+                dates.append(jour)
+            jour += intervalle
+        return dates
+
+
+class Notification(models.Model):
+    """
+    Modèle pour les notifications utilisateur
+    """
+    TYPE_CHOICES = [
+        ('confirmation', 'Confirmation'),
+        ('rappel', 'Rappel'),
+        ('modification', 'Modification'),
+        ('annulation', 'Annulation'),
+    ]
+    
+    utilisateur = models.ForeignKey(
+        Utilisateur,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        verbose_name="Utilisateur"
+    )
+    
+    reservation = models.ForeignKey(
+        Reservation,
+        on_delete=models.CASCADE,
+        related_name='notifications',
+        null=True,
+        blank=True,
+        verbose_name="Réservation"
+    )
+    
+    type_notification = models.CharField(
+        max_length=20,
+        choices=TYPE_CHOICES,
+        verbose_name="Type"
+    )
+    
+    message = models.TextField(
+        verbose_name="Message"
+    )
+    
+    est_lue = models.BooleanField(
+        default=False,
+        verbose_name="Est lue"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date d'envoi"
+    )
+    
+    class Meta:
+        verbose_name = "Notification"
+        verbose_name_plural = "Notifications"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['utilisateur', 'est_lue']),
+            models.Index(fields=['utilisateur', '-created_at']),
+        ]
+    
+    def __str__(self):
+        return f"{self.get_type_notification_display()} - {self.utilisateur.get_full_name()}"
+    
+    def marquer_comme_lue(self):
+        """Marque la notification comme lue"""
+        if self.est_lue:
+            return
+        
+        with transaction.atomic():
+            # Ne décrémenter que si la ligne était encore non lue (double clic)
+            if Notification.objects.filter(pk=self.pk, est_lue=False).update(est_lue=True):
+                Utilisateur.objects.filter(
+                    pk=self.utilisateur_id,
+                    notifications_non_lues__gt=0
+                ).update(notifications_non_lues=models.F('notifications_non_lues') - 1)
+        self.est_lue = True
+
+
+class EvenementReservation(models.Model):
+    """
+    Boîte d'envoi (outbox) des notifications de réservation
+    
+    Écrite dans la même transaction que la réservation, puis transformée en
+    Notification par lots par la commande traiter_notifications.
+    """
+    TYPE_CHOICES = [
+        ('creation', 'Création'),
+        ('modification', 'Modification'),
+    ]
+    
+    reservation = models.ForeignKey(
+        Reservation,
+        on_delete=models.CASCADE,
+        related_name='evenements',
+        verbose_name="Réservation"
+    )
+    
+    utilisateur = models.ForeignKey(
+        Utilisateur,
+        on_delete=models.CASCADE,
+        related_name='evenements_reservation',
+        verbose_name="Utilisateur"
+    )
+    
+    type_evenement = models.CharField(
+        max_length=20,
+        choices=TYPE_CHOICES,
+        verbose_name="Type"
+    )
+    
+    statut = models.CharField(
+        max_length=20,
+        choices=Reservation.STATUT_CHOICES,
+        verbose_name="Statut de la réservation"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de l'événement"
+    )
+    
+    class Meta:
+        verbose_name = "Événement de réservation"
+        verbose_name_plural = "Événements de réservation"
+        ordering = ['id']
+    
+    def __str__(self):
+        return f"{self.get_type_evenement_display()} - réservation {self.reservation_id}"
+
+
+class Compteur(models.Model):
+    """
+    Compteur global maintenu incrémentalement (dashboard administrateur)
+    
+    Mis à jour par les signaux de sauvegarde/suppression, recalculé au besoin
+    par la commande recalculer_compteurs.
+    """
+    cle = models.CharField(
+        max_length=50,
+        unique=True,
+        verbose_name="Clé"
+    )
+    
+    valeur = models.BigIntegerField(
+        default=0,
+        verbose_name="Valeur"
+    )
+    
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name="Dernière modification"
+    )
+    
+    class Meta:
+        verbose_name = "Compteur"
+        verbose_name_plural = "Compteurs"
+        ordering = ['cle']
+    
+    def __str__(self):
+        return f"{self.cle} = {self.valeur}"
+
+
+class StatistiqueJournaliere(models.Model):
+    """
+    Agrégat journalier des réservations (jour × salle × statut × type d'utilisateur)
+    
+    Maintenu incrémentalement à chaque sauvegarde/suppression de réservation,
+    reconstruit par la commande recalculer_statistiques. Les rapports lisent
+    cette table au lieu de parcourir toutes les réservations.
+    """
+    date = models.DateField(
+        verbose_name="Date"
+    )
+    
+    salle = models.ForeignKey(
+        Salle,
+        on_delete=models.CASCADE,
+        related_name='statistiques_journalieres',
+        verbose_name="Salle"
+    )
+    
+    statut = models.CharField(
+        max_length=20,
+        choices=Reservation.STATUT_CHOICES,
+        verbose_name="Statut"
+    )
+    
+    type_utilisateur = models.CharField(
+        max_length=20,
+        choices=Utilisateur.TYPE_CHOICES,
+        verbose_name="Type d'utilisateur"
+    )
+    
+    nombre = models.IntegerField(
+        default=0,
+        verbose_name="Nombre de réservations"
+    )
+    
+    minutes = models.IntegerField(
+        default=0,
+        verbose_name="Minutes réservées"
+    )
+    
+    class Meta:
+        verbose_name = "Statistique journalière"
+        verbose_name_plural = "Statistiques journalières"
+        ordering = ['date', 'salle']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['date', 'salle', 'statut', 'type_utilisateur'],
+                name='unique_statistique_journaliere'
+            ),
+        ]
+    
+    def __str__(self):
+        return f"{self.date} - salle {self.salle_id} - {self.statut} - {self.type_utilisateur}: {self.nombre}"
+
+
+class OccupationJournaliere(models.Model):
+    """
+    Masques d'occupation d'une salle pour une journée (un bit par quart d'heure)
+    
+    Index compact (2 × 12 octets par salle et par jour occupé) des
+    réservations actives, utilisé par les vérifications de disponibilité.
+    Recalculé à chaque sauvegarde/suppression de réservation, reconstruit par
+    la commande reconstruire_occupations. Une journée sans ligne est libre.
+    """
+    salle = models.ForeignKey(
+        Salle,
+        on_delete=models.CASCADE,
+        related_name='occupations',
+        verbose_name="Salle"
+    )
+    
+    date = models.DateField(
+        verbose_name="Date"
+    )
+    
+    plein = models.BinaryField(
+        max_length=12,
+        verbose_name="Quarts d'heure entièrement occupés"
+    )
+    
+    partiel = models.BinaryField(
+        max_length=12,
+        verbose_name="Quarts d'heure au moins partiellement occupés"
+    )
+    
+    class Meta:
+        verbose_name = "Occupation journalière"
+        verbose_name_plural = "Occupations journalières"
+        ordering = ['date', 'salle']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['salle', 'date'],
+                name='unique_occupation_salle_date'
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['date']),
+        ]
+    
+    def __str__(self):
+        return f"Occupation salle {self.salle_id} - {self.date}"
+
+
+class Rapport(models.Model):
+    """
+    Modèle pour les rapports statistiques
+    """
+    TYPE_CHOICES = [
+        ('utilisation', 'Utilisation'),
+        ('statistiques', 'Statistiques'),
+        ('occupation', 'Occupation'),
+    ]
+    
+    administrateur = models.ForeignKey(
+        Utilisateur,
+        on_delete=models.CASCADE,
+        related_name='rapports_crees',
+        limit_choices_to={'is_staff': True},
+        verbose_name="Administrateur"
+    )
+    
+    titre = models.CharField(
+        max_length=200,
+        verbose_name="Titre"
+    )
+    
+    type_rapport = models.CharField(
+        max_length=20,
+        choices=TYPE_CHOICES,
+        verbose_name="Type"
+    )
+    
+    date_debut = models.DateField(
+        verbose_name="Date de début"
+    )
+    
+    date_fin = models.DateField(
+        verbose_name="Date de fin"
+    )
+    
+    donnees = models.JSONField(
+        default=dict,
+        verbose_name="Données",
+        help_text="Données statistiques du rapport"
+    )
+    
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name="Date de génération"
+    )
+    
+    class Meta:
+        verbose_name = "Rapport"
+        verbose_name_plural = "Rapports"
+        ordering = ['-created_at']
+    
+    def __str__(self):
         return f"{self.titre} ({self.created_at.date()})"
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Traitement de la boîte d'envoi des notifications
+"""
+from django.db import connection, transaction
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from .models import Utilisateur, EvenementReservation, Notification, Reservation
+
+
+STATUTS = dict(Reservation.STATUT_CHOICES)
+
+
+def construire_notification(evenement):
+    """Construit (sans l'enregistrer) la notification d'un événement"""
+    reservation = evenement.reservation
+    statut = STATUTS.get(evenement.statut, evenement.statut)
+
+    if evenement.type_evenement == 'creation':
+        # Nouvelle réservation
+        message = f"Réservation {statut} pour la salle {reservation.salle.nom} le {reservation.date_reservation} de {reservation.heure_debut} à {reservation.heure_fin}"
+        type_notification = 'confirmation'
+    else:
+        # Réservation modifiée
+        message = f"Votre réservation de la salle {reservation.salle.nom} le {reservation.date_reservation} a été mise à jour - Statut: {statut}"
+        type_notification = 'modification'
+
+    return Notification(
+        utilisateur_id=evenement.utilisateur_id,
+        reservation_id=evenement.reservation_id,
+        type_notification=type_notification,
+        message=message
+    )
+
+
+def recalculer_non_lues(utilisateur_ids=None):
+    """
+    Recalcule le compteur de notifications non lues depuis la table
+
+    Un seul UPDATE avec une sous-requête de comptage par utilisateur, quel
+    que soit le nombre d'utilisateurs ; seules les lignes dont le compteur
+    diffère sont écrites. C'est aussi le chemin de réconciliation après une
+    écriture qui contourne creer_notifications et les signaux (commande
+    recalculer_compteurs).
+
+    Args:
+        utilisateur_ids: Utilisateurs à recalculer (tous par défaut)
+
+    Returns:
+        int: Nombre d'utilisateurs dont le compteur a été corrigé
+    """
+    def non_lues():
+        return Coalesce(Subquery(
+            Notification.objects.filter(utilisateur=OuterRef('pk'), est_lue=False)
+            .order_by().values('utilisateur').annotate(nombre=Count('pk')).values('nombre')
+        ), 0)
+
+    utilisateurs = Utilisateur.objects.all()
+    if utilisateur_ids is not None:
+        utilisateurs = utilisateurs.filter(pk__in=utilisateur_ids)
+    return utilisateurs.exclude(notifications_non_lues=non_lues()).update(notifications_non_lues=non_lues())
+
+
+def creer_notifications(notifications):
+    """
+    Enregistre des notifications par bulk_create et met à jour le compteur
+    de non lues des destinataires (un UPDATE pour tous, recompté depuis la
+    table dans la transaction)
+
+    Args:
+        notifications: Liste de Notification non enregistrées
+
+    Returns:
+        list: Les notifications créées
+    """
+    with transaction.atomic():
+        notifications = Notification.objects.bulk_create(notifications)
+
+        destinataires = {n.utilisateur_id for n in notifications if not n.est_lue}
+        if destinataires:
+            recalculer_non_lues(destinataires)
+
+    return notifications
+
+
+def traiter_evenements(taille_lot=500):
+    """
+    Transforme un lot d'événements en notifications
+
+    Un lot coûte un nombre de requêtes indépendant du nombre d'événements :
+    lecture des événements (avec réservation et salle), bulk_create des
+    notifications, un UPDATE des compteurs, suppression des
+    événements traités. Sur les bases qui le permettent, les
+    lignes sont verrouillées avec SKIP LOCKED pour que plusieurs workers
+    puissent tourner en parallèle.
+
+    Returns:
+        int: Nombre d'événements traités
+    """
+    with transaction.atomic():
+        evenements = EvenementReservation.objects.select_related('reservation__salle')
+        if connection.features.has_select_for_update_skip_locked:
+            evenements = evenements.select_for_update(skip_locked=True, of=('self',))
+        evenements = list(evenements.order_by('id')[:taille_lot])
+
+        if not evenements:
+            return 0
+
+        creer_notifications(
+            [construire_notification(evenement) for evenement in evenements]
+        )
+        EvenementReservation.objects.filter(
+            id__in=[evenement.id for evenement in evenements]
+        ).delete()
+
+    return len(evenements)
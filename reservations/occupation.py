@@ -0,0 +1,245 @@
+"""
+Index d'occupation par quarts d'heure
+
+Chaque couple (salle, jour) occupé a deux masques de 96 bits (bit i = le
+quart d'heure qui commence à i × 15 minutes) :
+- plein : quarts d'heure entièrement couverts par une réservation active
+- partiel : quarts d'heure touchés, même en partie, par une réservation active
+
+Pour un créneau demandé, on prend les quarts d'heure qu'il touche :
+- aucun n'est dans partiel : la salle est libre
+- l'un d'eux est dans plein : la salle est occupée
+- sinon (bornes non alignées sur le quart d'heure) : indéterminé, la
+  requête SQL exacte tranche
+
+Pour un campus de 500 salles sur un an, l'index pèse au plus 500 × 365 × 24
+octets, soit environ 4,4 Mo.
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+
+from .models import Reservation, OccupationJournaliere, VerrouCreneau
+
+
+PAS = 15
+NB_QUARTS = 24 * 60 // PAS
+TAILLE = NB_QUARTS // 8
+
+# Bornes d'un filtre par couples : un terme OR par jour (profondeur
+# d'expression SQLite limitée à 1000) et des paramètres SQL en nombre
+# limité (999 sur les anciennes versions de SQLite)
+JOURS_PAR_FILTRE = 200
+PARAMETRES_PAR_FILTRE = 900
+
+
+def _en_minutes(heure):
+    return heure.hour * 60 + heure.minute
+
+
+def _bits(premier, dernier):
+    """Masque des bits [premier, dernier)"""
+    if dernier <= premier:
+        return 0
+    return ((1 << (dernier - premier)) - 1) << premier
+
+
+def masque_touche(heure_debut, heure_fin):
+    """Quarts d'heure touchés par un créneau"""
+    debut, fin = _en_minutes(heure_debut), _en_minutes(heure_fin)
+    return _bits(debut // PAS, -(-fin // PAS))
+
+
+def masques_creneau(heure_debut, heure_fin):
+    """(plein, partiel) d'un créneau"""
+    debut, fin = _en_minutes(heure_debut), _en_minutes(heure_fin)
+    return _bits(-(-debut // PAS), fin // PAS), _bits(debut // PAS, -(-fin // PAS))
+
+
+def encoder(masque):
+    return masque.to_bytes(TAILLE, 'little')
+
+
+def decoder(valeur):
+    return int.from_bytes(bytes(valeur), 'little')
+
+
+def intervalles(masque):
+    """
+    Plages occupées d'un masque, en minutes depuis minuit
+
+    Ne parcourt que les suites de bits à 1 (quelques-unes par jour), pas les
+    96 bits.
+    """
+    plages = []
+    while masque:
+        premier = (masque & -masque).bit_length() - 1
+        decale = masque >> premier
+        longueur = (decale ^ (decale + 1)).bit_length() - 1
+        plages.append((premier * PAS, (premier + longueur) * PAS))
+        masque &= ~_bits(premier, premier + longueur)
+    return plages
+
+
+def verdict(plein, partiel, heure_debut, heure_fin):
+    """
+    True si le créneau est libre, False s'il est occupé, None si l'index ne
+    suffit pas à trancher
+    """
+    touche = masque_touche(heure_debut, heure_fin)
+    if not partiel & touche:
+        return True
+    if plein & touche:
+        return False
+    return None
+
+
+def verifier(salle_id, date_reservation, heure_debut, heure_fin):
+    """Verdict de l'index pour une salle et un créneau (une requête)"""
+    ligne = OccupationJournaliere.objects.filter(
+        salle_id=salle_id, date=date_reservation
+    ).values_list('plein', 'partiel').first()
+    if ligne is None:
+        return True
+    return verdict(decoder(ligne[0]), decoder(ligne[1]), heure_debut, heure_fin)
+
+
+def masques_jour(date_reservation, salles=None):
+    """
+    {salle_id: (plein, partiel)} des salles occupées un jour donné
+
+    Args:
+        salles: QuerySet de salles pour restreindre la lecture (optionnel)
+    """
+    lignes = OccupationJournaliere.objects.filter(date=date_reservation)
+    if salles is not None:
+        lignes = lignes.filter(salle__in=salles.values('pk'))
+    return {
+        salle_id: (decoder(plein), decoder(partiel))
+        for salle_id, plein, partiel in lignes.values_list('salle_id', 'plein', 'partiel')
+    }
+
+
+def filtres_couples(couples, champ_date='date_reservation'):
+    """
+    Filtres exacts sur des couples (salle_id, date) : un terme par jour
+
+    Un filtre salles × dates lirait aussi toutes les combinaisons croisées,
+    soit la table entière pour un lot couvrant beaucoup de salles et de jours.
+    Les jours sont répartis en plusieurs filtres (une requête chacun) au-delà
+    de JOURS_PAR_FILTRE jours ou de PARAMETRES_PAR_FILTRE paramètres : un lot
+    qui couvre plusieurs années reste une requête valide.
+
+    Returns:
+        list: Filtres Q, un par tranche de jours
+    """
+    par_jour = defaultdict(set)
+    for salle_id, jour in couples:
+        par_jour[jour].add(salle_id)
+
+    filtres = []
+    condition, jours, parametres = Q(), 0, 0
+    for jour, salle_ids in sorted(par_jour.items()):
+        if jours and (jours == JOURS_PAR_FILTRE or parametres + 1 + len(salle_ids) > PARAMETRES_PAR_FILTRE):
+            filtres.append(condition)
+            condition, jours, parametres = Q(), 0, 0
+        condition |= Q(**{champ_date: jour, 'salle_id__in': salle_ids})
+        jours += 1
+        parametres += 1 + len(salle_ids)
+    if jours:
+        filtres.append(condition)
+    return filtres
+
+
+def _enregistrer(masques, couples):
+    """Écrit les masques calculés et supprime les lignes des couples devenus libres"""
+    occupes = {couple: valeurs for couple, valeurs in masques.items() if valeurs[1]}
+    if occupes:
+        OccupationJournaliere.objects.bulk_create(
+            [
+                OccupationJournaliere(
+                    salle_id=salle_id, date=jour, plein=encoder(plein), partiel=encoder(partiel)
+                )
+                for (salle_id, jour), (plein, partiel) in occupes.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['salle', 'date'],
+            update_fields=['plein', 'partiel'],
+            batch_size=1000
+        )
+    libres = [couple for couple in couples if couple not in occupes]
+    for filtre in filtres_couples(libres, 'date'):
+        OccupationJournaliere.objects.filter(filtre).delete()
+
+
+def reconstruire_jours(couples, verrouilles=()):
+    """
+    Recalcule les masques de couples (salle_id, date) depuis les réservations
+
+    Les couples sont verrouillés (VerrouCreneau) avant la lecture : sans ce
+    verrou, une reconstruction (annulation, refus, suppression) concurrente
+    d'une réservation en cours de confirmation lirait les réservations avant
+    son commit, puis écraserait son masque ; l'index annoncerait libre un
+    créneau pris.
+
+    Trois requêtes pour un lot de moins de JOURS_PAR_FILTRE jours, verrou
+    mis à part : lecture des réservations actives, upsert des masques,
+    suppression des journées devenues libres (lecture et suppression
+    répétées par tranche de jours au-delà). À appeler dans la transaction
+    de l'écriture source.
+
+    Args:
+        couples: Couples (salle_id, date) à recalculer
+        verrouilles: Couples déjà verrouillés par l'appelant dans la
+            transaction en cours
+    """
+    couples = set(couples)
+    if not couples:
+        return
+
+    with transaction.atomic(savepoint=False):
+        VerrouCreneau.verrouiller_couples(couples - set(verrouilles))
+
+        masques = {couple: (0, 0) for couple in couples}
+        for filtre in filtres_couples(couples):
+            reservations = Reservation.objects.actives().filter(filtre).values_list(
+                'salle_id', 'date_reservation', 'heure_debut', 'heure_fin'
+            )
+            for salle_id, jour, debut, fin in reservations:
+                plein, partiel = masques_creneau(debut, fin)
+                ancien_plein, ancien_partiel = masques[(salle_id, jour)]
+                masques[(salle_id, jour)] = (ancien_plein | plein, ancien_partiel | partiel)
+
+        _enregistrer(masques, couples)
+
+
+def reconstruire(date_debut=None, date_fin=None):
+    """
+    Reconstruit l'index (sur une période, ou entièrement)
+
+    Returns:
+        int: Nombre de journées occupées
+    """
+    reservations = Reservation.objects.actives()
+    lignes = OccupationJournaliere.objects.all()
+    if date_debut:
+        reservations = reservations.filter(date_reservation__gte=date_debut)
+        lignes = lignes.filter(date__gte=date_debut)
+    if date_fin:
+        reservations = reservations.filter(date_reservation__lte=date_fin)
+        lignes = lignes.filter(date__lte=date_fin)
+
+    masques = defaultdict(lambda: (0, 0))
+    for salle_id, jour, debut, fin in reservations.values_list(
+        'salle_id', 'date_reservation', 'heure_debut', 'heure_fin'
+    ).iterator(chunk_size=5000):
+        plein, partiel = masques_creneau(debut, fin)
+        ancien_plein, ancien_partiel = masques[(salle_id, jour)]
+        masques[(salle_id, jour)] = (ancien_plein | plein, ancien_partiel | partiel)
+
+    with transaction.atomic():
+        lignes.delete()
+        _enregistrer(masques, [])
+
+    return len(masques)
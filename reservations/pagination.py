@@ -0,0 +1,107 @@
+"""
+Pagination par curseur (keyset)
+
+Une page est lue avec un filtre « après la dernière ligne vue » sur les
+colonnes de tri au lieu d'un OFFSET : la page N coûte autant que la page 1
+et reste stable si des lignes sont ajoutées entre deux chargements.
+"""
+import base64
+import json
+from collections import namedtuple
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+
+
+TAILLE_PAGE = 25
+
+Page = namedtuple('Page', ['elements', 'url_suivante'])
+
+
+def _encoder(valeurs):
+    texte = json.dumps([str(valeur) for valeur in valeurs])
+    return base64.urlsafe_b64encode(texte.encode()).decode().rstrip('=')
+
+
+def _decoder(curseur, champs):
+    """Valeurs typées d'un curseur, ou None s'il est invalide"""
+    try:
+        texte = base64.urlsafe_b64decode(curseur + '=' * (-len(curseur) % 4)).decode()
+        valeurs = json.loads(texte)
+        if len(valeurs) != len(champs):
+            return None
+        return [champ.to_python(valeur) for champ, valeur in zip(champs, valeurs)]
+    except (ValueError, TypeError, ValidationError):
+        return None
+
+
+def _apres(ordre, valeurs):
+    """
+    Filtre « strictement après » pour un tri multi-colonnes :
+    (a > va) OU (a = va ET b > vb) OU ...
+    """
+    condition = Q()
+    egalites = {}
+    for nom, valeur in zip(ordre, valeurs):
+        champ = nom.lstrip('-')
+        comparaison = 'lt' if nom.startswith('-') else 'gt'
+        condition |= Q(**egalites, **{f'{champ}__{comparaison}': valeur})
+        egalites[champ] = valeur
+    return condition
+
+
+def paginer(request, queryset, ordre, taille=TAILLE_PAGE, parametre='apres'):
+    """
+    Page suivant le curseur passé dans la requête
+
+    La clé primaire est ajoutée au tri pour départager les ex aequo. Un
+    curseur illisible renvoie la première page.
+
+    Args:
+        request: Requête (le curseur est lu dans request.GET[parametre])
+        queryset: Éléments à paginer
+        ordre: Colonnes de tri, préfixées par « - » si décroissantes
+        taille: Nombre d'éléments par page
+
+    Returns:
+        Page: (éléments, URL de la page suivante ou None)
+    """
+    ordre = list(ordre)
+    if ordre[-1].lstrip('-') not in ('pk', 'id'):
+        ordre.append('-pk' if ordre[-1].startswith('-') else 'pk')
+    modele = queryset.model
+    champs = [
+        modele._meta.pk if nom.lstrip('-') == 'pk' else modele._meta.get_field(nom.lstrip('-'))
+        for nom in ordre
+    ]
+
+    queryset = queryset.order_by(*ordre)
+    curseur = request.GET.get(parametre)
+    valeurs = _decoder(curseur, champs) if curseur else None
+    if valeurs is not None:
+        queryset = queryset.filter(_apres(ordre, valeurs))
+
+    elements = list(queryset[:taille + 1])
+    url_suivante = None
+    if len(elements) > taille:
+        elements = elements[:taille]
+        dernier = elements[-1]
+        parametres = request.GET.copy()
+        parametres.pop('fragment', None)
+        parametres[parametre] = _encoder(
+            [getattr(dernier, champ.attname) for champ in champs]
+        )
+        url_suivante = f"{request.path}?{parametres.urlencode()}"
+
+    return Page(elements, url_suivante)
+
+
+def est_fragment(request):
+    """
+    Vrai si la requête demande seulement la suite d'une liste
+
+    Le bouton « Charger plus » (static/js/main.js) ajoute fragment=1 à
+    l'URL de la page suivante ; sans JavaScript, le lien affiche la page
+    complète suivante.
+    """
+    return request.GET.get('fragment') == '1'
@@ -0,0 +1,185 @@
+"""
+Profilage des requêtes HTTP par vue (nombre de requêtes SQL, temps SQL,
+temps de rendu, requêtes les plus lentes)
+
+Le middleware est activé par settings.PROFILAGE_ACTIF (variable
+d'environnement PROFILAGE=1). Désactivé, il lève MiddlewareNotUsed au
+démarrage : Django le retire de la chaîne et il ne coûte plus rien.
+
+Les mesures sont gardées en mémoire, par nom de vue, dans des tampons
+circulaires de settings.PROFILAGE_TAILLE requêtes : la mémoire reste
+bornée, et avec plusieurs processus chacun a ses propres mesures.
+"""
+import heapq
+import threading
+import time
+from collections import Counter, deque, namedtuple
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+
+# Requêtes les plus lentes gardées par vue, et longueur maximale de leur SQL
+NB_LENTES = 5
+LONGUEUR_SQL = 500
+
+Mesure = namedtuple('Mesure', ['duree', 'requetes', 'duree_sql', 'duree_rendu', 'repetitions'])
+
+# Mesure de la requête HTTP en cours (None hors profilage)
+_en_cours = ContextVar('profilage_en_cours', default=None)
+
+
+class _Collecte:
+    """Mesures d'une requête HTTP en cours"""
+
+    def __init__(self):
+        self.requetes = []
+        self.duree_rendu = 0.0
+        self.profondeur_rendu = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """execute_wrapper : chronomètre chaque requête SQL"""
+        debut = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.requetes.append((time.perf_counter() - debut, sql))
+
+
+class Registre:
+    """Tampons circulaires des mesures, par nom de vue (thread-safe)"""
+
+    def __init__(self, taille):
+        self.taille = taille
+        self._verrou = threading.Lock()
+        self._mesures = {}
+        self._lentes = {}
+
+    def ajouter(self, vue, mesure, requetes):
+        with self._verrou:
+            if vue not in self._mesures:
+                self._mesures[vue] = deque(maxlen=self.taille)
+                self._lentes[vue] = []
+            self._mesures[vue].append(mesure)
+            lentes = self._lentes[vue]
+            for duree, sql in heapq.nlargest(NB_LENTES, requetes, key=lambda requete: requete[0]):
+                element = (duree, sql[:LONGUEUR_SQL])
+                if len(lentes) < NB_LENTES:
+                    heapq.heappush(lentes, element)
+                elif duree > lentes[0][0]:
+                    heapq.heapreplace(lentes, element)
+
+    def vider(self):
+        with self._verrou:
+            self._mesures.clear()
+            self._lentes.clear()
+
+    def rapport(self):
+        """
+        Percentiles par vue, les vues les plus lentes (p90) d'abord
+
+        Returns:
+            list: Un dict par vue (durées en millisecondes)
+        """
+        with self._verrou:
+            copie = {vue: list(mesures) for vue, mesures in self._mesures.items()}
+            lentes = {vue: sorted(elements, reverse=True) for vue, elements in self._lentes.items()}
+
+        lignes = []
+        for vue, mesures in copie.items():
+            valeurs = np.array(mesures, dtype=float)
+            duree, requetes, duree_sql, duree_rendu, repetitions = valeurs.T
+            p50, p90, p99 = np.percentile(duree * 1000, [50, 90, 99])
+            lignes.append({
+                'vue': vue,
+                'nombre': len(mesures),
+                'duree_p50': p50,
+                'duree_p90': p90,
+                'duree_p99': p99,
+                'duree_max': duree.max() * 1000,
+                'requetes_p50': np.percentile(requetes, 50),
+                'requetes_max': int(requetes.max()),
+                'sql_p50': np.percentile(duree_sql * 1000, 50),
+                'sql_p90': np.percentile(duree_sql * 1000, 90),
+                'rendu_p50': np.percentile(duree_rendu * 1000, 50),
+                'rendu_p90': np.percentile(duree_rendu * 1000, 90),
+                'repetitions_max': int(repetitions.max()),
+                'lentes': [(duree_requete * 1000, sql) for duree_requete, sql in lentes[vue]],
+            })
+        return sorted(lignes, key=lambda ligne: ligne['duree_p90'], reverse=True)
+
+
+registre = Registre(getattr(settings, 'PROFILAGE_TAILLE', 500))
+
+
+def _chronometrer_rendu(render):
+    """Enveloppe Template.render du moteur Django : temps de rendu des pages"""
+    def enveloppe(self, *args, **kwargs):
+        collecte = _en_cours.get()
+        if collecte is None:
+            return render(self, *args, **kwargs)
+        # Un gabarit rendu depuis un autre ne compte qu'une fois
+        collecte.profondeur_rendu += 1
+        debut = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            collecte.profondeur_rendu -= 1
+            if not collecte.profondeur_rendu:
+                collecte.duree_rendu += time.perf_counter() - debut
+    enveloppe._profilage = True
+    return enveloppe
+
+
+def _installer_chronometre_rendu():
+    from django.template.backends.django import Template
+    if not getattr(Template.render, '_profilage', False):
+        Template.render = _chronometrer_rendu(Template.render)
+
+
+class ProfilageMiddleware:
+    """
+    Mesure chaque requête HTTP et l'ajoute au registre sous le nom de sa vue
+
+    repetitions : nombre d'exécutions du même SQL (aux paramètres près)
+    dans la requête, signe d'un accès N+1 (ex. self.salle dans une boucle).
+    Le temps de rendu comprend les requêtes SQL lancées par les gabarits.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILAGE_ACTIF', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        _installer_chronometre_rendu()
+
+    def __call__(self, request):
+        collecte = _Collecte()
+        jeton = _en_cours.set(collecte)
+        debut = time.perf_counter()
+        try:
+            with ExitStack() as pile:
+                for connexion in connections.all():
+                    pile.enter_context(connexion.execute_wrapper(collecte))
+                response = self.get_response(request)
+        finally:
+            _en_cours.reset(jeton)
+        duree = time.perf_counter() - debut
+
+        # Le contenu des réponses en flux (exports, calendriers) est produit
+        # après ce middleware, pendant l'envoi : il n'est pas mesuré
+        correspondance = request.resolver_match
+        vue = correspondance.view_name if correspondance else 'non résolue'
+        repetitions = Counter(sql for _, sql in collecte.requetes)
+        registre.ajouter(vue, Mesure(
+            duree=duree,
+            requetes=len(collecte.requetes),
+            duree_sql=sum(duree_requete for duree_requete, _ in collecte.requetes),
+            duree_rendu=collecte.duree_rendu,
+            repetitions=max(repetitions.values(), default=0),
+        ), collecte.requetes)
+        return response
+
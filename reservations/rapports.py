@@ -0,0 +1,337 @@
+"""
+Données des rapports administrateur, lues depuis l'agrégat journalier
+"""
+from collections import Counter
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.db.models import CharField
+from django.db.models.functions import Cast, ExtractHour, ExtractMinute
+
+from .disponibilite import HEURE_OUVERTURE, HEURE_FERMETURE
+from .models import Salle, Reservation, StatistiqueJournaliere
+
+
+# Pas de la grille d'occupation (minutes)
+PAS_OCCUPATION = 15
+
+JOURS_SEMAINE = ['Lundi', 'Mardi', 'Mercredi', 'Jeudi', 'Vendredi', 'Samedi', 'Dimanche']
+
+
+def _minutes_sql(champ):
+    """Expression SQL : heure d'un TimeField en minutes depuis minuit"""
+    return ExtractHour(champ) * 60 + ExtractMinute(champ)
+
+
+def cle_statistique(reservation, origine=False):
+    """
+    Clé (date, salle_id, statut, type_utilisateur) d'une réservation
+
+    Le type d'utilisateur est celui figé sur la réservation à sa création :
+    aucune requête, et un changement de type de l'utilisateur ne déplace pas
+    ses réservations existantes vers une autre clé.
+
+    Args:
+        reservation: Réservation
+        origine: Si True, utilise l'état enregistré avant la sauvegarde en cours
+    """
+    valeur = reservation.origine if origine else (lambda champ: getattr(reservation, champ))
+    return (
+        valeur('date_reservation'),
+        valeur('salle_id'),
+        valeur('statut'),
+        reservation.type_utilisateur,
+    )
+
+
+def duree_statistique(reservation, origine=False):
+    """Durée en minutes d'une réservation (état courant ou enregistré)"""
+    valeur = reservation.origine if origine else (lambda champ: getattr(reservation, champ))
+    return Reservation.calculer_duree(valeur('heure_debut'), valeur('heure_fin'))
+
+
+def ajuster_statistiques(deltas):
+    """
+    Applique des variations à l'agrégat journalier
+
+    Trois requêtes quel que soit le nombre de clés (au découpage en lots de
+    bulk_create près) : les lignes manquantes des clés en hausse sont créées
+    à zéro (sans effet sur une ligne existante, même créée en parallèle),
+    les lignes sont lues et verrouillées (SELECT ... FOR UPDATE là où la
+    base le permet), puis réécrites avec leurs nouvelles valeurs absolues
+    par un seul upsert. Pas de savepoint : à appeler dans la transaction de
+    l'écriture source.
+
+    Args:
+        deltas: {(date, salle_id, statut, type_utilisateur): (nombre, minutes)}
+    """
+    deltas = {cle: delta for cle, delta in deltas.items() if any(delta)}
+    if not deltas:
+        return
+
+    def ligne(cle, nombre, minutes):
+        jour, salle_id, statut, type_utilisateur = cle
+        return StatistiqueJournaliere(
+            date=jour, salle_id=salle_id, statut=statut, type_utilisateur=type_utilisateur,
+            nombre=nombre, minutes=minutes,
+        )
+
+    with transaction.atomic(savepoint=False):
+        # Une ligne absente ne peut que naître d'un ajout : un retrait sur une
+        # ligne absente (salle supprimée en cascade...) est ignoré
+        StatistiqueJournaliere.objects.bulk_create(
+            [ligne(cle, 0, 0) for cle, (nombre, _) in deltas.items() if nombre > 0],
+            ignore_conflicts=True,
+        )
+        existantes = {
+            (jour, salle_id, statut, type_utilisateur): (nombre, minutes)
+            for jour, salle_id, statut, type_utilisateur, nombre, minutes in (
+                StatistiqueJournaliere.objects.select_for_update().filter(
+                    date__in={cle[0] for cle in deltas},
+                    salle_id__in={cle[1] for cle in deltas},
+                ).order_by().values_list('date', 'salle_id', 'statut', 'type_utilisateur', 'nombre', 'minutes')
+            )
+        }
+
+        # Lignes verrouillées : les valeurs absolues calculées ici ne peuvent
+        # pas écraser une variation concurrente
+        modifiees = [
+            ligne(cle, existantes[cle][0] + nombre, existantes[cle][1] + minutes)
+            for cle, (nombre, minutes) in deltas.items() if cle in existantes
+        ]
+        if modifiees:
+            StatistiqueJournaliere.objects.bulk_create(
+                modifiees, update_conflicts=True,
+                unique_fields=['date', 'salle', 'statut', 'type_utilisateur'],
+                update_fields=['nombre', 'minutes'],
+            )
+
+
+def deltas_reservations(reservations, signe=1):
+    """Variations de l'agrégat correspondant à l'ajout (ou au retrait) de réservations"""
+    deltas = Counter()
+    minutes = Counter()
+    for reservation in reservations:
+        cle = cle_statistique(reservation)
+        deltas[cle] += signe
+        minutes[cle] += signe * duree_statistique(reservation)
+    return {cle: (deltas[cle], minutes[cle]) for cle in deltas}
+
+
+def deltas_modification(reservation):
+    """
+    Variations de l'agrégat dues à la sauvegarde d'une réservation existante
+
+    Aucune requête si aucun champ suivi n'a changé.
+    """
+    if all(reservation.origine(champ) == getattr(reservation, champ) for champ in Reservation.CHAMPS_SUIVIS):
+        return {}
+
+    deltas = Counter()
+    minutes = Counter()
+    ancienne = cle_statistique(reservation, origine=True)
+    nouvelle = cle_statistique(reservation)
+    deltas[ancienne] -= 1
+    minutes[ancienne] -= duree_statistique(reservation, origine=True)
+    deltas[nouvelle] += 1
+    minutes[nouvelle] += duree_statistique(reservation)
+    return {cle: (deltas[cle], minutes[cle]) for cle in deltas}
+
+
+def recalculer_statistiques(date_debut=None, date_fin=None):
+    """
+    Reconstruit l'agrégat journalier depuis les réservations
+
+    Une agrégation SQL groupée par (date, salle, statut, type d'utilisateur) ;
+    les lignes de la période sont remplacées dans une transaction. C'est le
+    chemin de réconciliation de l'agrégat (commande recalculer_statistiques)
+    après une écriture qui contourne les signaux sans l'ajuster.
+
+    Returns:
+        int: Nombre de lignes d'agrégat écrites
+    """
+    periode = Q()
+    if date_debut:
+        periode &= Q(date_reservation__gte=date_debut)
+    if date_fin:
+        periode &= Q(date_reservation__lte=date_fin)
+
+    duree = _minutes_sql('heure_fin') - _minutes_sql('heure_debut')
+    groupes = Reservation.objects.filter(periode).order_by().values(
+        'date_reservation', 'salle_id', 'statut', 'type_utilisateur'
+    ).annotate(total=Count('id'), total_minutes=Sum(duree))
+
+    anciennes = StatistiqueJournaliere.objects.all()
+    if date_debut:
+        anciennes = anciennes.filter(date__gte=date_debut)
+    if date_fin:
+        anciennes = anciennes.filter(date__lte=date_fin)
+
+    with transaction.atomic():
+        lignes = [
+            StatistiqueJournaliere(
+                date=groupe['date_reservation'],
+                salle_id=groupe['salle_id'],
+                statut=groupe['statut'],
+                type_utilisateur=groupe['type_utilisateur'],
+                nombre=groupe['total'],
+                minutes=groupe['total_minutes'],
+            )
+            for groupe in groupes
+        ]
+        anciennes.delete()
+        StatistiqueJournaliere.objects.bulk_create(lignes, batch_size=1000)
+
+    return len(lignes)
+
+
+def donnees_utilisation(date_debut, date_fin):
+    """
+    Données du rapport d'utilisation, calculées sur l'agrégat journalier
+
+    Le coût dépend du nombre de jours × salles de la période, pas du
+    nombre de réservations.
+    """
+    statistiques = StatistiqueJournaliere.objects.filter(
+        date__gte=date_debut,
+        date__lte=date_fin
+    ).order_by()
+
+    return {
+        'total_reservations': statistiques.aggregate(total=Sum('nombre'))['total'] or 0,
+        'par_statut': dict(
+            statistiques.values('statut').annotate(count=Sum('nombre'))
+            .filter(count__gt=0).values_list('statut', 'count')
+        ),
+        'par_type_utilisateur': dict(
+            statistiques.values('type_utilisateur').annotate(count=Sum('nombre'))
+            .filter(count__gt=0).values_list('type_utilisateur', 'count')
+        ),
+        'salles_populaires': list(
+            statistiques.values('salle__nom').annotate(count=Sum('nombre'))
+            .filter(count__gt=0).order_by('-count')[:10].values_list('salle__nom', 'count')
+        ),
+    }
+
+
+def _minutes_colonne(heures):
+    """
+    Convertit une colonne d'heures texte 'HH:MM[:SS]' en minutes, sans boucle Python
+
+    Les heures sont lues en texte (Cast) pour éviter la conversion en objets
+    time ligne par ligne ; les chiffres sont décodés sur le tableau d'octets.
+    """
+    chiffres = np.array(heures, dtype='S5').view(np.uint8).reshape(-1, 5).astype(np.int64) - ord('0')
+    return (chiffres[:, 0] * 10 + chiffres[:, 1]) * 60 + chiffres[:, 3] * 10 + chiffres[:, 4]
+
+
+def _pourcentage(valeur):
+    return round(float(valeur) * 100, 1)
+
+
+def donnees_occupation(date_debut, date_fin,
+                       heure_ouverture=HEURE_OUVERTURE, heure_fermeture=HEURE_FERMETURE):
+    """
+    Données du rapport d'occupation (réservations confirmées)
+
+    Les réservations de la période sont chargées en colonnes de texte (une
+    requête, décodage vectorisé) puis projetées sur une
+    grille NumPy salle × jour × créneau de 15 minutes. Chaque réservation
+    ajoute +1 à son créneau de début et -1 à son créneau de fin ; une somme
+    cumulée sur l'axe des créneaux donne la grille d'occupation, réduite
+    ensuite par salle, bâtiment, heure et jour de la semaine.
+
+    Pour 500 salles sur une année, la grille tient en une vingtaine de Mo.
+
+    Returns:
+        dict: Taux d'occupation (en %) global et par salle, bâtiment, heure, jour
+    """
+    salles = list(Salle.objects.order_by('batiment', 'nom').values_list('id', 'nom', 'batiment'))
+    ouverture = heure_ouverture.hour * 60 + heure_ouverture.minute
+    fermeture = heure_fermeture.hour * 60 + heure_fermeture.minute
+    nb_salles = len(salles)
+    nb_jours = (date_fin - date_debut).days + 1
+    nb_creneaux = (fermeture - ouverture) // PAS_OCCUPATION
+
+    lignes = list(
+        Reservation.objects.filter(
+            statut='confirmee',
+            date_reservation__gte=date_debut,
+            date_reservation__lte=date_fin
+        ).order_by().values_list(
+            'salle_id',
+            Cast('date_reservation', CharField()),
+            Cast('heure_debut', CharField()),
+            Cast('heure_fin', CharField()),
+        )
+    )
+
+    if not salles or nb_creneaux <= 0:
+        return {'total_reservations': len(lignes), 'taux_global': 0, 'nombre_salles': nb_salles,
+                'par_salle': [], 'par_batiment': [], 'par_heure': [], 'par_jour': []}
+
+    # Grille différentielle : une case de plus en fin de journée pour les -1
+    grille = np.zeros((nb_salles, nb_jours, nb_creneaux + 1), dtype=np.int16)
+
+    if lignes:
+        salle_ids, jours, heures_debut, heures_fin = zip(*lignes)
+        debuts = _minutes_colonne(heures_debut)
+        fins = _minutes_colonne(heures_fin)
+        ids_tries = np.array([salle[0] for salle in salles])
+        ordre = np.argsort(ids_tries)
+        index_salle = ordre[np.searchsorted(ids_tries, np.array(salle_ids), sorter=ordre)]
+        index_jour = (np.array(jours, dtype='datetime64[D]') - np.datetime64(date_debut, 'D')).astype(np.int64)
+        debut = np.clip((debuts - ouverture) // PAS_OCCUPATION, 0, nb_creneaux)
+        fin = np.clip(-((ouverture - fins) // PAS_OCCUPATION), 0, nb_creneaux)
+        valides = fin > debut
+
+        np.add.at(grille, (index_salle[valides], index_jour[valides], debut[valides]), 1)
+        np.add.at(grille, (index_salle[valides], index_jour[valides], fin[valides]), -1)
+
+    occupation = np.cumsum(grille, axis=2, dtype=np.int16)[:, :, :nb_creneaux] > 0
+
+    # Par salle
+    occupes_par_salle = occupation.sum(axis=(1, 2))
+    taux_salles = occupes_par_salle / (nb_jours * nb_creneaux)
+    par_salle = sorted(
+        ([nom, batiment, _pourcentage(taux)] for (_, nom, batiment), taux in zip(salles, taux_salles)),
+        key=lambda ligne: -ligne[2]
+    )
+
+    # Par bâtiment
+    batiments, index_batiment = np.unique([salle[2] for salle in salles], return_inverse=True)
+    taux_batiments = (
+        np.bincount(index_batiment, weights=occupes_par_salle)
+        / (np.bincount(index_batiment) * nb_jours * nb_creneaux)
+    )
+
+    # Par heure de la journée
+    heures = (ouverture + np.arange(nb_creneaux) * PAS_OCCUPATION) // 60
+    heures_uniques, index_heure = np.unique(heures, return_inverse=True)
+    taux_heures = (
+        np.bincount(index_heure, weights=occupation.sum(axis=(0, 1)))
+        / (np.bincount(index_heure) * nb_salles * nb_jours)
+    )
+
+    # Par jour de la semaine (seulement les jours présents dans la période)
+    jours_semaine = (np.arange(nb_jours) + date_debut.weekday()) % 7
+    occupes_par_jour = np.bincount(jours_semaine, weights=occupation.sum(axis=(0, 2)), minlength=7)
+    nb_par_jour = np.bincount(jours_semaine, minlength=7)
+
+    return {
+        'total_reservations': len(lignes),
+        'nombre_salles': nb_salles,
+        'taux_global': _pourcentage(occupation.mean()),
+        'par_salle': par_salle,
+        'par_batiment': [
+            [str(batiment), _pourcentage(taux)] for batiment, taux in zip(batiments, taux_batiments)
+        ],
+        'par_heure': [
+            [f"{int(heure):02d}h", _pourcentage(taux)] for heure, taux in zip(heures_uniques, taux_heures)
+        ],
+        'par_jour': [
+            [JOURS_SEMAINE[jour], _pourcentage(occupes_par_jour[jour] / (nb_par_jour[jour] * nb_salles * nb_creneaux))]
+            for jour in range(7) if nb_par_jour[jour]
+        ],
+    }
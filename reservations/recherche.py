@@ -0,0 +1,211 @@
+"""
+Recherche plein texte sur les salles et les motifs de réservation
+
+Sur SQLite, deux tables FTS5 à contenu externe indexent les salles (nom,
+bâtiment, description) et les réservations (motif). Des triggers les
+tiennent à jour à chaque écriture, y compris par bulk_create, update() ou
+en SQL direct. Une recherche lit l'index inversé au lieu de parcourir
+toute la table avec LIKE '%...%', et les résultats sont classés par
+pertinence (bm25).
+
+Chaque mot saisi est cherché comme début de mot, sans tenir compte de la
+casse ni des accents (« reu » trouve « Réunion »). Sur une autre base, ou
+si SQLite est compilé sans FTS5, la recherche se rabat sur icontains.
+
+L'index est installé (et reconstruit si ses triggers manquaient) après
+chaque migrate : sur SQLite, Django recrée une table pour la plupart des
+modifications de schéma, ce qui supprime ses triggers.
+"""
+import re
+from collections import namedtuple
+
+from django.db import connections, transaction, DEFAULT_DB_ALIAS, OperationalError
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Salle, Reservation
+
+
+IndexTexte = namedtuple('IndexTexte', ['modele', 'colonnes', 'poids'])
+
+# Poids bm25 par colonne : un mot du nom compte plus qu'un mot de la description
+SALLES = IndexTexte(Salle, ('nom', 'batiment', 'description'), (10.0, 2.0, 1.0))
+RESERVATIONS = IndexTexte(Reservation, ('motif',), (1.0,))
+
+INDEX = (SALLES, RESERVATIONS)
+
+# {(alias, base): bool} : présence de l'index, vérifiée une fois par processus
+_disponibles = {}
+
+
+def _table(index):
+    return f"{index.modele._meta.db_table}_fts"
+
+
+def expression(texte):
+    """
+    Requête FTS5 d'un texte saisi : chaque mot, entre guillemets, comme
+    préfixe (ET implicite). None si le texte ne contient aucun mot.
+    """
+    mots = re.findall(r'\w+', texte or '')
+    if not mots:
+        return None
+    return ' '.join(f'"{mot}"*' for mot in mots)
+
+
+def index_disponible(using=DEFAULT_DB_ALIAS):
+    """Vrai si les tables FTS5 existent sur cette base"""
+    connexion = connections[using]
+    cle = (using, connexion.settings_dict['NAME'])
+    if cle not in _disponibles:
+        if connexion.vendor != 'sqlite':
+            _disponibles[cle] = False
+        else:
+            with connexion.cursor() as curseur:
+                curseur.execute(
+                    "SELECT count(*) FROM sqlite_master WHERE type = 'table' AND name IN (%s, %s)",
+                    [_table(index) for index in INDEX]
+                )
+                _disponibles[cle] = curseur.fetchone()[0] == len(INDEX)
+    return _disponibles[cle]
+
+
+def _triggers(index):
+    """(nom, SQL) des triggers qui recopient les écritures de la table source dans l'index"""
+    table = _table(index)
+    source = index.modele._meta.db_table
+    colonnes = ', '.join(index.colonnes)
+    anciennes = ', '.join(f'old.{colonne}' for colonne in index.colonnes)
+    nouvelles = ', '.join(f'new.{colonne}' for colonne in index.colonnes)
+    inserer = f"INSERT INTO {table}(rowid, {colonnes}) VALUES (new.id, {nouvelles});"
+    retirer = f"INSERT INTO {table}({table}, rowid, {colonnes}) VALUES ('delete', old.id, {anciennes});"
+    return [
+        (f'{table}_ai', f"AFTER INSERT ON {source} BEGIN {inserer} END"),
+        (f'{table}_ad', f"AFTER DELETE ON {source} BEGIN {retirer} END"),
+        # Seuls les champs indexés déclenchent la réindexation (pas les
+        # changements de statut, qui sont les écritures les plus fréquentes)
+        (f'{table}_au', f"AFTER UPDATE OF {colonnes} ON {source} BEGIN {retirer} {inserer} END"),
+    ]
+
+
+def installer_index(using=DEFAULT_DB_ALIAS):
+    """
+    Crée les tables FTS5 et leurs triggers s'ils manquent (SQLite seulement)
+
+    Un index créé, ou dont un trigger manquait, est reconstruit depuis sa
+    table source. Sans changement, coûte une requête.
+
+    Returns:
+        bool: Vrai si l'index est en place
+    """
+    connexion = connections[using]
+    _disponibles.pop((using, connexion.settings_dict['NAME']), None)
+    if connexion.vendor != 'sqlite':
+        return False
+
+    with connexion.cursor() as curseur:
+        curseur.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger')")
+        existants = {nom for nom, in curseur.fetchall()}
+        try:
+            with transaction.atomic(using=using):
+                for index in INDEX:
+                    table = _table(index)
+                    a_reconstruire = table not in existants
+                    if a_reconstruire:
+                        curseur.execute(
+                            f"CREATE VIRTUAL TABLE {table} USING fts5("
+                            f"{', '.join(index.colonnes)}, "
+                            f"content='{index.modele._meta.db_table}', content_rowid='id', "
+                            f"tokenize='unicode61 remove_diacritics 2')"
+                        )
+                    for nom, corps in _triggers(index):
+                        if nom not in existants:
+                            curseur.execute(f"CREATE TRIGGER {nom} {corps}")
+                            a_reconstruire = True
+                    if a_reconstruire:
+                        curseur.execute(f"INSERT INTO {table}({table}) VALUES ('rebuild')")
+        except OperationalError:
+            # SQLite compilé sans FTS5 : la recherche reste sur icontains
+            return False
+    return index_disponible(using)
+
+
+def installer_apres_migration(sender, using=DEFAULT_DB_ALIAS, **kwargs):
+    """Receveur post_migrate (voir ReservationsConfig.ready)"""
+    installer_index(using)
+
+
+def _correspondances(index, requete):
+    """Sous-requête des identifiants correspondant à une requête FTS5"""
+    table = _table(index)
+    return RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", [requete])
+
+
+def _repli(colonnes, texte):
+    """Filtre icontains : chaque mot doit apparaître dans l'une des colonnes"""
+    condition = Q()
+    for mot in re.findall(r'\w+', texte or ''):
+        condition &= Q(*[Q(**{f'{colonne}__icontains': mot}) for colonne in colonnes], _connector=Q.OR)
+    return condition
+
+
+def filtre(index, texte):
+    """
+    Q des lignes correspondant au texte (index plein texte ou icontains)
+
+    Pour combiner avec d'autres critères (recherche de l'administration).
+    """
+    requete = expression(texte)
+    if requete is None:
+        return Q(pk__in=[])
+    if index_disponible():
+        return Q(pk__in=_correspondances(index, requete))
+    return _repli(index.colonnes, texte)
+
+
+def _classes(index, texte, limite, queryset):
+    """
+    Éléments du queryset correspondant au texte, les plus pertinents d'abord
+
+    Avec l'index, le classement bm25 et la limite sont appliqués par FTS5,
+    puis les lignes retenues sont lues par clé primaire.
+    """
+    requete = expression(texte)
+    if requete is None:
+        return []
+    if not index_disponible():
+        return list(queryset.filter(_repli(index.colonnes, texte))[:limite])
+
+    table = _table(index)
+    poids = ', '.join(str(valeur) for valeur in index.poids)
+    sql = f"SELECT rowid FROM {table} WHERE {table} MATCH %s"
+    parametres = [requete]
+    if queryset.query.where:
+        # Les restrictions du queryset (propriétaire...) s'appliquent dans
+        # la même requête, avant la limite
+        sous_requete, parametres_filtre = queryset.order_by().values('pk').query.sql_with_params()
+        sql += f" AND rowid IN ({sous_requete})"
+        parametres += parametres_filtre
+    with connections[queryset.db].cursor() as curseur:
+        curseur.execute(f"{sql} ORDER BY bm25({table}, {poids}) LIMIT %s", [*parametres, limite])
+        ids = [pk for pk, in curseur.fetchall()]
+    elements = queryset.in_bulk(ids)
+    return [elements[pk] for pk in ids if pk in elements]
+
+
+def rechercher_salles(texte, limite=10):
+    """Salles dont le nom, le bâtiment ou la description correspondent au texte"""
+    return _classes(SALLES, texte, limite, Salle.objects.all())
+
+
+def rechercher_reservations(texte, limite=20, utilisateur=None):
+    """
+    Réservations dont le motif correspond au texte
+
+    Args:
+        utilisateur: Si donné, seulement ses réservations
+    """
+    reservations = Reservation.objects.select_related('salle', 'utilisateur')
+    if utilisateur is not None:
+        reservations = reservations.filter(utilisateur=utilisateur)
+    return _classes(RESERVATIONS, texte, limite, reservations)
@@ -0,0 +1,120 @@
+"""
+Réservations récurrentes
+Vérifie et crée toutes les occurrences d'une série en un nombre constant de requêtes
+"""
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .models import Reservation, Notification, VerrouCreneau
+from .notifications import creer_notifications
+from .statistiques import invalider_statistiques
+from . import compteurs
+from .rapports import ajuster_statistiques, deltas_reservations
+from .occupation import reconstruire_jours
+
+
+def conflits_serie(salle, dates, heure_debut, heure_fin):
+    """
+    Cherche les conflits de toutes les occurrences en une seule requête
+
+    Args:
+        salle: Salle réservée
+        dates: Dates des occurrences
+        heure_debut: Heure de début commune
+        heure_fin: Heure de fin commune
+
+    Returns:
+        dict: {date: [réservations en conflit]} pour les seules dates en conflit
+    """
+    conflits = {}
+    reservations = Reservation.objects.actives().filter(
+        salle=salle,
+        date_reservation__in=dates,
+        heure_debut__lt=heure_fin,
+        heure_fin__gt=heure_debut
+    ).order_by('date_reservation', 'heure_debut')
+
+    for reservation in reservations:
+        conflits.setdefault(reservation.date_reservation, []).append(reservation)
+
+    return conflits
+
+
+def creer_serie(serie, ignorer_conflits=False):
+    """
+    Enregistre une série et toutes ses occurrences dans une transaction
+
+    Les verrous (salle, date) sont posés pour toutes les dates avant la
+    vérification des conflits, puis les occurrences sont insérées par
+    bulk_create : pas de save() ni de signal par occurrence, une seule
+    notification récapitulative.
+
+    Args:
+        serie: SerieReservation non enregistrée
+        ignorer_conflits: Si True, les dates en conflit sont sautées
+            (erreur malgré tout si aucune date n'est libre)
+
+    Returns:
+        tuple: (réservations créées, {date: conflits})
+
+    Raises:
+        ValidationError: Si des dates sont en conflit et ignorer_conflits est False
+    """
+    dates = serie.dates()
+
+    with transaction.atomic():
+        VerrouCreneau.verrouiller_dates(serie.salle_id, dates)
+
+        conflits = conflits_serie(serie.salle, dates, serie.heure_debut, serie.heure_fin)
+        if conflits and (not ignorer_conflits or len(conflits) == len(dates)):
+            raise ValidationError([
+                "Salle déjà réservée le %s (%s)" % (
+                    jour.strftime('%d/%m/%Y'),
+                    ", ".join(
+                        f"{r.heure_debut:%H:%M}-{r.heure_fin:%H:%M}" for r in conflits[jour]
+                    )
+                )
+                for jour in sorted(conflits)
+            ])
+
+        serie.save()
+
+        statut = Reservation.statut_initial(serie.utilisateur)
+        reservations = Reservation.objects.bulk_create([
+            Reservation(
+                utilisateur=serie.utilisateur,
+                type_utilisateur=serie.utilisateur.type_utilisateur,
+                salle=serie.salle,
+                serie=serie,
+                date_reservation=jour,
+                heure_debut=serie.heure_debut,
+                heure_fin=serie.heure_fin,
+                motif=serie.motif,
+                statut=statut,
+                nombre_participants=serie.nombre_participants,
+            )
+            for jour in dates if jour not in conflits
+        ])
+
+        # bulk_create n'envoie pas post_save
+        transaction.on_commit(lambda: invalider_statistiques(serie.utilisateur_id))
+        compteurs.incrementer('reservations', len(reservations))
+        if statut == 'en_attente':
+            compteurs.incrementer('reservations_en_attente', len(reservations))
+        ajuster_statistiques(deltas_reservations(reservations))
+        couples = {(serie.salle_id, r.date_reservation) for r in reservations}
+        reconstruire_jours(couples, verrouilles=couples)
+
+        if reservations:
+            creer_notifications([Notification(
+                utilisateur=serie.utilisateur,
+                type_notification='confirmation',
+                message=(
+                    f"Série de {len(reservations)} réservation(s) "
+                    f"{dict(Reservation.STATUT_CHOICES)[statut]} pour la salle {serie.salle.nom} "
+                    f"({serie.get_frequence_display().lower()}) du {serie.date_debut} au {serie.date_fin} "
+                    f"de {serie.heure_debut} à {serie.heure_fin}"
+                )
+            )])
+
+    return reservations, conflits
@@ -1,36 +1,152 @@
-"""
-Signaux Django pour automatiser certaines actions
-"""
-from django.db.models.signals import post_save, post_delete
-from django.dispatch import receiver
-from .models import Reservation, Notification
-
-
-@receiver(post_save, sender=Reservation)
-def creer_notification_reservation(sender, instance, created, **kwargs):
-    """
-    Crée automatiquement une notification lors de la création/modification d'une réservation
-    """
-    if created:
-        # Nouvelle réservation
-        message = f"Réservation {instance.get_statut_display()} pour la salle {instance.salle.nom} le {instance.date_reservation} de {instance.heure_debut} à {instance.heure_fin}"
-        
-        Notification.objects.create(
-            utilisateur=instance.utilisateur,
-            reservation=instance,
-            type_notification='confirmation',
-            message=message
-        )
-    else:
-        # Réservation modifiée
-        # Note: Pour détecter les changements de statut précis, on pourrait utiliser django-model-utils
-        # Pour l'instant, on crée une notification générique pour toute modification
-        message = f"Votre réservation de la salle {instance.salle.nom} le {instance.date_reservation} a été mise à jour - Statut: {instance.get_statut_display()}"
-        type_notif = 'modification'
-        
-        Notification.objects.create(
-            utilisateur=instance.utilisateur,
-            reservation=instance,
-            type_notification=type_notif,
-            message=message
-        )
\ No newline at end of file
+"""
+Signaux Django pour automatiser certaines actions
+"""
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import Utilisateur, Salle, Reservation, EvenementReservation, Notification
+from .statistiques import invalider_statistiques
+from .catalogue import invalider_salles
+from .notifications import recalculer_non_lues
+from . import compteurs
+from .rapports import (
+    ajuster_statistiques, deltas_reservations, deltas_modification,
+    cle_statistique, duree_statistique
+)
+from .occupation import reconstruire_jours
+
+
+@receiver(post_save, sender=Reservation)
+def creer_notification_reservation(sender, instance, created, **kwargs):
+    """
+    Enregistre un événement dans la boîte d'envoi lors de la création/modification d'une réservation
+    
+    La notification elle-même (message, salle...) est construite plus tard par
+    la commande traiter_notifications : la requête ne paie qu'un INSERT, dans
+    la même transaction que la réservation.
+    """
+    EvenementReservation.objects.create(
+        reservation=instance,
+        utilisateur_id=instance.utilisateur_id,
+        type_evenement='creation' if created else 'modification',
+        statut=instance.statut
+    )
+
+
+@receiver(post_save, sender=Reservation)
+@receiver(post_delete, sender=Reservation)
+def invalider_statistiques_reservation(sender, instance, **kwargs):
+    """Invalide le cache du tableau de bord du propriétaire de la réservation"""
+    # Après le commit, pour qu'une autre requête ne remette pas en cache l'ancien état
+    transaction.on_commit(lambda: invalider_statistiques(instance.utilisateur_id))
+
+
+@receiver(post_save, sender=Reservation)
+def repercuter_reservation(sender, instance, created, **kwargs):
+    """
+    Répercute la sauvegarde sur les compteurs, l'agrégat journalier et
+    l'index d'occupation
+
+    Un seul récepteur pour les trois : les changements de la sauvegarde sont
+    calculés une fois depuis l'état mémorisé (origine), les compteurs
+    tiennent en un UPDATE, et rien n'est écrit pour ce qui n'a pas changé
+    (modification du seul motif, par exemple).
+    """
+    ancien_statut = None if created else instance.origine('statut')
+    compteurs.ajuster({
+        'reservations': int(created),
+        'reservations_en_attente': (instance.statut == 'en_attente') - (ancien_statut == 'en_attente'),
+    })
+
+    if created:
+        ajuster_statistiques(deltas_reservations([instance]))
+    else:
+        ajuster_statistiques(deltas_modification(instance))
+
+    # Masques d'occupation de la journée, et de l'ancienne si elle a changé
+    couples = {(instance.salle_id, instance.date_reservation)}
+    if not created:
+        inchangee = all(
+            instance.origine(champ) == getattr(instance, champ)
+            for champ in ('salle_id', 'date_reservation', 'heure_debut', 'heure_fin')
+        ) and (
+            (ancien_statut in Reservation.STATUTS_ACTIFS) == (instance.statut in Reservation.STATUTS_ACTIFS)
+        )
+        if inchangee:
+            return
+        couples.add((instance.origine('salle_id'), instance.origine('date_reservation')))
+    # Couples verrouillés par Reservation.save : pas de second verrou
+    reconstruire_jours(couples, verrouilles=getattr(instance, '_verrouilles', ()))
+
+
+@receiver(post_delete, sender=Reservation)
+def retirer_reservation(sender, instance, origin=None, **kwargs):
+    """Retire la réservation supprimée des compteurs, de l'agrégat et de l'index"""
+    statut = instance.origine('statut')
+    compteurs.ajuster({'reservations': -1, 'reservations_en_attente': -(statut == 'en_attente')})
+    ajuster_statistiques({
+        cle_statistique(instance, origine=True): (-1, -duree_statistique(instance, origine=True))
+    })
+
+    # Suppression en cascade d'une salle : son index et ses verrous partent avec elle
+    salle_supprimee = isinstance(origin, Salle) or getattr(origin, 'model', None) is Salle
+    if salle_supprimee or statut not in Reservation.STATUTS_ACTIFS:
+        return
+    reconstruire_jours({(instance.origine('salle_id'), instance.origine('date_reservation'))})
+
+
+@receiver(post_save, sender=Salle)
+def compter_salle(sender, instance, created, **kwargs):
+    if created:
+        compteurs.incrementer('salles')
+
+
+@receiver(post_delete, sender=Salle)
+def decompter_salle(sender, instance, **kwargs):
+    compteurs.incrementer('salles', -1)
+
+
+@receiver(post_save, sender=Salle)
+@receiver(post_delete, sender=Salle)
+def invalider_catalogue(sender, instance, **kwargs):
+    """Change la version du catalogue : les listes de salles en cache sont recalculées"""
+    transaction.on_commit(invalider_salles)
+
+
+@receiver(post_save, sender=Utilisateur)
+def compter_utilisateur(sender, instance, created, **kwargs):
+    """Tient à jour le compteur d'utilisateurs actifs"""
+    etait_actif = False if created else getattr(instance, '_actif_origine', instance.is_active)
+    if etait_actif != instance.is_active:
+        compteurs.incrementer('utilisateurs_actifs', 1 if instance.is_active else -1)
+    instance._actif_origine = instance.is_active
+
+
+@receiver(post_delete, sender=Utilisateur)
+def decompter_utilisateur(sender, instance, **kwargs):
+    if getattr(instance, '_actif_origine', instance.is_active):
+        compteurs.incrementer('utilisateurs_actifs', -1)
+
+
+@receiver(post_save, sender=Notification)
+def recompter_notifications_non_lues(sender, instance, **kwargs):
+    """
+    Recompte les non lues du destinataire après un save() individuel
+    (administration, shell) : les créations en lot passent par
+    creer_notifications, la lecture par marquer_comme_lue
+    """
+    recalculer_non_lues([instance.utilisateur_id])
+
+
+@receiver(post_delete, sender=Notification)
+def decrementer_notifications_non_lues(sender, instance, **kwargs):
+    """
+    Garde le compteur de non lues juste quand une notification non lue est supprimée
+    (suppression directe ou en cascade avec sa réservation)
+    """
+    if not instance.est_lue:
+        Utilisateur.objects.filter(
+            pk=instance.utilisateur_id,
+            notifications_non_lues__gt=0
+        ).update(notifications_non_lues=F('notifications_non_lues') - 1)
@@ -0,0 +1,59 @@
+"""
+Statistiques du tableau de bord, calculées en une agrégation et mises en cache
+"""
+from datetime import date
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import Reservation
+
+
+# Durée de vie d'une entrée de cache (secondes) ; l'invalidation se fait
+# surtout par les signaux, ce délai borne seulement la péremption des noms de salle
+DUREE_CACHE = 600
+
+
+def _cle_statistiques(utilisateur_id):
+    return f"reservations:statistiques:{utilisateur_id}"
+
+
+def statistiques_utilisateur(utilisateur):
+    """
+    Compteurs et prochaines réservations du tableau de bord d'un utilisateur
+
+    En cas d'absence du cache : une requête d'agrégation conditionnelle pour
+    les trois compteurs, une requête pour les 5 prochaines réservations.
+    La date du jour fait partie de l'entrée : elle est recalculée après minuit.
+
+    Returns:
+        dict: total_reservations, en_attente, confirmees, prochaines
+    """
+    today = date.today()
+    cle = _cle_statistiques(utilisateur.pk)
+    statistiques = cache.get(cle)
+    if statistiques is not None and statistiques['date'] == today:
+        return statistiques
+
+    compteurs = Reservation.objects.filter(utilisateur=utilisateur).aggregate(
+        total_reservations=Count('id'),
+        en_attente=Count('id', filter=Q(statut='en_attente')),
+        confirmees=Count('id', filter=Q(statut='confirmee')),
+    )
+
+    prochaines = list(
+        Reservation.objects.filter(
+            utilisateur=utilisateur,
+            date_reservation__gte=today,
+            statut='confirmee'
+        ).select_related('salle').order_by('date_reservation', 'heure_debut')[:5]
+    )
+
+    statistiques = dict(compteurs, prochaines=prochaines, date=today)
+    cache.set(cle, statistiques, DUREE_CACHE)
+    return statistiques
+
+
+def invalider_statistiques(*utilisateur_ids):
+    """Supprime les statistiques en cache des utilisateurs donnés"""
+    cache.delete_many([_cle_statistiques(utilisateur_id) for utilisateur_id in set(utilisateur_ids)])
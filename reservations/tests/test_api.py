@@ -0,0 +1,73 @@
+"""
+Tests de l'API JSON : réponses conditionnelles (ETag, Last-Modified) et
+créneaux libres qui dépendent de l'heure
+"""
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from reservations.models import Utilisateur, Salle, Reservation
+
+
+localtime = timezone.localtime
+
+
+def a_l_heure(heure):
+    """Patch de timezone.localtime() : aujourd'hui à l'heure donnée"""
+    maintenant = timezone.make_aware(datetime.combine(date.today(), heure))
+    return mock.patch(
+        'django.utils.timezone.localtime',
+        side_effect=lambda valeur=None, fuseau=None: (
+            maintenant if valeur is None else localtime(valeur, fuseau)
+        ),
+    )
+
+
+class ApiConditionnelleTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.professeur = Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+
+    def setUp(self):
+        self.client.force_login(self.professeur)
+        aujourd_hui = date.today().isoformat()
+        self.url = reverse('api_disponibilites_salle', args=[self.salle.pk])
+        self.parametres = {'date_debut': aujourd_hui, 'date_fin': aujourd_hui, 'duree': 60}
+
+    def appeler(self, url=None, parametres=None, etag=None):
+        entetes = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url or self.url, self.parametres if parametres is None else parametres, **entetes)
+
+    def test_304_tant_que_rien_ne_change(self):
+        reponse = self.appeler(reverse('api_salles'), {})
+        self.assertEqual(reponse.status_code, 200)
+        self.assertTrue(reponse.has_header('Last-Modified'))
+        self.assertEqual(self.appeler(reverse('api_salles'), {}, etag=reponse['ETag']).status_code, 304)
+
+    def test_nouvelle_version_apres_une_reservation(self):
+        with a_l_heure(time(9)):
+            etag = self.appeler()['ETag']
+            Reservation.objects.create(
+                utilisateur=self.professeur, salle=self.salle, date_reservation=date.today() + timedelta(days=1),
+                heure_debut=time(10), heure_fin=time(11), motif='Cours', nombre_participants=5,
+            )
+            self.assertEqual(self.appeler(etag=etag).status_code, 200)
+
+    def test_nouvelle_version_a_chaque_quart_d_heure(self):
+        with a_l_heure(time(10, 1)):
+            reponse = self.appeler()
+        self.assertEqual(reponse.json()['libre'][date.today().isoformat()][0], ['10:15', '20:00'])
+
+        # Même quart d'heure de départ : même version
+        with a_l_heure(time(10, 15)):
+            self.assertEqual(self.appeler(etag=reponse['ETag']).status_code, 304)
+
+        with a_l_heure(time(10, 16)):
+            suivante = self.appeler(etag=reponse['ETag'])
+        self.assertEqual(suivante.status_code, 200)
+        self.assertEqual(suivante.json()['libre'][date.today().isoformat()][0], ['10:30', '20:00'])
@@ -0,0 +1,70 @@
+"""
+Tests de la boîte d'envoi des notifications : un événement par sauvegarde,
+notifications créées par lots par le worker
+"""
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from reservations.models import Utilisateur, Salle, Reservation, EvenementReservation, Notification
+from reservations.notifications import traiter_evenements
+
+
+class BoiteEnvoiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1')
+        cls.jour = date.today() + timedelta(days=1)
+
+    def reserver(self, nombre):
+        return [
+            Reservation.objects.create(
+                utilisateur=self.etudiant, salle=self.salle, date_reservation=self.jour + timedelta(days=indice // 10),
+                heure_debut=time(8 + indice % 10), heure_fin=time(9 + indice % 10),
+                motif='Révisions', nombre_participants=1,
+            )
+            for indice in range(nombre)
+        ]
+
+    def test_sauvegarde_sans_notification_immediate(self):
+        reservation, = self.reserver(1)
+        reservation.annuler()
+
+        self.assertEqual(
+            list(EvenementReservation.objects.order_by('id').values_list('type_evenement', 'statut')),
+            [('creation', 'en_attente'), ('modification', 'annulee')]
+        )
+        self.assertFalse(Notification.objects.exists())
+
+    def test_traitement_par_lots(self):
+        self.reserver(3)
+
+        self.assertEqual(traiter_evenements(), 3)
+
+        self.assertFalse(EvenementReservation.objects.exists())
+        self.assertEqual(Notification.objects.filter(utilisateur=self.etudiant, type_notification='confirmation').count(), 3)
+        self.etudiant.refresh_from_db()
+        self.assertEqual(self.etudiant.notifications_non_lues, 3)
+        self.assertEqual(traiter_evenements(), 0)
+
+    def test_requetes_independantes_du_lot(self):
+        nombres = []
+        for nombre in (2, 40):
+            self.reserver(nombre)
+            with CaptureQueriesContext(connection) as requetes:
+                traiter_evenements()
+            nombres.append(len(requetes))
+            Reservation.objects.all().delete()
+        self.assertEqual(nombres[0], nombres[1])
+
+    def test_commande(self):
+        self.reserver(5)
+        sortie = StringIO()
+        call_command('traiter_notifications', '--taille-lot', '2', stdout=sortie)
+        self.assertIn('5 notification(s) créée(s)', sortie.getvalue())
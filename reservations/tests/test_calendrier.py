@@ -0,0 +1,55 @@
+"""
+Tests des flux iCalendar : accès par jeton, heures en UTC, réponses 304
+"""
+from datetime import date, time
+
+from django.test import TestCase
+from django.urls import reverse
+
+from reservations.calendrier import jeton_calendrier
+from reservations.models import Utilisateur, Salle, Reservation
+
+
+class FluxCalendrierTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.professeur = Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+        cls.autre = Utilisateur.objects.create_user('autre', type_utilisateur='etudiant', niveau='L1')
+        annee = date.today().year + 1
+        for jour in (date(annee, 7, 1), date(annee, 1, 15)):
+            Reservation.objects.create(
+                utilisateur=cls.professeur, salle=cls.salle, date_reservation=jour,
+                heure_debut=time(10), heure_fin=time(12), motif='Cours', nombre_participants=5,
+            )
+        cls.annee = annee
+
+    def flux(self, nom_url, pk, utilisateur=None, **entetes):
+        utilisateur = utilisateur or self.professeur
+        return self.client.get(
+            reverse(nom_url, args=[pk]), {'jeton': jeton_calendrier(utilisateur)}, **entetes
+        )
+
+    def test_heures_locales_ecrites_en_utc(self):
+        reponse = self.flux('calendrier_salle', self.salle.pk)
+        self.assertEqual(reponse.status_code, 200)
+        contenu = b''.join(reponse.streaming_content).decode()
+        # Paris : UTC+1 en hiver, UTC+2 en été
+        self.assertIn(f'DTSTART:{self.annee}0115T090000Z\r\n', contenu)
+        self.assertIn(f'DTEND:{self.annee}0115T110000Z\r\n', contenu)
+        self.assertIn(f'DTSTART:{self.annee}0701T080000Z\r\n', contenu)
+        self.assertNotIn('TZID', contenu)
+
+    def test_acces_par_jeton(self):
+        url = reverse('calendrier_utilisateur', args=[self.professeur.pk])
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, {'jeton': 'faux'}).status_code, 403)
+        self.assertEqual(self.flux('calendrier_utilisateur', self.professeur.pk, self.autre).status_code, 403)
+        self.assertEqual(self.flux('calendrier_utilisateur', self.professeur.pk).status_code, 200)
+
+    def test_304_tant_que_rien_ne_change(self):
+        etag = self.flux('calendrier_salle', self.salle.pk)['ETag']
+        self.assertEqual(self.flux('calendrier_salle', self.salle.pk, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        Reservation.objects.first().annuler()
+        self.assertEqual(self.flux('calendrier_salle', self.salle.pk, HTTP_IF_NONE_MATCH=etag).status_code, 200)
@@ -0,0 +1,138 @@
+"""
+Tests du campus synthétique et du banc d'essai : données déterministes et
+cohérentes, mesures sans trace dans la base, comparaison de résultats
+"""
+import json
+import os
+import tempfile
+from io import StringIO
+from itertools import groupby
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+
+from reservations import banc_essai
+from reservations.campus import generer_campus
+from reservations.compteurs import DEFINITIONS, lire_compteurs
+from reservations.models import Utilisateur, Salle, Reservation, Rapport, StatistiqueJournaliere
+from reservations.rapports import recalculer_statistiques
+
+
+TAILLES = {'batiments': 2, 'salles': 6, 'etudiants': 8, 'professeurs': 3, 'administrateurs': 1, 'reservations': 120}
+
+
+def instantane():
+    """Lignes générées, sans les identifiants"""
+    return (
+        list(Salle.objects.order_by('nom').values_list('nom', 'batiment', 'capacite', 'equipements')),
+        list(Reservation.objects.order_by('salle__nom', 'date_reservation', 'heure_debut').values_list(
+            'salle__nom', 'utilisateur__username', 'date_reservation', 'heure_debut', 'heure_fin', 'statut', 'motif'
+        )),
+    )
+
+
+class CampusTest(TestCase):
+
+    def test_campus_deterministe(self):
+        campus = generer_campus(**TAILLES, graine=3)
+        self.assertEqual(
+            (campus.salles, campus.utilisateurs, campus.reservations),
+            (Salle.objects.count(), Utilisateur.objects.count(), Reservation.objects.count())
+        )
+        self.assertEqual((campus.utilisateurs, campus.reservations), (12, 120))
+        premier = instantane()
+
+        Salle.objects.all().delete()
+        Utilisateur.objects.all().delete()
+        generer_campus(**TAILLES, graine=3, taille_lot=7)
+        self.assertEqual(instantane(), premier)
+
+    def test_donnees_coherentes(self):
+        campus = generer_campus(**TAILLES)
+
+        # Jamais deux réservations actives qui se chevauchent dans une salle
+        actives = Reservation.objects.filter(statut__in=Reservation.STATUTS_ACTIFS).order_by(
+            'salle', 'date_reservation', 'heure_debut'
+        ).values_list('salle', 'date_reservation', 'heure_debut', 'heure_fin')
+        for _, creneaux in groupby(actives, key=lambda ligne: ligne[:2]):
+            creneaux = list(creneaux)
+            for precedent, suivant in zip(creneaux, creneaux[1:]):
+                self.assertLessEqual(precedent[3], suivant[2])
+
+        self.assertTrue(Reservation.objects.filter(date_reservation=campus.dernier_jour).exists())
+        self.assertEqual(
+            lire_compteurs(), {cle: definition().count() for cle, definition in DEFINITIONS.items()}
+        )
+        agregat = set(StatistiqueJournaliere.objects.filter(nombre__gt=0).values_list(
+            'date', 'salle', 'statut', 'type_utilisateur', 'nombre', 'minutes'
+        ))
+        recalculer_statistiques()
+        self.assertEqual(agregat, set(StatistiqueJournaliere.objects.filter(nombre__gt=0).values_list(
+            'date', 'salle', 'statut', 'type_utilisateur', 'nombre', 'minutes'
+        )))
+
+        occupee = Reservation.objects.filter(statut='confirmee', salle__est_disponible=True).first()
+        self.assertFalse(occupee.salle.verifier_disponibilite(
+            occupee.date_reservation, occupee.heure_debut, occupee.heure_fin
+        ))
+
+    def test_base_non_vide_refusee(self):
+        Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        with self.assertRaises(ValueError):
+            generer_campus(**TAILLES)
+        with self.assertRaisesMessage(CommandError, 'base vide'):
+            call_command('generer_campus', '--salles', '2', stdout=StringIO())
+
+
+class BancEssaiTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        generer_campus(**TAILLES)
+
+    def test_mesures_sans_trace(self):
+        reservations = Reservation.objects.count()
+        scenarios = ['dashboard', 'creer_reservation', 'generer_rapport_occupation', 'verifier_disponibilite']
+
+        resultats = banc_essai.executer(scenarios, repetitions=2, echauffement=1)
+
+        self.assertEqual(set(resultats['mesures']), set(scenarios))
+        for nom, mesure in resultats['mesures'].items():
+            self.assertEqual((mesure['repetitions'], mesure['erreurs']), (2, 0), nom)
+        self.assertGreater(resultats['mesures']['dashboard']['requetes'], 0)
+        self.assertEqual(resultats['base']['reservations'], reservations)
+        self.assertEqual(Reservation.objects.count(), reservations)
+        self.assertFalse(Rapport.objects.exists())
+
+    def test_comparaison(self):
+        def resultats(**p50):
+            return {'base': {}, 'mesures': {
+                nom: {'p50': valeur, 'requetes': 3} for nom, valeur in p50.items()
+            }}
+
+        lignes = banc_essai.comparer(
+            resultats(dashboard=10.0, rapport=10.0, recherche=10.0, absent=1.0),
+            resultats(dashboard=13.0, rapport=7.0, recherche=11.0),
+        )
+        self.assertEqual(
+            [(ligne.nom, ligne.verdict) for ligne in lignes],
+            [('dashboard', 'regression'), ('rapport', 'amelioration'), ('recherche', '')]
+        )
+
+    def test_commande_de_comparaison(self):
+        with tempfile.TemporaryDirectory() as dossier:
+            chemins = []
+            for nom, p50, requetes in (('ancien', 10.0, 3), ('nouveau', 10.5, 4)):
+                chemin = os.path.join(dossier, f'{nom}.json')
+                with open(chemin, 'w', encoding='utf-8') as fichier:
+                    json.dump({'base': {}, 'mesures': {'dashboard': {'p50': p50, 'requetes': requetes}}}, fichier)
+                chemins.append(chemin)
+
+            sortie = StringIO()
+            call_command('mesurer_performances', '--comparer', *chemins, stdout=sortie)
+        # Une requête SQL de plus est une régression, même à durée égale
+        self.assertIn('SQL 3 -> 4   régression', sortie.getvalue())
+
+        with self.assertRaisesMessage(CommandError, 'inconnu'):
+            call_command('mesurer_performances', 'inexistant', stdout=StringIO())
@@ -0,0 +1,120 @@
+"""
+Tests du cache des listes de salles : un affichage en cache ne lit pas la
+table des salles, une écriture de salle le régénère ; facettes des filtres
+"""
+import re
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from reservations.catalogue import facettes_salles
+from reservations.forms import RechercheForm
+from reservations.models import Utilisateur, Salle
+
+
+TABLE_SALLES = Salle._meta.db_table
+
+
+class CacheSallesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        Salle.objects.bulk_create(
+            Salle(nom=f'TD {numero:02d}', batiment='A', capacite=30, type_salle='td') for numero in range(30)
+        )
+        cls.administrateur = Utilisateur.objects.create_user('admin', type_utilisateur='administrateur')
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.administrateur)
+
+    def requetes_salles(self, url, parametres=None):
+        """Requêtes SQL sur la table des salles d'un affichage (et le contenu)"""
+        with CaptureQueriesContext(connection) as requetes:
+            reponse = self.client.get(url, parametres)
+        self.assertEqual(reponse.status_code, 200)
+        return [requete['sql'] for requete in requetes if f'"{TABLE_SALLES}"' in requete['sql']], reponse.content
+
+    def test_appel_en_cache_sans_requete_sur_les_salles(self):
+        for nom_url, parametres in (
+            ('gestion_salles', {}),
+            ('gestion_salles', {'fragment': '1'}),
+            ('liste_salles', {}),
+            ('liste_salles', {'batiment': 'A'}),
+        ):
+            with self.subTest(vue=nom_url, parametres=parametres):
+                cache.clear()
+                url = reverse(nom_url)
+                froid, _ = self.requetes_salles(url, parametres)
+                self.assertTrue(froid)
+                chaud, contenu = self.requetes_salles(url, parametres)
+                self.assertEqual(chaud, [])
+                self.assertIn(b'TD 00', contenu)
+
+    def test_page_suivante_en_cache_par_curseur(self):
+        _, premiere = self.requetes_salles(reverse('gestion_salles'))
+        url_suivante = re.search(r'href="([^"]+)"[^>]*data-charger-plus', premiere.decode()).group(1)
+        _, suivante = self.requetes_salles(url_suivante)
+        self.assertIn(b'TD 00', premiere)
+        self.assertNotIn(b'TD 00', suivante)
+        self.assertIn(b'TD 29', suivante)
+
+    def test_ecriture_d_une_salle_regenere_les_fragments(self):
+        self.requetes_salles(reverse('gestion_salles'))
+        salle = Salle.objects.get(nom='TD 00')
+        salle.nom = 'Amphi Turing'
+        with self.captureOnCommitCallbacks(execute=True):
+            salle.save()
+        requetes, contenu = self.requetes_salles(reverse('gestion_salles'))
+        self.assertTrue(requetes)
+        self.assertIn(b'Amphi Turing', contenu)
+
+
+class FacettesSallesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        for nom, batiment, type_salle, disponible in [
+            ('B-101', 'B', 'td', True),
+            ('B-102', 'B', 'tp', True),
+            ('A-001', 'A', 'td', True),
+            ('A-002', 'A', 'amphi', False),
+            ('C-001', 'C', 'reunion', False),
+        ]:
+            Salle.objects.create(
+                nom=nom, batiment=batiment, capacite=30, type_salle=type_salle, est_disponible=disponible
+            )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_salles_disponibles_par_batiment_et_type(self):
+        with self.assertNumQueries(1):
+            facettes = facettes_salles()
+        self.assertEqual(facettes.batiments, [('A', 1), ('B', 2)])
+        # Dans l'ordre de Salle.TYPE_CHOICES, sans les types sans salle disponible
+        self.assertEqual(facettes.types, [('td', 'Salle de TD', 2), ('tp', 'Salle de TP', 1)])
+
+    def test_en_cache_jusqu_a_l_ecriture_d_une_salle(self):
+        facettes_salles()
+        with self.assertNumQueries(0):
+            facettes_salles()
+
+        salle = Salle.objects.get(nom='C-001')
+        salle.est_disponible = True
+        with self.captureOnCommitCallbacks(execute=True):
+            salle.save()
+        self.assertEqual(facettes_salles().batiments, [('A', 1), ('B', 2), ('C', 1)])
+
+    def test_choix_des_filtres(self):
+        self.assertEqual(
+            RechercheForm().fields['batiment'].choices, [('', 'Tous'), ('A', 'A (1)'), ('B', 'B (2)')]
+        )
+
+        self.client.force_login(Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1'))
+        contenu = self.client.get(reverse('liste_salles')).content.decode()
+        self.assertRegex(contenu, r'Salle de TD \(2\)')
+        self.assertNotIn('Amphithéâtre (', contenu)
@@ -0,0 +1,72 @@
+"""
+Tests du test de charge : utilisateurs simulés concurrents, doubles
+réservations comptées après la charge, nettoyage
+"""
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, TransactionTestCase
+
+from reservations import charge
+from reservations.models import Utilisateur, Salle, Reservation
+
+
+class ChargeTest(TransactionTestCase):
+
+    def setUp(self):
+        for indice in range(2):
+            Salle.objects.create(nom=f'TD {indice}', batiment='A', capacite=30, type_salle='td')
+        for indice in range(4):
+            Utilisateur.objects.create_user(f'etudiant{indice}', type_utilisateur='etudiant', niveau='L1')
+        Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+
+    def test_charge_sans_double_reservation(self):
+        resultats = charge.executer(utilisateurs=6, duree=0.5, salles=2, jours=1)
+
+        self.assertEqual(resultats['erreurs'], 0, resultats['causes_erreurs'])
+        self.assertEqual(resultats['doubles_reservations'], 0)
+        self.assertGreater(resultats['reservations_acceptees'], 0)
+        self.assertEqual(set(resultats['actions']), set(charge.ACTIONS))
+        self.assertEqual(resultats['global']['requetes'], resultats['requetes'])
+        self.assertFalse(Reservation.objects.filter(motif=charge.MOTIF).exists())
+
+    def test_reservations_conservees(self):
+        resultats = charge.executer(utilisateurs=3, duree=0.3, salles=1, jours=1, poids=(1, 0, 0), conserver=True)
+
+        self.assertEqual(set(resultats['actions']), {'creer_reservation'})
+        self.assertEqual(
+            Reservation.objects.filter(motif=charge.MOTIF).count(), resultats['reservations_acceptees']
+        )
+
+
+class DoublesReservationsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1')
+        cls.jour = date.today() + timedelta(days=1)
+
+    def test_chevauchements_actifs_comptes(self):
+        # Insérées sans validation, comme le ferait une course perdue
+        Reservation.objects.bulk_create([
+            Reservation(
+                utilisateur=self.etudiant, salle=self.salle, date_reservation=self.jour, statut=statut,
+                heure_debut=time(*debut), heure_fin=time(*fin), motif=charge.MOTIF, nombre_participants=1,
+            )
+            for debut, fin, statut in [
+                ((8,), (12,), 'confirmee'),
+                ((9,), (10,), 'en_attente'),
+                ((11,), (13,), 'confirmee'),
+                ((12, 30), (14,), 'annulee'),
+                ((13,), (14,), 'confirmee'),
+            ]
+        ])
+        self.assertEqual(charge.doubles_reservations([self.jour], [self.salle.pk]), 2)
+
+    def test_commande_refuse_les_parametres_invalides(self):
+        for arguments in (['--utilisateurs', '0'], ['--poids', '0', '0', '0'], ['--premier-jour', '2000-01-01']):
+            with self.subTest(arguments=arguments), self.assertRaises(CommandError):
+                call_command('tester_charge', *arguments, stdout=StringIO())
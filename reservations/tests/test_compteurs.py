@@ -0,0 +1,80 @@
+"""
+Tests des compteurs du dashboard administrateur : tenus par les écritures,
+lus en une requête, réconciliés par la commande
+"""
+from datetime import date, time, timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from reservations import compteurs
+from reservations.compteurs import DEFINITIONS, lire_compteurs
+from reservations.models import Utilisateur, Salle, Reservation, Compteur
+
+
+class CompteursTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1')
+        cls.jour = date.today() + timedelta(days=1)
+
+    def setUp(self):
+        lire_compteurs()
+
+    def assertCompteursExacts(self):
+        self.assertEqual(
+            lire_compteurs(),
+            {cle: definition().count() for cle, definition in DEFINITIONS.items()}
+        )
+
+    def reserver(self, heure):
+        return Reservation.objects.create(
+            utilisateur=self.etudiant, salle=self.salle, date_reservation=self.jour,
+            heure_debut=time(heure), heure_fin=time(heure + 1), motif='Révisions', nombre_participants=1,
+        )
+
+    def test_lecture_en_une_requete(self):
+        with self.assertNumQueries(1):
+            valeurs = lire_compteurs()
+        self.assertEqual(set(valeurs), set(DEFINITIONS))
+
+    def test_compteurs_absents_calcules_a_la_lecture(self):
+        Compteur.objects.all().delete()
+        self.reserver(8)
+        self.assertCompteursExacts()
+
+    def test_ecritures_tenues_a_jour(self):
+        premiere, seconde = self.reserver(8), self.reserver(10)
+        self.assertCompteursExacts()
+
+        premiere.statut = 'confirmee'
+        premiere.save()
+        seconde.annuler()
+        self.assertCompteursExacts()
+
+        premiere.delete()
+        Salle.objects.create(nom='TD 2', batiment='A', capacite=20, type_salle='td')
+        self.etudiant.is_active = False
+        self.etudiant.save()
+        self.assertCompteursExacts()
+
+        self.salle.delete()
+        Utilisateur.objects.create_user('nouveau', type_utilisateur='professeur')
+        self.assertCompteursExacts()
+
+    def test_plusieurs_variations_en_un_update(self):
+        with self.assertNumQueries(1):
+            compteurs.ajuster({'reservations': 2, 'reservations_en_attente': -1, 'salles': 0})
+        valeurs = lire_compteurs()
+        self.assertEqual((valeurs['reservations'], valeurs['reservations_en_attente']), (2, -1))
+
+    def test_commande_de_reconciliation(self):
+        self.reserver(8)
+        Compteur.objects.filter(cle='reservations').update(valeur=42)
+        sortie = StringIO()
+        call_command('recalculer_compteurs', 'reservations', stdout=sortie)
+        self.assertIn('reservations: 42 -> 1 (dérive corrigée)', sortie.getvalue())
+        self.assertCompteursExacts()
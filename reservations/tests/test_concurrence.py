@@ -0,0 +1,75 @@
+"""
+Tests de concurrence : aucune double réservation sous charge
+"""
+import threading
+from datetime import date, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TransactionTestCase
+
+from reservations.models import Utilisateur, Salle, Reservation
+
+
+class ReservationConcurrenteTest(TransactionTestCase):
+    """Plusieurs threads réservent la même salle au même moment"""
+
+    NB_THREADS = 16
+    TENTATIVES_PAR_THREAD = 5
+
+    def setUp(self):
+        self.salle = Salle.objects.create(
+            nom='Amphi A', batiment='A', capacite=100, type_salle='amphi'
+        )
+        self.utilisateurs = [
+            Utilisateur.objects.create_user(
+                f'etudiant{i}', type_utilisateur='etudiant', niveau='L1'
+            )
+            for i in range(self.NB_THREADS)
+        ]
+        self.jour = date.today() + timedelta(days=7)
+
+    def _reserver(self, utilisateur, depart, resultats):
+        """Tente plusieurs réservations qui se chevauchent toutes"""
+        depart.wait()
+        try:
+            for i in range(self.TENTATIVES_PAR_THREAD):
+                reservation = Reservation(
+                    utilisateur=utilisateur,
+                    salle=self.salle,
+                    date_reservation=self.jour,
+                    heure_debut=time(9 + i % 3, 0),
+                    heure_fin=time(10 + i % 3, 30),
+                    motif='Stress test',
+                    nombre_participants=10,
+                )
+                try:
+                    reservation.save()
+                    resultats.append('ok')
+                except ValidationError:
+                    resultats.append('conflit')
+        finally:
+            connection.close()
+
+    def test_aucun_chevauchement(self):
+        depart = threading.Barrier(self.NB_THREADS)
+        resultats = []
+        threads = [
+            threading.Thread(target=self._reserver, args=(utilisateur, depart, resultats))
+            for utilisateur in self.utilisateurs
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(resultats), self.NB_THREADS * self.TENTATIVES_PAR_THREAD)
+
+        actives = list(
+            Reservation.objects.actives().filter(salle=self.salle, date_reservation=self.jour)
+            .order_by('heure_debut').values_list('heure_debut', 'heure_fin')
+        )
+        self.assertEqual(resultats.count('ok'), len(actives))
+        self.assertGreaterEqual(len(actives), 1)
+        for (_, fin), (debut_suivant, _) in zip(actives, actives[1:]):
+            self.assertLessEqual(fin, debut_suivant)
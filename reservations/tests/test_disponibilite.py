@@ -0,0 +1,77 @@
+"""
+Tests du moteur de disponibilité : créneaux libres bornés à la plage horaire
+"""
+from datetime import date, datetime, time, timedelta
+
+from django.test import TestCase
+
+from reservations.disponibilite import creneaux_libres, Creneau
+from reservations.forms import CreneauxLibresForm
+from reservations.models import Utilisateur, Salle, Reservation
+
+
+class CreneauxLibresTest(TestCase):
+    """Balayage d'une journée de 8h à 20h, créneaux d'au moins une heure"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.professeur = Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+        cls.jour = date.today() + timedelta(days=7)
+
+    def reserver(self, debut, fin):
+        Reservation.objects.create(
+            utilisateur=self.professeur,
+            salle=self.salle,
+            date_reservation=self.jour,
+            heure_debut=debut,
+            heure_fin=fin,
+            motif='Cours',
+            nombre_participants=10,
+        )
+
+    def creneaux(self, **options):
+        resultats = creneaux_libres(self.jour, self.jour, 60, **options)
+        return [(c.heure_debut, c.heure_fin) for resultat in resultats for c in resultat['creneaux']]
+
+    def test_journee_libre(self):
+        self.assertEqual(self.creneaux(), [(time(8), time(20))])
+
+    def test_reservation_apres_fermeture(self):
+        self.reserver(time(21), time(22))
+        self.assertEqual(self.creneaux(), [(time(8), time(20))])
+
+    def test_reservation_a_cheval_sur_la_fermeture(self):
+        self.reserver(time(19), time(21))
+        self.assertEqual(self.creneaux(), [(time(8), time(19))])
+
+    def test_reservation_a_cheval_sur_l_ouverture(self):
+        self.reserver(time(6), time(9))
+        self.assertEqual(self.creneaux(), [(time(9), time(20))])
+
+    def test_bornes_non_alignees(self):
+        # Relues depuis les réservations, pas depuis les bits
+        self.reserver(time(19, 50), time(21, 10))
+        self.reserver(time(10, 10), time(11, 5))
+        self.assertEqual(self.creneaux(), [(time(8), time(10, 10)), (time(11, 5), time(19, 50))])
+
+    def test_trou_trop_court(self):
+        self.reserver(time(8), time(10))
+        self.reserver(time(10, 30), time(12))
+        self.reserver(time(12, 30), time(16, 30))
+        self.reserver(time(17), time(20))
+        self.assertEqual(self.creneaux(), [])
+
+    def test_aujourd_hui_a_partir_du_quart_d_heure_suivant(self):
+        maintenant = datetime.combine(self.jour, time(10, 5))
+        self.assertEqual(self.creneaux(a_partir_de=maintenant), [(time(10, 15), time(20))])
+
+    def test_jours_passes_ignores(self):
+        maintenant = datetime.combine(self.jour, time(8))
+        resultats = creneaux_libres(self.jour - timedelta(days=2), self.jour, 60, a_partir_de=maintenant)
+        self.assertEqual(resultats[0]['creneaux'], [Creneau(self.jour, time(8), time(20))])
+
+    def test_formulaire_refuse_le_passe(self):
+        hier = date.today() - timedelta(days=1)
+        form = CreneauxLibresForm({'date_debut': hier, 'date_fin': date.today(), 'duree': 60})
+        self.assertFalse(form.is_valid())
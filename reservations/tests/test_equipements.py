@@ -0,0 +1,60 @@
+"""
+Tests du filtre par équipements : masque tenu à la sauvegarde, filtre par
+l'index, cases à cocher du formulaire de salle
+"""
+from django.test import TestCase
+
+from reservations.forms import SalleForm
+from reservations.models import Salle
+
+
+class FiltreEquipementsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.projection = Salle.objects.create(
+            nom='TD 1', batiment='A', capacite=30, type_salle='td',
+            equipements=['Vidéoprojecteur', 'tableau_blanc', 'Paperboard'],
+        )
+        cls.complete = Salle.objects.create(
+            nom='TD 2', batiment='A', capacite=30, type_salle='td',
+            equipements=[libelle for _, libelle in Salle.EQUIPEMENT_CHOICES],
+        )
+        cls.vide = Salle.objects.create(nom='TD 3', batiment='A', capacite=30, type_salle='td')
+
+    def filtrer(self, codes):
+        return set(Salle.objects.avec_equipements(codes))
+
+    def test_masque_par_libelle_ou_code(self):
+        self.assertEqual(
+            self.projection.masque_equipements,
+            Salle.masque_codes(['videoprojecteur', 'tableau_blanc'])
+        )
+        self.assertEqual(Salle.masque_liste([' ÉCRAN ', 'inconnu']), Salle.masque_codes(['ecran']))
+
+    def test_toutes_les_salles_dotees(self):
+        self.assertEqual(self.filtrer(['videoprojecteur']), {self.projection, self.complete})
+        self.assertEqual(self.filtrer(['videoprojecteur', 'microphone']), {self.complete})
+        # Codes inconnus ignorés, liste vide : pas de filtre
+        self.assertEqual(self.filtrer(['inconnu']), {self.projection, self.complete, self.vide})
+        self.assertEqual(self.filtrer([]), {self.projection, self.complete, self.vide})
+
+    def test_masque_suit_les_equipements(self):
+        self.vide.equipements = ['Climatisation']
+        self.vide.save(update_fields=['equipements'])
+        self.assertEqual(self.filtrer(['climatisation']), {self.vide, self.complete})
+
+    def test_formulaire_garde_les_equipements_hors_liste(self):
+        form = SalleForm(instance=self.projection)
+        self.assertTrue(form.fields['equipement_videoprojecteur'].initial)
+        self.assertFalse(form.fields['equipement_microphone'].initial)
+
+        donnees = {
+            'nom': 'TD 1', 'batiment': 'A', 'etage': 0, 'capacite': 30, 'type_salle': 'td',
+            'equipements': '[]', 'est_disponible': 'on', 'equipement_microphone': 'on',
+        }
+        form = SalleForm(donnees, instance=self.projection)
+        self.assertTrue(form.is_valid(), form.errors)
+        salle = form.save()
+        self.assertEqual(salle.equipements, ['Microphone', 'Paperboard'])
+        self.assertEqual(self.filtrer(['microphone']), {salle, self.complete})
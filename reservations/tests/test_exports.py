@@ -0,0 +1,56 @@
+"""
+Tests de l'export CSV des réservations : horodatage à l'heure locale, type
+d'utilisateur figé à la réservation
+"""
+from datetime import date, datetime, time, timedelta, timezone as fuseau
+
+from django.test import TestCase
+from django.urls import reverse
+
+from reservations.exports import lignes_reservations, reservations_filtrees
+from reservations.models import Utilisateur, Salle, Reservation
+
+
+class ExportReservationsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.administrateur = Utilisateur.objects.create_user('admin', type_utilisateur='administrateur')
+        cls.reservation = Reservation.objects.create(
+            utilisateur=cls.administrateur, salle=salle, date_reservation=date.today() + timedelta(days=1),
+            heure_debut=time(10), heure_fin=time(12), motif='Cours', nombre_participants=10,
+        )
+
+    def creee_le(self, instant):
+        Reservation.objects.filter(pk=self.reservation.pk).update(created_at=instant)
+        entete, ligne = lignes_reservations(Reservation.objects.all())
+        return ligne[entete.index('Créée le')]
+
+    def test_date_de_creation_a_l_heure_de_paris(self):
+        for instant, attendu in (
+            (datetime(2026, 7, 1, 10, 0, tzinfo=fuseau.utc), '2026-07-01 12:00:00'),
+            # Heure d'hiver, changement de jour
+            (datetime(2026, 1, 15, 23, 30, tzinfo=fuseau.utc), '2026-01-16 00:30:00'),
+        ):
+            with self.subTest(instant=instant):
+                self.assertEqual(self.creee_le(instant), attendu)
+
+    def test_export_telecharge(self):
+        self.creee_le(datetime(2026, 7, 1, 10, 0, tzinfo=fuseau.utc))
+        self.client.force_login(self.administrateur)
+        reponse = self.client.get(reverse('exporter_reservations'), {'format': 'csv'})
+        contenu = b''.join(reponse.streaming_content).decode()
+        self.assertIn(';2026-07-01 12:00:00', contenu)
+
+    def test_type_d_utilisateur_fige(self):
+        # Le demandeur change de type après sa réservation : l'export garde
+        # celui de la réservation, comme le rapport d'utilisation
+        self.administrateur.type_utilisateur = 'professeur'
+        self.administrateur.save()
+
+        self.assertEqual(list(reservations_filtrees(type_utilisateur='professeur')), [])
+        reservations = reservations_filtrees(type_utilisateur='administrateur')
+        self.assertEqual(list(reservations), [self.reservation])
+        entete, ligne = lignes_reservations(reservations)
+        self.assertEqual(ligne[entete.index("Type d'utilisateur")], 'administrateur')
@@ -0,0 +1,74 @@
+"""
+Tests de l'import de réservations : conflits dans le fichier, conflits avec
+la base et lots couvrant plusieurs années
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+
+from reservations.importation import importer_reservations
+from reservations.models import Utilisateur, Salle, Reservation, OccupationJournaliere
+
+
+class ImportReservationsTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.professeur = Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+        cls.premier_jour = date.today() + timedelta(days=1)
+
+    def ligne(self, jour, debut, fin):
+        return {
+            'salle': 'TD 1',
+            'utilisateur': 'prof',
+            'date_reservation': jour.isoformat(),
+            'heure_debut': f'{debut:%H:%M}',
+            'heure_fin': f'{fin:%H:%M}',
+            'motif': 'Cours',
+            'nombre_participants': '10',
+        }
+
+    def importer(self, lignes, **options):
+        return importer_reservations(enumerate(lignes, start=2), **options)
+
+    def test_conflit_dans_le_fichier(self):
+        resultat = self.importer([
+            self.ligne(self.premier_jour, time(10), time(12)),
+            self.ligne(self.premier_jour, time(11), time(13)),
+            self.ligne(self.premier_jour, time(12), time(13)),
+        ])
+        self.assertEqual(resultat.importees, 2)
+        self.assertEqual([erreur.ligne for erreur in resultat.erreurs], [3])
+        self.assertEqual(resultat.erreurs[0].messages, ['Salle déjà réservée de 10:00 à 12:00'])
+
+    def test_conflit_avec_la_base(self):
+        Reservation.objects.create(
+            utilisateur=self.professeur, salle=self.salle, date_reservation=self.premier_jour,
+            heure_debut=time(9), heure_fin=time(11), motif='Existant', nombre_participants=5,
+        )
+        resultat = self.importer([
+            self.ligne(self.premier_jour, time(10), time(12)),
+            self.ligne(self.premier_jour, time(11), time(12)),
+        ])
+        self.assertEqual(resultat.importees, 1)
+        self.assertEqual([erreur.ligne for erreur in resultat.erreurs], [2])
+        self.assertEqual(Reservation.objects.count(), 2)
+
+    def test_import_sur_plusieurs_annees(self):
+        # Bien plus de jours que de termes admis dans une seule requête
+        jours = [self.premier_jour + timedelta(days=decalage) for decalage in range(1200)]
+        Reservation.objects.create(
+            utilisateur=self.professeur, salle=self.salle, date_reservation=jours[-1],
+            heure_debut=time(9), heure_fin=time(11), motif='Existant', nombre_participants=5,
+        )
+        lignes = [self.ligne(jour, time(10), time(12)) for jour in jours]
+
+        for simulation in (True, False):
+            with self.subTest(simulation=simulation):
+                resultat = self.importer(lignes, simulation=simulation)
+                self.assertEqual(resultat.importees, 1199)
+                self.assertEqual([erreur.ligne for erreur in resultat.erreurs], [1201])
+
+        self.assertEqual(Reservation.objects.count(), 1200)
+        self.assertEqual(OccupationJournaliere.objects.filter(salle=self.salle).count(), 1200)
@@ -0,0 +1,59 @@
+"""
+Tests des migrations de données : tables dérivées remplies depuis les
+réservations existantes
+"""
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+
+class AgregatJournalierMigrationTest(TransactionTestCase):
+    """0007 construit l'agrégat journalier des réservations déjà en base"""
+
+    avant = [('reservations', '0006_compteur')]
+    apres = [('reservations', '0007_statistiquejournaliere')]
+
+    def migrer(self, cible):
+        executeur = MigrationExecutor(connection)
+        executeur.loader.build_graph()
+        executeur.migrate(cible)
+        return executeur.loader.project_state(cible).apps
+
+    def tearDown(self):
+        self.migrer(MigrationExecutor(connection).loader.graph.leaf_nodes())
+
+    def test_agregat_construit_depuis_les_reservations(self):
+        apps = self.migrer(self.avant)
+        Utilisateur = apps.get_model('reservations', 'Utilisateur')
+        Salle = apps.get_model('reservations', 'Salle')
+        Reservation = apps.get_model('reservations', 'Reservation')
+
+        salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        etudiant = Utilisateur.objects.create(username='etudiant', type_utilisateur='etudiant')
+        professeur = Utilisateur.objects.create(username='prof', type_utilisateur='professeur')
+        jour = date.today() + timedelta(days=1)
+        for utilisateur, debut, fin, statut in (
+            (etudiant, time(8), time(9, 30), 'en_attente'),
+            (etudiant, time(10), time(11), 'en_attente'),
+            (professeur, time(14), time(16), 'confirmee'),
+            (professeur, time(17), time(18), 'annulee'),
+        ):
+            Reservation.objects.create(
+                utilisateur=utilisateur, salle=salle, date_reservation=jour, heure_debut=debut,
+                heure_fin=fin, motif='Cours', nombre_participants=5, statut=statut,
+            )
+
+        apps = self.migrer(self.apres)
+        StatistiqueJournaliere = apps.get_model('reservations', 'StatistiqueJournaliere')
+        self.assertEqual(
+            set(StatistiqueJournaliere.objects.values_list(
+                'date', 'salle_id', 'statut', 'type_utilisateur', 'nombre', 'minutes'
+            )),
+            {
+                (jour, salle.pk, 'en_attente', 'etudiant', 2, 150),
+                (jour, salle.pk, 'confirmee', 'professeur', 1, 120),
+                (jour, salle.pk, 'annulee', 'professeur', 1, 60),
+            }
+        )
@@ -0,0 +1,61 @@
+"""
+Tests du compteur de notifications non lues : écritures par
+l'administration et réconciliation
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from reservations.models import Utilisateur, Notification
+from reservations.notifications import creer_notifications
+
+
+class CompteurNonLuesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1')
+        cls.administrateur = Utilisateur.objects.create_superuser('admin', type_utilisateur='administrateur')
+
+    def setUp(self):
+        self.notifications = creer_notifications([
+            Notification(utilisateur=self.etudiant, type_notification='rappel', message=f'Rappel {numero}')
+            for numero in range(5)
+        ])
+        self.client.force_login(self.administrateur)
+
+    def non_lues(self):
+        self.etudiant.refresh_from_db()
+        return self.etudiant.notifications_non_lues
+
+    def test_creation_en_lot(self):
+        self.assertEqual(self.non_lues(), 5)
+
+    def test_suppression_groupee_par_l_administration(self):
+        reponse = self.client.post(reverse('admin:reservations_notification_changelist'), {
+            'action': 'delete_selected',
+            '_selected_action': [notification.pk for notification in self.notifications[:3]],
+            'post': 'yes',
+        })
+        self.assertEqual(reponse.status_code, 302)
+        self.assertEqual(Notification.objects.filter(utilisateur=self.etudiant).count(), 2)
+        self.assertEqual(self.non_lues(), 2)
+
+    def test_ajout_et_modification_par_l_administration(self):
+        notification = Notification.objects.create(
+            utilisateur=self.etudiant, type_notification='rappel', message='Ajoutée'
+        )
+        self.assertEqual(self.non_lues(), 6)
+        notification.est_lue = True
+        notification.save()
+        self.assertEqual(self.non_lues(), 5)
+
+    def test_reconciliation(self):
+        # Écriture qui contourne le compteur
+        Notification.objects.filter(pk=self.notifications[0].pk).update(est_lue=True)
+        sortie = StringIO()
+        call_command('recalculer_compteurs', 'notifications_non_lues', stdout=sortie)
+        self.assertIn('1 utilisateur(s) corrigé(s)', sortie.getvalue())
+        self.assertEqual(self.non_lues(), 4)
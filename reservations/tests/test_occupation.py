@@ -0,0 +1,121 @@
+"""
+Tests de l'index d'occupation : masques tenus à jour par les écritures,
+reconstruction sous le verrou (salle, date)
+"""
+from datetime import date, time, timedelta
+
+from django.test import TestCase
+
+from reservations.models import Utilisateur, Salle, Reservation, OccupationJournaliere, VerrouCreneau
+from reservations.occupation import (
+    decoder, intervalles, masques_creneau, reconstruire, reconstruire_jours, verifier,
+)
+
+
+class IndexOccupationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle, cls.autre_salle = Salle.objects.bulk_create(
+            Salle(nom=nom, batiment='A', capacite=30, type_salle='td') for nom in ('TD 1', 'TD 2')
+        )
+        cls.professeur = Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+        cls.jour = date.today() + timedelta(days=3)
+
+    def reserver(self, debut, fin, **champs):
+        return Reservation.objects.create(**{
+            'utilisateur': self.professeur,
+            'salle': self.salle,
+            'date_reservation': self.jour,
+            'heure_debut': debut,
+            'heure_fin': fin,
+            'motif': 'Cours',
+            'nombre_participants': 10,
+            **champs,
+        })
+
+    def plages(self, salle=None, jour=None):
+        """Plages occupées (en minutes) de l'index pour une salle et un jour"""
+        ligne = OccupationJournaliere.objects.filter(
+            salle=salle or self.salle, date=jour or self.jour
+        ).values_list('partiel', flat=True).first()
+        return intervalles(decoder(ligne)) if ligne is not None else []
+
+    def version(self, salle=None, jour=None):
+        return VerrouCreneau.objects.filter(
+            salle=salle or self.salle, date_reservation=jour or self.jour
+        ).values_list('version', flat=True).first()
+
+    def test_masques_d_un_creneau(self):
+        plein, partiel = masques_creneau(time(10, 10), time(11))
+        self.assertEqual(intervalles(plein), [(615, 660)])
+        self.assertEqual(intervalles(partiel), [(600, 660)])
+
+    def test_verdicts(self):
+        self.reserver(time(10), time(12))
+        self.reserver(time(14, 10), time(15))
+        for debut, fin, attendu in (
+            (time(8), time(10), True),
+            (time(11), time(13), False),
+            # Bornes non alignées : l'index ne tranche pas
+            (time(13), time(14, 5), None),
+        ):
+            with self.subTest(debut=debut, fin=fin):
+                self.assertIs(verifier(self.salle.pk, self.jour, debut, fin), attendu)
+
+    def test_ecritures_tenues_dans_l_index(self):
+        reservation = self.reserver(time(10), time(12))
+        self.assertEqual(self.plages(), [(600, 720)])
+
+        reservation.heure_fin = time(13)
+        reservation.save()
+        self.assertEqual(self.plages(), [(600, 780)])
+
+        reservation.salle = self.autre_salle
+        reservation.save()
+        self.assertEqual(self.plages(), [])
+        self.assertEqual(self.plages(salle=self.autre_salle), [(600, 780)])
+
+        reservation.annuler()
+        self.assertFalse(OccupationJournaliere.objects.exists())
+
+    def test_suppression(self):
+        self.reserver(time(10), time(12))
+        self.reserver(time(14), time(15)).delete()
+        self.assertEqual(self.plages(), [(600, 720)])
+        Reservation.objects.all().delete()
+        self.assertFalse(OccupationJournaliere.objects.exists())
+
+    def test_reconstruction_complete_identique(self):
+        for heure in (8, 11, 15):
+            self.reserver(time(heure), time(heure + 1, 30))
+        self.reserver(time(9), time(10), salle=self.autre_salle).annuler()
+        tenu = set(OccupationJournaliere.objects.values_list('salle_id', 'date', 'plein', 'partiel'))
+        reconstruire()
+        self.assertEqual(set(OccupationJournaliere.objects.values_list('salle_id', 'date', 'plein', 'partiel')), tenu)
+
+    def test_reconstruction_sous_verrou(self):
+        annulee = self.reserver(time(10), time(12))
+        supprimee = self.reserver(time(14), time(16))
+        autre_jour = self.jour + timedelta(days=1)
+
+        for action in (
+            annulee.annuler,
+            Reservation.objects.filter(pk=supprimee.pk).delete,
+        ):
+            with self.subTest(action=action):
+                avant = self.version()
+                action()
+                self.assertGreater(self.version(), avant)
+
+        # Appel direct : le verrou est posé, créé au besoin
+        reconstruire_jours({(self.salle.pk, autre_jour)})
+        self.assertIsNotNone(self.version(jour=autre_jour))
+
+    def test_deplacement_verrouille_l_ancien_couple(self):
+        reservation = self.reserver(time(10), time(12))
+        avant = self.version()
+        reservation.date_reservation = self.jour + timedelta(days=1)
+        reservation.save()
+        self.assertGreater(self.version(), avant)
+        self.assertEqual(self.plages(), [])
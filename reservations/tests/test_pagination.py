@@ -0,0 +1,95 @@
+"""
+Tests de la pagination par curseur : parcours complet sans doublon,
+curseur stable et fragments « Charger plus »
+"""
+from datetime import date, time, timedelta
+from urllib.parse import parse_qs, urlsplit
+
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+
+from reservations.models import Utilisateur, Salle, Reservation
+from reservations.pagination import paginer
+
+
+class PaginationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # Bâtiments en ex aequo : le tri est départagé par la clé primaire
+        for indice in range(7):
+            Salle.objects.create(nom=f'TD {indice}', batiment='AB'[indice % 2], capacite=30, type_salle='td')
+
+    def page(self, url_ou_parametres, ordre, taille=3):
+        if isinstance(url_ou_parametres, str):
+            requete = RequestFactory().get(url_ou_parametres)
+        else:
+            requete = RequestFactory().get('/salles/', url_ou_parametres)
+        return paginer(requete, Salle.objects.all(), ordre, taille=taille)
+
+    def parcourir(self, ordre):
+        page = self.page({'fragment': '1'}, ordre)
+        vues = list(page.elements)
+        while page.url_suivante:
+            self.assertNotIn('fragment', parse_qs(urlsplit(page.url_suivante).query))
+            page = self.page(page.url_suivante, ordre)
+            vues.extend(page.elements)
+        return vues
+
+    def test_parcours_complet(self):
+        for ordre in (['batiment'], ['-batiment'], ['-batiment', 'nom']):
+            with self.subTest(ordre=ordre):
+                # La clé primaire suit le sens de la dernière colonne
+                departage = '-pk' if ordre[-1].startswith('-') else 'pk'
+                self.assertEqual(self.parcourir(ordre), list(Salle.objects.order_by(*ordre, departage)))
+
+    def test_curseur_stable_apres_insertion(self):
+        attendus = list(Salle.objects.order_by('batiment', 'nom', 'pk'))
+        premiere = self.page({}, ['batiment', 'nom'])
+        # Une salle insérée avant le curseur ne décale pas la page suivante
+        Salle.objects.create(nom='Amphi', batiment='A', capacite=30, type_salle='amphi')
+        suivante = self.page(premiere.url_suivante, ['batiment', 'nom'])
+        self.assertEqual(suivante.elements, attendus[3:6])
+
+    def test_curseur_illisible(self):
+        for curseur in ('!!!', 'WyJhIl0', ''):
+            with self.subTest(curseur=curseur):
+                page = self.page({'apres': curseur}, ['batiment', 'nom'])
+                self.assertEqual(page.elements, list(Salle.objects.order_by('batiment', 'nom', 'pk')[:3]))
+
+    def test_requete_independante_de_la_page(self):
+        page = self.page({}, ['batiment', 'nom'], taille=2)
+        page = self.page(page.url_suivante, ['batiment', 'nom'], taille=2)
+        with self.assertNumQueries(1):
+            self.page(page.url_suivante, ['batiment', 'nom'], taille=2)
+
+
+class ChargerPlusTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', password='x', type_utilisateur='etudiant', niveau='L1')
+        jour = date.today() + timedelta(days=1)
+        for indice in range(30):
+            Reservation.objects.create(
+                utilisateur=cls.etudiant, salle=cls.salle, date_reservation=jour + timedelta(days=indice // 10),
+                heure_debut=time(8 + indice % 10), heure_fin=time(9 + indice % 10),
+                motif='Révisions', nombre_participants=1,
+            )
+
+    def test_fragment_de_la_page_suivante(self):
+        self.client.force_login(self.etudiant)
+        url = reverse('mes_reservations')
+        reponse = self.client.get(url)
+        self.assertEqual(len(reponse.context['reservations']), 25)
+        suivante = reponse.context['page'].url_suivante
+
+        fragment = self.client.get(f'{suivante}&fragment=1')
+        self.assertTemplateUsed(fragment, 'reservations/partials/mes_reservations.html')
+        self.assertTemplateNotUsed(fragment, 'reservations/reservations/mes_reservations.html')
+        self.assertEqual(len(fragment.context['reservations']), 5)
+        self.assertIsNone(fragment.context['page'].url_suivante)
+        self.assertFalse(
+            {r.pk for r in reponse.context['reservations']} & {r.pk for r in fragment.context['reservations']}
+        )
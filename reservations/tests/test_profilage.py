@@ -0,0 +1,88 @@
+"""
+Tests du profilage par vue : middleware optionnel, tampons bornés,
+rapport réservé au staff
+"""
+from unittest import mock
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from reservations import profilage
+from reservations.models import Utilisateur, Salle
+from reservations.profilage import Mesure, Registre, ProfilageMiddleware, NB_LENTES
+
+
+class RegistreTest(TestCase):
+
+    def test_tampon_circulaire_et_requetes_lentes(self):
+        registre = Registre(taille=4)
+        for indice in range(10):
+            requetes = [(indice / 1000, f'SELECT {indice}'), (0.0, 'SELECT 0')]
+            registre.ajouter('vue', Mesure(indice / 1000, 2, indice / 1000, 0.0, 1), requetes)
+
+        ligne, = registre.rapport()
+        self.assertEqual(ligne['nombre'], 4)
+        self.assertEqual(ligne['duree_max'], 9.0)
+        self.assertEqual(ligne['duree_p50'], 7.5)
+        self.assertEqual(
+            [sql for _, sql in ligne['lentes']], [f'SELECT {indice}' for indice in range(9, 9 - NB_LENTES, -1)]
+        )
+
+        registre.vider()
+        self.assertEqual(registre.rapport(), [])
+
+    def test_vues_les_plus_lentes_d_abord(self):
+        registre = Registre(taille=10)
+        registre.ajouter('rapide', Mesure(0.001, 1, 0.0, 0.0, 1), [])
+        registre.ajouter('lente', Mesure(0.5, 1, 0.0, 0.0, 1), [])
+        self.assertEqual([ligne['vue'] for ligne in registre.rapport()], ['lente', 'rapide'])
+
+
+class ProfilageMiddlewareTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = Utilisateur.objects.create_user('staff', type_utilisateur='administrateur', is_staff=True)
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1')
+        for indice in range(3):
+            Salle.objects.create(nom=f'TD {indice}', batiment='A', capacite=30, type_salle='td')
+
+    def setUp(self):
+        registre = mock.patch.object(profilage, 'registre', Registre(10))
+        self.registre = registre.start()
+        self.addCleanup(registre.stop)
+
+    @override_settings(PROFILAGE_ACTIF=False)
+    def test_retire_si_inactif(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilageMiddleware(lambda request: None)
+        self.client.force_login(self.etudiant)
+        self.client.get(reverse('liste_salles'))
+        self.assertEqual(self.registre.rapport(), [])
+
+    @override_settings(PROFILAGE_ACTIF=True)
+    def test_mesure_par_vue(self):
+        self.client.force_login(self.etudiant)
+        self.client.get(reverse('liste_salles'))
+        self.client.get(reverse('liste_salles'))
+
+        ligne, = self.registre.rapport()
+        self.assertEqual((ligne['vue'], ligne['nombre']), ('liste_salles', 2))
+        self.assertGreater(ligne['requetes_max'], 0)
+        self.assertGreater(ligne['rendu_p50'], 0)
+        self.assertTrue(ligne['lentes'])
+
+    def test_rapport_reserve_au_staff(self):
+        url = reverse('rapport_profilage')
+        self.client.force_login(self.etudiant)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+        self.registre.ajouter('liste_salles', Mesure(0.01, 3, 0.002, 0.005, 1), [(0.002, 'SELECT 1')])
+        self.client.force_login(self.staff)
+        reponse = self.client.get(url)
+        self.assertEqual(reponse.status_code, 200)
+        self.assertEqual([ligne['vue'] for ligne in reponse.context['vues']], ['liste_salles'])
+
+        self.assertRedirects(self.client.post(url), url)
+        self.assertEqual(self.registre.rapport(), [])
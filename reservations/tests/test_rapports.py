@@ -0,0 +1,115 @@
+"""
+Tests des rapports : agrégat journalier (clé figée sur la réservation) et
+grille d'occupation
+"""
+from datetime import date, time, timedelta
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from reservations.models import Utilisateur, Salle, Reservation, StatistiqueJournaliere
+from reservations.rapports import recalculer_statistiques, donnees_occupation
+
+
+def agregat():
+    """Lignes non vides de l'agrégat journalier"""
+    return set(
+        StatistiqueJournaliere.objects.filter(nombre__gt=0)
+        .values_list('date', 'salle_id', 'statut', 'type_utilisateur', 'nombre', 'minutes')
+    )
+
+
+class AgregatJournalierTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.professeur = Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+        cls.jour = date.today() + timedelta(days=3)
+
+    def reserver(self, heure):
+        return Reservation.objects.create(
+            utilisateur=self.professeur, salle=self.salle, date_reservation=self.jour,
+            heure_debut=time(heure), heure_fin=time(heure + 1), motif='Cours', nombre_participants=10,
+        )
+
+    def test_type_fige_a_la_creation(self):
+        reservation = self.reserver(9)
+        self.assertEqual(reservation.type_utilisateur, 'professeur')
+
+        # Le changement de type ne déplace pas la réservation vers une autre clé
+        Utilisateur.objects.filter(pk=self.professeur.pk).update(type_utilisateur='administrateur')
+        reservation = Reservation.objects.get(pk=reservation.pk)
+        reservation.statut = 'annulee'
+        reservation.save()
+
+        tenu = agregat()
+        recalculer_statistiques()
+        self.assertEqual(tenu, agregat())
+        self.assertEqual(
+            {ligne[2:5] for ligne in tenu}, {('annulee', 'professeur', 1)}
+        )
+
+    def test_suppression_en_cascade_sans_lecture_des_utilisateurs(self):
+        for heure in range(8, 18):
+            self.reserver(heure)
+
+        with CaptureQueriesContext(connection) as requetes:
+            self.salle.delete()
+
+        lectures = [
+            requete['sql'] for requete in requetes
+            if requete['sql'].startswith('SELECT') and f'FROM "{Utilisateur._meta.db_table}"' in requete['sql']
+        ]
+        self.assertEqual(lectures, [])
+        self.assertEqual(agregat(), set())
+
+
+class RapportOccupationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle_a = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.salle_b = Salle.objects.create(nom='TD 2', batiment='B', capacite=30, type_salle='td')
+        cls.professeur = Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+        cls.lundi = date.today() + timedelta(days=7 - date.today().weekday())
+
+    def reserver(self, salle, debut, fin, statut='confirmee'):
+        return Reservation.objects.create(
+            utilisateur=self.professeur, salle=salle, date_reservation=self.lundi, statut=statut,
+            heure_debut=debut, heure_fin=fin, motif='Cours', nombre_participants=10,
+        )
+
+    def occupation(self):
+        return donnees_occupation(self.lundi, self.lundi, heure_ouverture=time(8), heure_fermeture=time(10))
+
+    def test_taux_par_salle_batiment_heure_et_jour(self):
+        self.reserver(self.salle_a, time(8), time(9))
+        # Bornée à la fermeture : 2 créneaux sur 8
+        self.reserver(self.salle_b, time(9, 30), time(11))
+        # Non confirmées : ignorées
+        self.reserver(self.salle_b, time(8), time(9), statut='en_attente')
+
+        with self.assertNumQueries(2):
+            donnees = self.occupation()
+
+        self.assertEqual(donnees['total_reservations'], 2)
+        self.assertEqual(donnees['nombre_salles'], 2)
+        self.assertEqual(donnees['taux_global'], 37.5)
+        self.assertEqual(donnees['par_salle'], [['TD 1', 'A', 50.0], ['TD 2', 'B', 25.0]])
+        self.assertEqual(donnees['par_batiment'], [['A', 50.0], ['B', 25.0]])
+        self.assertEqual(donnees['par_heure'], [['08h', 50.0], ['09h', 25.0]])
+        self.assertEqual(donnees['par_jour'], [['Lundi', 37.5]])
+
+    def test_creneaux_partiels_arrondis_au_quart_d_heure(self):
+        self.reserver(self.salle_a, time(8, 5), time(8, 40))
+
+        donnees = self.occupation()
+        # 8h00-8h45 : trois créneaux touchés sur 8
+        self.assertEqual(donnees['par_salle'][0], ['TD 1', 'A', 37.5])
+
+    def test_sans_salle(self):
+        Salle.objects.all().delete()
+        donnees = self.occupation()
+        self.assertEqual((donnees['taux_global'], donnees['par_salle']), (0, []))
@@ -0,0 +1,122 @@
+"""
+Tests de la recherche plein texte : index FTS5 tenu par les triggers,
+préfixes sans accents, classement, repli sur icontains et administration
+"""
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from reservations import recherche
+from reservations.models import Utilisateur, Salle, Reservation
+from reservations.recherche import rechercher_salles, rechercher_reservations, installer_index
+
+
+class RechercheTexteTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reunion = Salle.objects.create(nom='Salle de réunion', batiment='A', capacite=12, type_salle='reunion')
+        cls.amphi = Salle.objects.create(
+            nom='Amphi Curie', batiment='B', capacite=200, type_salle='amphi',
+            description='Peut accueillir une réunion plénière',
+        )
+        cls.td = Salle.objects.create(nom='TD 1', batiment='Réaumur', capacite=30, type_salle='td')
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1')
+        cls.autre = Utilisateur.objects.create_user('autre', type_utilisateur='etudiant', niveau='L1')
+        jour = date.today() + timedelta(days=1)
+        for heure, (utilisateur, motif) in enumerate([
+            (cls.etudiant, 'Révisions de thermodynamique'),
+            (cls.autre, 'Révisions partiel'),
+            (cls.etudiant, 'Soutenance de stage'),
+        ]):
+            Reservation.objects.create(
+                utilisateur=utilisateur, salle=cls.td, date_reservation=jour,
+                heure_debut=time(8 + 2 * heure), heure_fin=time(9 + 2 * heure),
+                motif=motif, nombre_participants=1,
+            )
+
+    def test_index_installe(self):
+        self.assertTrue(recherche.index_disponible())
+
+    def test_prefixes_sans_casse_ni_accents(self):
+        self.assertEqual(rechercher_salles('REU'), [self.reunion, self.amphi])
+        self.assertEqual(rechercher_salles('reau'), [self.td])
+        self.assertEqual(rechercher_salles('reu plen'), [self.amphi])
+        self.assertEqual(rechercher_salles('  ?! '), [])
+
+    def test_nom_avant_description(self):
+        salles = rechercher_salles('reunion')
+        self.assertEqual(salles[0], self.reunion)
+        self.assertEqual(rechercher_salles('reunion', limite=1), [self.reunion])
+
+    def test_index_suit_les_ecritures(self):
+        Salle.objects.filter(pk=self.td.pk).update(description='Réunions de département')
+        self.assertIn(self.td, rechercher_salles('departement'))
+
+        self.reunion.delete()
+        self.assertEqual(set(rechercher_salles('reunion')), {self.amphi, self.td})
+
+        Salle.objects.bulk_create([Salle(nom='Labo Pasteur', batiment='C', capacite=10, type_salle='tp')])
+        self.assertEqual([salle.nom for salle in rechercher_salles('pasteur')], ['Labo Pasteur'])
+
+    def test_reservations_restreintes_a_l_utilisateur(self):
+        self.assertEqual(len(rechercher_reservations('revision')), 2)
+        self.assertEqual(
+            [r.motif for r in rechercher_reservations('revision', utilisateur=self.etudiant)],
+            ['Révisions de thermodynamique']
+        )
+
+    def test_repli_sans_index(self):
+        with mock.patch.object(recherche, 'index_disponible', return_value=False):
+            self.assertEqual(set(rechercher_salles('réunion')), {self.reunion, self.amphi})
+            self.assertEqual(len(rechercher_reservations('Révisions', utilisateur=self.autre)), 1)
+
+    def test_triggers_reinstalles(self):
+        with connection.cursor() as curseur:
+            curseur.execute(f"DROP TRIGGER {recherche._table(recherche.SALLES)}_ai")
+        Salle.objects.create(nom='Salle Turing', batiment='D', capacite=20, type_salle='tp')
+        self.assertEqual(rechercher_salles('turing'), [])
+
+        self.assertTrue(installer_index())
+        self.assertEqual([salle.nom for salle in rechercher_salles('turing')], ['Salle Turing'])
+
+
+class RechercheAdministrationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = Utilisateur.objects.create_superuser(
+            'admin', 'admin@example.com', 'x', type_utilisateur='administrateur'
+        )
+        cls.salle = Salle.objects.create(nom='Salle de réunion', batiment='A', capacite=12, type_salle='reunion')
+        cls.autre_salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1')
+        jour = date.today() + timedelta(days=1)
+        cls.par_salle = Reservation.objects.create(
+            utilisateur=cls.admin, salle=cls.salle, date_reservation=jour,
+            heure_debut=time(8), heure_fin=time(9), motif='Conseil', nombre_participants=5,
+        )
+        cls.par_motif = Reservation.objects.create(
+            utilisateur=cls.admin, salle=cls.autre_salle, date_reservation=jour,
+            heure_debut=time(10), heure_fin=time(11), motif='Préparer la réunion', nombre_participants=5,
+        )
+        cls.par_utilisateur = Reservation.objects.create(
+            utilisateur=cls.etudiant, salle=cls.autre_salle, date_reservation=jour,
+            heure_debut=time(14), heure_fin=time(15), motif='Révisions', nombre_participants=1,
+        )
+
+    def resultats(self, modele, texte):
+        self.client.force_login(self.admin)
+        reponse = self.client.get(reverse(f'admin:reservations_{modele}_changelist'), {'q': texte})
+        self.assertEqual(reponse.status_code, 200)
+        return set(reponse.context['cl'].result_list)
+
+    def test_salles(self):
+        self.assertEqual(self.resultats('salle', 'reu'), {self.salle})
+
+    def test_reservations_par_motif_salle_ou_utilisateur(self):
+        self.assertEqual(self.resultats('reservation', 'reunion'), {self.par_salle, self.par_motif})
+        self.assertEqual(self.resultats('reservation', 'ETUDIANT'), {self.par_utilisateur})
@@ -0,0 +1,83 @@
+"""
+Tests des réservations en série : dates, conflits, création en lot et
+nombre de requêtes constant
+"""
+from datetime import date, time, timedelta
+
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from reservations.compteurs import lire_compteurs
+from reservations.models import (
+    Utilisateur, Salle, Reservation, SerieReservation, Notification, StatistiqueJournaliere, OccupationJournaliere,
+)
+from reservations.recurrence import creer_serie
+
+
+class SerieReservationTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.professeur = Utilisateur.objects.create_user('prof', type_utilisateur='professeur')
+        cls.lundi = date.today() + timedelta(days=7 - date.today().weekday())
+
+    def serie(self, semaines=4, **champs):
+        return SerieReservation(**{
+            'utilisateur': self.professeur,
+            'salle': self.salle,
+            'frequence': 'hebdomadaire',
+            'date_debut': self.lundi,
+            'date_fin': self.lundi + timedelta(weeks=semaines - 1),
+            'heure_debut': time(10),
+            'heure_fin': time(12),
+            'motif': 'TD',
+            'nombre_participants': 20,
+            **champs,
+        })
+
+    def test_dates(self):
+        serie = self.serie(
+            semaines=7, frequence='bihebdomadaire', exceptions=[(self.lundi + timedelta(weeks=2)).isoformat()]
+        )
+        self.assertEqual(serie.dates(), [self.lundi + timedelta(weeks=semaine) for semaine in (0, 4, 6)])
+
+    def test_creation_en_lot(self):
+        lire_compteurs()
+        reservations, conflits = creer_serie(self.serie())
+
+        self.assertEqual((len(reservations), conflits), (4, {}))
+        self.assertEqual(Reservation.objects.filter(serie__isnull=False, statut='confirmee').count(), 4)
+        self.assertEqual(Notification.objects.filter(utilisateur=self.professeur).count(), 1)
+        self.assertEqual(lire_compteurs()['reservations'], 4)
+        self.assertEqual(
+            sum(StatistiqueJournaliere.objects.values_list('nombre', flat=True)), 4
+        )
+        self.assertEqual(OccupationJournaliere.objects.filter(salle=self.salle).count(), 4)
+
+    def test_conflits(self):
+        conflit = self.lundi + timedelta(weeks=1)
+        Reservation.objects.create(
+            utilisateur=self.professeur, salle=self.salle, date_reservation=conflit,
+            heure_debut=time(11), heure_fin=time(13), motif='Examen', nombre_participants=10,
+        )
+
+        with self.assertRaises(ValidationError):
+            creer_serie(self.serie())
+        self.assertFalse(SerieReservation.objects.exists())
+
+        reservations, conflits = creer_serie(self.serie(), ignorer_conflits=True)
+        self.assertEqual(len(reservations), 3)
+        self.assertEqual(list(conflits), [conflit])
+
+    def test_nombre_de_requetes_constant(self):
+        nombres = []
+        for semaines, decalage in ((2, 0), (20, 10)):
+            serie = self.serie(semaines, date_debut=self.lundi + timedelta(weeks=decalage))
+            serie.date_fin = serie.date_debut + timedelta(weeks=semaines - 1)
+            with CaptureQueriesContext(connection) as requetes:
+                creer_serie(serie)
+            nombres.append(len(requetes))
+        self.assertEqual(nombres[0], nombres[1])
@@ -0,0 +1,230 @@
+"""
+Budget de requêtes SQL par vue : chaque URL de reservations/urls.py est
+appelée sur une petite et une grande base, avec le même budget
+
+Une requête lancée par ligne affichée ou traitée (accès N+1, par exemple
+self.salle dans une boucle ou dans un signal) fait dépasser le budget sur
+la grande base. Après une optimisation, abaisser le budget de la vue.
+"""
+from datetime import date, time, timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from reservations.campus import generer_campus
+from reservations.models import Utilisateur, Salle, Reservation, Notification, Rapport
+from reservations.rapports import donnees_utilisation
+from reservations.urls import urlpatterns
+
+
+# Nombre maximal de requêtes SQL par vue, quelle que soit la taille de la base
+# (clé : nom d'URL, suivi de « :post » pour un envoi de formulaire ; les
+# sessions, savepoints et actions après commit sont comptés)
+BUDGETS = {
+    'login': 0,
+    'inscription': 0,
+    'logout:post': 4,
+    'dashboard': 7,
+    'liste_salles': 7,
+    'detail_salle': 7,
+    'calendrier_salle': 8,
+    'rechercher_salles': 8,
+    'creneaux_libres': 7,
+    'recherche_globale': 8,
+    'creer_reservation': 6,
+    'creer_reservation:post': 25,
+    'creer_reservation_salle': 7,
+    'creer_serie_reservations': 6,
+    'mes_reservations': 6,
+    'calendrier_utilisateur': 8,
+    'detail_reservation': 8,
+    'annuler_reservation': 8,
+    'annuler_reservation:post': 23,
+    'liste_notifications': 7,
+    'marquer_notification_lue:post': 10,
+    'marquer_toutes_lues:post': 9,
+    'api_salles': 9,
+    'api_disponibilites_salle': 12,
+    'api_recherche': 11,
+    'admin_dashboard': 6,
+    'gestion_salles': 7,
+    'creer_salle': 5,
+    'validation_reservations': 7,
+    'traiter_lot_reservations:post': 21,
+    'valider_reservation:post': 22,
+    'refuser_reservation:post': 23,
+    'generer_rapport': 5,
+    'generer_rapport:post': 10,
+    'detail_rapport': 7,
+    'exporter_rapport': 6,
+    'exporter_reservations': 6,
+    'rapport_profilage': 5,
+}
+
+
+class BudgetRequetesMixin:
+    """Mesure chaque URL ; TAILLE et NOTIFICATIONS donnent la taille de la base"""
+
+    TAILLE = {}
+    NOTIFICATIONS = 0
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.campus = generer_campus(graine=1, **cls.TAILLE)
+        cls.etudiant = Utilisateur.objects.get(username='etudiant00001')
+        cls.professeur = Utilisateur.objects.get(username='professeur00001')
+        cls.administrateur = Utilisateur.objects.get(username='administrateur00001')
+        cls.salle = Salle.objects.filter(est_disponible=True).order_by('pk').first()
+        cls.jour_libre = cls.campus.dernier_jour + timedelta(days=1)
+
+        # Réservations en attente de l'étudiant, annulées, validées ou refusées par les vues
+        cls.reservations = [
+            Reservation.objects.create(
+                utilisateur=cls.etudiant,
+                salle=cls.salle,
+                date_reservation=cls.jour_libre,
+                heure_debut=time(8 + heure),
+                heure_fin=time(9 + heure),
+                motif='Budget de requêtes',
+                nombre_participants=1,
+            )
+            for heure in range(8)
+        ]
+
+        Notification.objects.bulk_create(
+            Notification(
+                utilisateur=cls.etudiant,
+                reservation=reservation,
+                type_notification='confirmation',
+                message=f"Réservation {reservation.pk}",
+            )
+            for reservation in Reservation.objects.filter(utilisateur=cls.etudiant)[:cls.NOTIFICATIONS]
+        )
+        cls.etudiant.recalculer_notifications_non_lues()
+        cls.notification = Notification.objects.filter(utilisateur=cls.etudiant).first()
+
+        cls.rapport = Rapport.objects.create(
+            administrateur=cls.administrateur,
+            titre='Budget',
+            type_rapport='utilisation',
+            date_debut=cls.campus.premier_jour,
+            date_fin=cls.campus.dernier_jour,
+            donnees=donnees_utilisation(cls.campus.premier_jour, cls.campus.dernier_jour),
+        )
+
+    def setUp(self):
+        self.clients = {None: Client()}
+        for role, utilisateur in (
+            ('etudiant', self.etudiant), ('professeur', self.professeur), ('administrateur', self.administrateur)
+        ):
+            self.clients[role] = Client()
+            self.clients[role].force_login(utilisateur)
+
+    def cas(self):
+        """(clé du budget, rôle, arguments de l'URL, paramètres) de chaque appel"""
+        demain = date.today() + timedelta(days=1)
+        periode = {'date_debut': demain.isoformat(), 'date_fin': (demain + timedelta(days=6)).isoformat()}
+        creneau = {'date_reservation': demain.isoformat(), 'heure_debut': '10:00', 'heure_fin': '12:00'}
+        annulee, validee, refusee, *lot = self.reservations
+        return [
+            ('login', None, (), {}),
+            ('inscription', None, (), {}),
+            ('dashboard', 'etudiant', (), {}),
+            ('liste_salles', 'etudiant', (), {}),
+            ('detail_salle', 'etudiant', (self.salle.pk,), {}),
+            ('calendrier_salle', 'etudiant', (self.salle.pk,), {}),
+            ('rechercher_salles', 'etudiant', (), creneau),
+            ('creneaux_libres', 'etudiant', (), {**periode, 'duree': 60}),
+            ('recherche_globale', 'administrateur', (), {'q': 'analyse'}),
+            ('creer_reservation', 'professeur', (), {}),
+            ('creer_reservation:post', 'etudiant', (), {
+                'salle': self.salle.pk,
+                'date_reservation': (self.jour_libre + timedelta(days=1)).isoformat(),
+                'heure_debut': '10:00',
+                'heure_fin': '11:00',
+                'motif': 'Cours',
+                'nombre_participants': 1,
+            }),
+            ('creer_reservation_salle', 'professeur', (self.salle.pk,), {}),
+            ('creer_serie_reservations', 'professeur', (), {}),
+            ('mes_reservations', 'etudiant', (), {}),
+            ('calendrier_utilisateur', 'etudiant', (self.etudiant.pk,), {}),
+            ('detail_reservation', 'etudiant', (annulee.pk,), {}),
+            ('annuler_reservation', 'etudiant', (annulee.pk,), {}),
+            ('annuler_reservation:post', 'etudiant', (annulee.pk,), {}),
+            ('liste_notifications', 'etudiant', (), {}),
+            ('marquer_notification_lue:post', 'etudiant', (self.notification.pk,), {}),
+            ('marquer_toutes_lues:post', 'etudiant', (), {}),
+            ('api_salles', 'etudiant', (), {}),
+            ('api_disponibilites_salle', 'etudiant', (self.salle.pk,), periode),
+            ('api_recherche', 'etudiant', (), creneau),
+            ('admin_dashboard', 'administrateur', (), {}),
+            ('gestion_salles', 'administrateur', (), {}),
+            ('creer_salle', 'administrateur', (), {}),
+            ('validation_reservations', 'administrateur', (), {}),
+            ('valider_reservation:post', 'administrateur', (validee.pk,), {}),
+            ('refuser_reservation:post', 'administrateur', (refusee.pk,), {}),
+            ('traiter_lot_reservations:post', 'administrateur', (), {
+                'reservations': [reservation.pk for reservation in lot], 'action': 'valider'
+            }),
+            ('generer_rapport', 'administrateur', (), {}),
+            ('generer_rapport:post', 'administrateur', (), {**periode, 'type_rapport': 'utilisation'}),
+            ('detail_rapport', 'administrateur', (self.rapport.pk,), {}),
+            ('exporter_rapport', 'administrateur', (self.rapport.pk,), {}),
+            ('exporter_reservations', 'administrateur', (), periode),
+            ('rapport_profilage', 'administrateur', (), {}),
+            # En dernier : ferme la session de l'étudiant
+            ('logout:post', 'etudiant', (), {}),
+        ]
+
+    def mesurer(self, cle, role, arguments, parametres):
+        """Nombre de requêtes SQL d'un appel (cache vidé, contenu en flux et actions après commit compris)"""
+        nom_url, _, methode = cle.partition(':')
+        client = self.clients[role]
+        url = reverse(nom_url, args=arguments)
+        if methode == 'post':
+            envoyer = client.post
+        else:
+            envoyer = client.get
+            # Premier appel : caches du processus (ContentType, index plein texte...)
+            envoyer(url, parametres)
+        cache.clear()
+
+        # Les actions après commit (notifications, invalidations) sont comptées
+        with CaptureQueriesContext(connection) as requetes, self.captureOnCommitCallbacks(execute=True):
+            reponse = envoyer(url, parametres)
+            if reponse.streaming:
+                b''.join(reponse.streaming_content)
+
+        attendu = 302 if methode == 'post' else 200
+        self.assertEqual(reponse.status_code, attendu, f"{cle} : statut {reponse.status_code}")
+        if attendu == 302:
+            self.assertNotIn('?next=', reponse.url, f"{cle} : redirigé vers la connexion")
+        return len(requetes)
+
+    def test_budgets(self):
+        for cle, role, arguments, parametres in self.cas():
+            with self.subTest(vue=cle):
+                nombre = self.mesurer(cle, role, arguments, parametres)
+                self.assertLessEqual(
+                    nombre, BUDGETS[cle],
+                    f"{cle} : {nombre} requêtes SQL pour un budget de {BUDGETS[cle]}"
+                )
+
+    def test_toutes_les_urls_mesurees(self):
+        mesurees = {cle.partition(':')[0] for cle, *_ in self.cas()}
+        self.assertEqual({motif.name for motif in urlpatterns} - mesurees, set())
+        self.assertEqual(set(BUDGETS) - {cle for cle, *_ in self.cas()}, set())
+
+
+class BudgetRequetesPetiteBaseTest(BudgetRequetesMixin, TestCase):
+    TAILLE = dict(batiments=2, salles=4, etudiants=3, professeurs=2, administrateurs=1, reservations=60)
+    NOTIFICATIONS = 3
+
+
+class BudgetRequetesGrandeBaseTest(BudgetRequetesMixin, TestCase):
+    TAILLE = dict(batiments=5, salles=40, etudiants=30, professeurs=10, administrateurs=2, reservations=3000)
+    NOTIFICATIONS = 60
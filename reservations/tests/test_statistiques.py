@@ -0,0 +1,67 @@
+"""
+Tests des statistiques du tableau de bord : une agrégation, mise en cache
+par utilisateur et invalidée par les écritures
+"""
+from datetime import date, time, timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+
+from reservations.models import Utilisateur, Salle, Reservation
+from reservations.statistiques import statistiques_utilisateur
+
+
+class StatistiquesUtilisateurTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salle = Salle.objects.create(nom='TD 1', batiment='A', capacite=30, type_salle='td')
+        cls.etudiant = Utilisateur.objects.create_user('etudiant', type_utilisateur='etudiant', niveau='L1')
+        cls.autre = Utilisateur.objects.create_user('autre', type_utilisateur='etudiant', niveau='L1')
+        cls.jour = date.today() + timedelta(days=1)
+
+    def setUp(self):
+        cache.clear()
+
+    def reserver(self, heure, utilisateur=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Reservation.objects.create(
+                utilisateur=utilisateur or self.etudiant, salle=self.salle, date_reservation=self.jour,
+                heure_debut=time(heure), heure_fin=time(heure + 1), motif='Révisions', nombre_participants=1,
+            )
+
+    def test_compteurs_et_prochaines(self):
+        for heure in (8, 10, 12):
+            self.reserver(heure)
+        Reservation.objects.filter(heure_debut=time(8)).update(statut='confirmee')
+
+        with self.assertNumQueries(2):
+            statistiques = statistiques_utilisateur(self.etudiant)
+        self.assertEqual(
+            (statistiques['total_reservations'], statistiques['en_attente'], statistiques['confirmees']),
+            (3, 2, 1)
+        )
+        self.assertEqual([r.heure_debut for r in statistiques['prochaines']], [time(8)])
+
+    def test_cache_par_utilisateur(self):
+        self.reserver(8)
+        statistiques_utilisateur(self.etudiant)
+        with self.assertNumQueries(0):
+            self.assertEqual(statistiques_utilisateur(self.etudiant)['total_reservations'], 1)
+
+        # Une réservation d'un autre utilisateur ne touche pas cette entrée
+        self.reserver(10, self.autre)
+        with self.assertNumQueries(0):
+            statistiques_utilisateur(self.etudiant)
+
+    def test_invalidation_par_les_ecritures(self):
+        reservation = self.reserver(8)
+        statistiques_utilisateur(self.etudiant)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.annuler()
+        self.assertEqual(statistiques_utilisateur(self.etudiant)['en_attente'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reservation.delete()
+        self.assertEqual(statistiques_utilisateur(self.etudiant)['total_reservations'], 0)
@@ -0,0 +1,184 @@
+"""
+Tests des validations et refus groupés : requêtes et effets de bord
+(agrégat journalier, compteurs, notifications, index d'occupation)
+"""
+from datetime import date, time, timedelta
+from unittest import mock
+
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from reservations.compteurs import lire_compteurs, recalculer_compteurs
+from reservations.models import (
+    Utilisateur, Salle, Reservation, Notification, StatistiqueJournaliere, OccupationJournaliere,
+    VerrouCreneau,
+)
+from reservations.notifications import recalculer_non_lues
+from reservations.occupation import reconstruire
+from reservations.rapports import recalculer_statistiques
+from reservations.transitions import valider_reservations, refuser_reservations
+
+
+# Requêtes SQL d'une validation groupée : seuls les découpages en lots de
+# bulk_create font varier ce nombre avec la taille du lot
+REQUETES_MAX = 30
+
+
+def agregat():
+    """Lignes non vides de l'agrégat journalier"""
+    return set(
+        StatistiqueJournaliere.objects.filter(nombre__gt=0)
+        .values_list('date', 'salle_id', 'statut', 'type_utilisateur', 'nombre', 'minutes')
+    )
+
+
+class TransitionsGroupeesTest(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.salles = Salle.objects.bulk_create(
+            Salle(nom=f'TD {numero}', batiment='A', capacite=30, type_salle='td') for numero in range(20)
+        )
+        cls.etudiants = [
+            Utilisateur.objects.create_user(f'etudiant{numero}', type_utilisateur='etudiant', niveau='L1')
+            for numero in range(7)
+        ]
+        cls.premier_jour = date.today() + timedelta(days=1)
+
+    def creer_en_attente(self, nombre, decalage=0):
+        """
+        Réservations en attente sans chevauchement, de durées variées, créées
+        en lot puis reprises dans l'agrégat, les compteurs et l'index
+        """
+        reservations = Reservation.objects.bulk_create(
+            Reservation(
+                utilisateur=self.etudiants[indice % len(self.etudiants)],
+                type_utilisateur='etudiant',
+                salle=self.salles[indice % len(self.salles)],
+                date_reservation=self.premier_jour + timedelta(days=decalage + indice // 200),
+                heure_debut=time(8 + indice // 20 % 10),
+                heure_fin=time(8 + indice // 20 % 10, 30 + indice % 4 * 7),
+                motif='Lot',
+                nombre_participants=1,
+                statut='en_attente',
+            )
+            for indice in range(nombre)
+        )
+        recalculer_statistiques()
+        recalculer_compteurs()
+        reconstruire()
+        return [reservation.pk for reservation in reservations]
+
+    def verifier_effets_de_bord(self):
+        # L'agrégat tenu en lot est celui qu'on recalculerait depuis les réservations
+        tenu = agregat()
+        recalculer_statistiques()
+        self.assertEqual(tenu, agregat())
+
+        self.assertEqual(
+            lire_compteurs()['reservations_en_attente'],
+            Reservation.objects.filter(statut='en_attente').count()
+        )
+        for etudiant in Utilisateur.objects.filter(pk__in=[e.pk for e in self.etudiants]):
+            self.assertEqual(
+                etudiant.notifications_non_lues,
+                Notification.objects.filter(utilisateur=etudiant, est_lue=False).count()
+            )
+
+    def annulation_concurrente(self, pk):
+        """
+        Fait annuler une réservation par son auteur juste avant la pose des
+        verrous du lot, comme une requête concurrente qui passerait avant
+        """
+        verrouiller = VerrouCreneau.verrouiller_couples
+
+        def annuler_puis_verrouiller(couples):
+            if not Reservation.objects.filter(pk=pk, statut='annulee').exists():
+                Reservation.objects.get(pk=pk).annuler()
+            return verrouiller(couples)
+
+        return mock.patch.object(VerrouCreneau, 'verrouiller_couples', side_effect=annuler_puis_verrouiller)
+
+    def test_nombre_de_requetes_independant_du_lot(self):
+        for nombre, decalage in ((10, 0), (500, 10)):
+            with self.subTest(reservations=nombre):
+                ids = self.creer_en_attente(nombre, decalage)
+                with CaptureQueriesContext(connection) as requetes:
+                    validees, rejets = valider_reservations(ids)
+                self.assertEqual((len(validees), rejets), (nombre, {}))
+                self.assertLessEqual(len(requetes), REQUETES_MAX)
+
+    def test_validation_effets_de_bord(self):
+        ids = self.creer_en_attente(300)
+        recalculer_non_lues()
+
+        validees, _ = valider_reservations(ids)
+
+        self.assertEqual(Reservation.objects.filter(pk__in=ids, statut='confirmee').count(), 300)
+        self.assertEqual(Notification.objects.filter(reservation_id__in=ids).count(), 300)
+        self.verifier_effets_de_bord()
+
+    def test_refus_effets_de_bord(self):
+        ids = self.creer_en_attente(40)
+        self.assertTrue(OccupationJournaliere.objects.filter(date=self.premier_jour).exists())
+
+        refusees = refuser_reservations(ids)
+
+        self.assertEqual(len(refusees), 40)
+        self.assertEqual(Reservation.objects.filter(pk__in=ids, statut='refusee').count(), 40)
+        # Les réservations refusées libèrent les salles
+        self.assertFalse(OccupationJournaliere.objects.filter(date=self.premier_jour).exists())
+        self.verifier_effets_de_bord()
+
+    def test_annulation_pendant_le_traitement(self):
+        for action, statut, decalage in ((valider_reservations, 'confirmee', 0), (refuser_reservations, 'refusee', 5)):
+            with self.subTest(statut=statut):
+                ids = self.creer_en_attente(5, decalage)
+                recalculer_non_lues()
+
+                with self.annulation_concurrente(ids[0]):
+                    resultat = action(ids)
+
+                traitees = resultat[0] if statut == 'confirmee' else resultat
+                self.assertEqual(sorted(reservation.pk for reservation in traitees), ids[1:])
+                self.assertEqual(Reservation.objects.get(pk=ids[0]).statut, 'annulee')
+                self.assertEqual(Reservation.objects.filter(pk__in=ids, statut=statut).count(), 4)
+                self.assertEqual(Notification.objects.filter(reservation_id__in=ids).count(), 4)
+                self.verifier_effets_de_bord()
+
+    def test_conflit_dans_le_lot(self):
+        salle = self.salles[0]
+        premiere, seconde = Reservation.objects.bulk_create(
+            Reservation(
+                utilisateur=etudiant, type_utilisateur='etudiant', salle=salle, date_reservation=self.premier_jour,
+                heure_debut=time(10), heure_fin=time(11, 30), motif='Lot', nombre_participants=1,
+                statut='en_attente',
+            )
+            for etudiant in self.etudiants[:2]
+        )
+        recalculer_statistiques()
+
+        validees, rejets = valider_reservations([premiere.pk, seconde.pk])
+
+        self.assertEqual([reservation.pk for reservation in validees], [premiere.pk])
+        self.assertEqual([reservation.pk for reservation in rejets], [seconde.pk])
+        seconde.refresh_from_db()
+        self.assertEqual(seconde.statut, 'en_attente')
+
+    def test_refus_d_une_reservation_deja_traitee(self):
+        ids = self.creer_en_attente(1)
+        refuser_reservations(ids)
+        self.assertEqual(refuser_reservations(ids), [])
+
+    def test_vue_refus_d_une_reservation_deja_traitee(self):
+        ids = self.creer_en_attente(1)
+        administrateur = Utilisateur.objects.create_user('admin', type_utilisateur='administrateur')
+        self.client.force_login(administrateur)
+        url = reverse('refuser_reservation', args=ids)
+
+        for attendu in ('Réservation refusée', "Réservation non refusée : elle n'est plus en attente"):
+            reponse = self.client.post(url, follow=True)
+            self.assertEqual([str(message) for message in get_messages(reponse.wsgi_request)], [attendu])
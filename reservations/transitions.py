@@ -0,0 +1,166 @@
+"""
+Changements de statut groupés (validation / refus de réservations en attente)
+"""
+from collections import defaultdict
+from datetime import date
+
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Reservation, EvenementReservation, VerrouCreneau
+from .notifications import construire_notification, creer_notifications
+from .rapports import ajuster_statistiques, deltas_reservations
+from .statistiques import invalider_statistiques
+from .occupation import reconstruire_jours
+from . import compteurs
+
+
+def _appliquer_statut(reservations, statut, verrouilles):
+    """
+    Passe des réservations en attente au statut donné, avec leurs effets de bord
+
+    Un UPDATE pour les statuts, un bulk_create pour les notifications, un
+    ajustement groupé des compteurs et de l'agrégat journalier : les signaux
+    post_save ne sont pas déclenchés, ce sont ces mêmes effets qui sont
+    appliqués en lot.
+
+    Args:
+        reservations: Réservations lues par _selection_verrouillee, dans la
+            même transaction : toutes en attente, et le restent jusqu'au commit
+        verrouilles: Couples (salle_id, date) verrouillés par l'appelant
+    """
+    if not reservations:
+        return
+
+    # Lignes verrouillées et en attente : l'UPDATE modifie exactement la
+    # liste, sur laquelle les effets de bord sont calculés
+    Reservation.objects.filter(
+        pk__in=[reservation.pk for reservation in reservations],
+        statut='en_attente'
+    ).update(statut=statut, updated_at=timezone.now())
+
+    deltas = deltas_reservations(reservations, signe=-1)
+    for reservation in reservations:
+        reservation.statut = statut
+        reservation._memoriser_origine()
+    # Les clés de départ (en_attente) et d'arrivée diffèrent toujours
+    deltas.update(deltas_reservations(reservations))
+    ajuster_statistiques(deltas)
+
+    compteurs.incrementer('reservations_en_attente', -len(reservations))
+
+    if statut not in Reservation.STATUTS_ACTIFS:
+        reconstruire_jours(
+            {(r.salle_id, r.date_reservation) for r in reservations}, verrouilles=verrouilles
+        )
+
+    creer_notifications([
+        construire_notification(EvenementReservation(
+            reservation=reservation,
+            utilisateur_id=reservation.utilisateur_id,
+            type_evenement='modification',
+            statut=statut
+        ))
+        for reservation in reservations
+    ])
+
+    utilisateur_ids = [reservation.utilisateur_id for reservation in reservations]
+    transaction.on_commit(lambda: invalider_statistiques(*utilisateur_ids))
+
+
+def _reservations_en_attente(ids):
+    return (
+        Reservation.objects.filter(pk__in=ids, statut='en_attente')
+        .select_related('salle', 'utilisateur')
+        .order_by('created_at', 'pk')
+    )
+
+
+def _selection_verrouillee(ids):
+    """
+    Réservations en attente parmi ids, verrouillées pour la transaction
+
+    Les couples (salle, date) sont verrouillés comme pour une réservation
+    individuelle (annulation, modification), puis les réservations sont
+    relues ligne par ligne sous verrou (SELECT ... FOR UPDATE là où la base
+    le permet) : une réservation annulée, validée ou refusée entre-temps par
+    une autre transaction n'est plus sélectionnée, et aucune ne peut changer
+    avant le commit.
+
+    Returns:
+        tuple: (réservations, couples verrouillés)
+    """
+    selection = list(_reservations_en_attente(ids))
+    couples = {(reservation.salle_id, reservation.date_reservation) for reservation in selection}
+    VerrouCreneau.verrouiller_couples(couples)
+    selection = list(
+        _reservations_en_attente([reservation.pk for reservation in selection]).select_for_update(of=('self',))
+    )
+    return selection, couples
+
+
+def valider_reservations(ids):
+    """
+    Valide un lot de réservations en attente
+
+    Une seule passe de conflits : toutes les réservations actives des couples
+    (salle, date) concernés sont lues en une requête, puis chaque réservation
+    de la sélection (par ordre de création) est comparée aux autres
+    réservations actives et aux réservations déjà acceptées du lot. Les
+    réservations en conflit ou passées restent en attente et sont signalées.
+
+    Args:
+        ids: Identifiants des réservations à valider
+
+    Returns:
+        tuple: (réservations validées, {réservation: motif du rejet})
+    """
+    with transaction.atomic():
+        selection, verrouilles = _selection_verrouillee(ids)
+        ids_selection = {reservation.pk for reservation in selection}
+
+        occupes = defaultdict(list)
+        if selection:
+            autres = Reservation.objects.actives().filter(
+                salle_id__in={reservation.salle_id for reservation in selection},
+                date_reservation__in={reservation.date_reservation for reservation in selection}
+            ).exclude(pk__in=ids_selection).values_list(
+                'salle_id', 'date_reservation', 'heure_debut', 'heure_fin'
+            )
+            for salle_id, jour, debut, fin in autres:
+                occupes[(salle_id, jour)].append((debut, fin))
+
+        acceptees = []
+        rejets = {}
+        aujourd_hui = date.today()
+        for reservation in selection:
+            if reservation.date_reservation < aujourd_hui:
+                rejets[reservation] = "La date ne peut pas être dans le passé"
+                continue
+            creneaux = occupes[(reservation.salle_id, reservation.date_reservation)]
+            if any(debut < reservation.heure_fin and fin > reservation.heure_debut for debut, fin in creneaux):
+                rejets[reservation] = "La salle n'est pas disponible pour ce créneau"
+                continue
+            creneaux.append((reservation.heure_debut, reservation.heure_fin))
+            acceptees.append(reservation)
+
+        _appliquer_statut(acceptees, 'confirmee', verrouilles)
+
+    return acceptees, rejets
+
+
+def refuser_reservations(ids):
+    """
+    Refuse un lot de réservations en attente
+
+    Sous les mêmes verrous que la validation : deux refus du même lot, ou un
+    refus et une annulation simultanés, ne comptent et ne notifient qu'une fois.
+
+    Returns:
+        list: Réservations refusées
+    """
+    with transaction.atomic():
+        selection, verrouilles = _selection_verrouillee(ids)
+        _appliquer_statut(selection, 'refusee', verrouilles)
+
+    return selection
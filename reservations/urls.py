@@ -1,42 +1,58 @@
-"""
-URLs pour l'application reservations
-"""
-from django.urls import path
-from . import views
-
-urlpatterns = [
-    # Authentification
-    path('', views.login_view, name='login'),
-    path('inscription/', views.inscription_view, name='inscription'),
-    path('logout/', views.logout_view, name='logout'),
-    
-    # Dashboard
-    path('dashboard/', views.dashboard, name='dashboard'),
-    
-    # Salles
-    path('salles/', views.liste_salles, name='liste_salles'),
-    path('salles/<int:pk>/', views.detail_salle, name='detail_salle'),
-    path('salles/recherche/', views.rechercher_salles, name='rechercher_salles'),
-    
-    # Réservations
-    path('reservations/creer/', views.creer_reservation, name='creer_reservation'),
-    path('reservations/creer/<int:salle_id>/', views.creer_reservation, name='creer_reservation_salle'),
-    path('reservations/mes-reservations/', views.mes_reservations, name='mes_reservations'),
-    path('reservations/<int:pk>/', views.detail_reservation, name='detail_reservation'),
-    path('reservations/<int:pk>/annuler/', views.annuler_reservation, name='annuler_reservation'),
-    
-    # Notifications
-    path('notifications/', views.liste_notifications, name='liste_notifications'),
-    path('notifications/<int:pk>/lire/', views.marquer_notification_lue, name='marquer_notification_lue'),
-    path('notifications/toutes-lues/', views.marquer_toutes_lues, name='marquer_toutes_lues'),
-    
-    # Administration
-    path('admin-panel/', views.admin_dashboard, name='admin_dashboard'),
-    path('admin-panel/salles/', views.gestion_salles, name='gestion_salles'),
-    path('admin-panel/salles/creer/', views.creer_salle, name='creer_salle'),
-    path('admin-panel/validation/', views.validation_reservations, name='validation_reservations'),
-    path('admin-panel/reservations/<int:pk>/valider/', views.valider_reservation, name='valider_reservation'),
-    path('admin-panel/reservations/<int:pk>/refuser/', views.refuser_reservation, name='refuser_reservation'),
-    path('admin-panel/rapports/generer/', views.generer_rapport, name='generer_rapport'),
-    path('admin-panel/rapports/<int:pk>/', views.detail_rapport, name='detail_rapport'),
+"""
+URLs pour l'application reservations
+"""
+from django.urls import path
+from . import views, api, calendrier
+
+urlpatterns = [
+    # Authentification
+    path('', views.login_view, name='login'),
+    path('inscription/', views.inscription_view, name='inscription'),
+    path('logout/', views.logout_view, name='logout'),
+    
+    # Dashboard
+    path('dashboard/', views.dashboard, name='dashboard'),
+    
+    # Salles
+    path('salles/', views.liste_salles, name='liste_salles'),
+    path('salles/<int:pk>/', views.detail_salle, name='detail_salle'),
+    path('salles/<int:pk>/calendrier.ics', calendrier.calendrier_salle, name='calendrier_salle'),
+    path('salles/recherche/', views.rechercher_salles, name='rechercher_salles'),
+    path('salles/creneaux/', views.creneaux_libres, name='creneaux_libres'),
+    
+    # Recherche plein texte
+    path('recherche/', views.recherche_globale, name='recherche_globale'),
+    
+    # Réservations
+    path('reservations/creer/', views.creer_reservation, name='creer_reservation'),
+    path('reservations/creer/<int:salle_id>/', views.creer_reservation, name='creer_reservation_salle'),
+    path('reservations/serie/creer/', views.creer_serie_reservations, name='creer_serie_reservations'),
+    path('reservations/mes-reservations/', views.mes_reservations, name='mes_reservations'),
+    path('utilisateurs/<int:pk>/calendrier.ics', calendrier.calendrier_utilisateur, name='calendrier_utilisateur'),
+    path('reservations/<int:pk>/', views.detail_reservation, name='detail_reservation'),
+    path('reservations/<int:pk>/annuler/', views.annuler_reservation, name='annuler_reservation'),
+    
+    # Notifications
+    path('notifications/', views.liste_notifications, name='liste_notifications'),
+    path('notifications/<int:pk>/lire/', views.marquer_notification_lue, name='marquer_notification_lue'),
+    path('notifications/toutes-lues/', views.marquer_toutes_lues, name='marquer_toutes_lues'),
+    
+    # API JSON (lecture seule)
+    path('api/salles/', api.api_salles, name='api_salles'),
+    path('api/salles/<int:pk>/disponibilites/', api.api_disponibilites_salle, name='api_disponibilites_salle'),
+    path('api/recherche/', api.api_recherche, name='api_recherche'),
+    
+    # Administration
+    path('admin-panel/', views.admin_dashboard, name='admin_dashboard'),
+    path('admin-panel/salles/', views.gestion_salles, name='gestion_salles'),
+    path('admin-panel/salles/creer/', views.creer_salle, name='creer_salle'),
+    path('admin-panel/validation/', views.validation_reservations, name='validation_reservations'),
+    path('admin-panel/validation/lot/', views.traiter_lot_reservations, name='traiter_lot_reservations'),
+    path('admin-panel/reservations/<int:pk>/valider/', views.valider_reservation, name='valider_reservation'),
+    path('admin-panel/reservations/<int:pk>/refuser/', views.refuser_reservation, name='refuser_reservation'),
+    path('admin-panel/rapports/generer/', views.generer_rapport, name='generer_rapport'),
+    path('admin-panel/rapports/<int:pk>/', views.detail_rapport, name='detail_rapport'),
+    path('admin-panel/rapports/<int:pk>/csv/', views.exporter_rapport, name='exporter_rapport'),
+    path('admin-panel/exports/reservations/', views.exporter_reservations, name='exporter_reservations'),
+    path('admin-panel/profilage/', views.rapport_profilage, name='rapport_profilage'),
 ]
\ No newline at end of file
@@ -1,500 +1,675 @@
-"""
-Views Django pour le système de réservation de salles
-Utilise les templates Django au lieu d'une API REST
-"""
-from django.shortcuts import render, redirect, get_object_or_404
-from django.contrib.auth import login, logout, authenticate
-from django.contrib.auth.decorators import login_required, user_passes_test
-from django.contrib import messages
-from django.db.models import Q, Count
-from django.utils import timezone
-from django.http import JsonResponse
-from datetime import date, datetime, timedelta
-
-from .models import Utilisateur, Salle, Reservation, Notification, Rapport
-from .forms import (
-    LoginForm, InscriptionForm, ReservationForm, SalleForm,
-    RechercheForm, RapportForm
-)
-
-
-# ==================== AUTHENTIFICATION ====================
-
-def login_view(request):
-    """Page de connexion"""
-    if request.user.is_authenticated:
-        return redirect('dashboard')
-    
-    if request.method == 'POST':
-        form = LoginForm(request.POST)
-        if form.is_valid():
-            username = form.cleaned_data['username']
-            password = form.cleaned_data['password']
-            user = authenticate(request, username=username, password=password)
-            
-            if user is not None:
-                login(request, user)
-                messages.success(request, f'Bienvenue {user.get_full_name()} !')
-                return redirect('dashboard')
-            else:
-                messages.error(request, 'Identifiants incorrects')
-    else:
-        form = LoginForm()
-    
-    return render(request, 'reservations/login.html', {'form': form})
-
-
-def inscription_view(request):
-    """Page d'inscription"""
-    if request.user.is_authenticated:
-        return redirect('dashboard')
-    
-    if request.method == 'POST':
-        form = InscriptionForm(request.POST)
-        if form.is_valid():
-            user = form.save()
-            messages.success(request, 'Inscription réussie ! Vous pouvez maintenant vous connecter.')
-            return redirect('login')
-    else:
-        form = InscriptionForm()
-    
-    return render(request, 'reservations/inscription.html', {'form': form})
-
-
-@login_required
-def logout_view(request):
-    """Déconnexion"""
-    logout(request)
-    messages.info(request, 'Vous êtes déconnecté')
-    return redirect('login')
-
-
-# ==================== DASHBOARD ====================
-
-@login_required
-def dashboard(request):
-    """Tableau de bord principal"""
-    user = request.user
-    
-    # Statistiques utilisateur
-    mes_reservations = Reservation.objects.filter(utilisateur=user)
-    total_reservations = mes_reservations.count()
-    en_attente = mes_reservations.filter(statut='en_attente').count()
-    confirmees = mes_reservations.filter(statut='confirmee').count()
-    
-    # Prochaines réservations
-    today = date.today()
-    prochaines = mes_reservations.filter(
-        date_reservation__gte=today,
-        statut='confirmee'
-    ).order_by('date_reservation', 'heure_debut')[:5]
-    
-    # Notifications non lues
-    notifications_count = Notification.objects.filter(
-        utilisateur=user,
-        est_lue=False
-    ).count()
-    
-    context = {
-        'total_reservations': total_reservations,
-        'en_attente': en_attente,
-        'confirmees': confirmees,
-        'prochaines': prochaines,
-        'notifications_count': notifications_count,
-    }
-    
-    return render(request, 'reservations/dashboard.html', context)
-
-
-# ==================== SALLES ====================
-
-@login_required
-def liste_salles(request):
-    """Liste de toutes les salles"""
-    salles = Salle.objects.filter(est_disponible=True).order_by('batiment', 'nom')
-    
-    # Filtres
-    batiment = request.GET.get('batiment')
-    type_salle = request.GET.get('type_salle')
-    
-    if batiment:
-        salles = salles.filter(batiment=batiment)
-    if type_salle:
-        salles = salles.filter(type_salle=type_salle)
-    
-    # Pour les filtres
-    batiments = Salle.objects.values_list('batiment', flat=True).distinct()
-    types = Salle.objects.values_list('type_salle', flat=True).distinct()
-    
-    context = {
-        'salles': salles,
-        'batiments': batiments,
-        'types': types,
-    }
-    
-    return render(request, 'reservations/salles/liste.html', context)
-
-
-@login_required
-def detail_salle(request, pk):
-    """Détail d'une salle"""
-    salle = get_object_or_404(Salle, pk=pk)
-    
-    # Réservations de la salle (futures)
-    today = date.today()
-    reservations = salle.reservations.filter(
-        date_reservation__gte=today,
-        statut__in=['confirmee', 'en_attente']
-    ).order_by('date_reservation', 'heure_debut')
-    
-    context = {
-        'salle': salle,
-        'reservations': reservations,
-    }
-    
-    return render(request, 'reservations/salles/detail.html', context)
-
-
-@login_required
-def rechercher_salles(request):
-    """Recherche de salles disponibles"""
-    form = RechercheForm(request.GET or None)
-    salles_disponibles = []
-    
-    if form.is_valid():
-        date_recherche = form.cleaned_data['date_reservation']
-        heure_debut = form.cleaned_data['heure_debut']
-        heure_fin = form.cleaned_data['heure_fin']
-        capacite_min = form.cleaned_data.get('capacite_min')
-        type_salle = form.cleaned_data.get('type_salle')
-        batiment = form.cleaned_data.get('batiment')
-        
-        # Rechercher les salles
-        salles = Salle.objects.filter(est_disponible=True)
-        
-        if capacite_min:
-            salles = salles.filter(capacite__gte=capacite_min)
-        if type_salle:
-            salles = salles.filter(type_salle=type_salle)
-        if batiment:
-            salles = salles.filter(batiment=batiment)
-        
-        # Vérifier la disponibilité
-        for salle in salles:
-            if salle.verifier_disponibilite(date_recherche, heure_debut, heure_fin):
-                salles_disponibles.append(salle)
-    
-    context = {
-        'form': form,
-        'salles': salles_disponibles,
-    }
-    
-    return render(request, 'reservations/salles/recherche.html', context)
-
-
-# ==================== RÉSERVATIONS ====================
-
-@login_required
-def creer_reservation(request, salle_id=None):
-    """Créer une nouvelle réservation"""
-    salle = None
-    if salle_id:
-        salle = get_object_or_404(Salle, pk=salle_id)
-    
-    if request.method == 'POST':
-        form = ReservationForm(request.POST, user=request.user, salle=salle)
-        if form.is_valid():
-            reservation = form.save(commit=False)
-            reservation.utilisateur = request.user
-            
-            try:
-                reservation.save()
-                messages.success(
-                    request,
-                    f'Réservation créée avec succès ! Statut: {reservation.get_statut_display()}'
-                )
-                return redirect('mes_reservations')
-            except Exception as e:
-                messages.error(request, f'Erreur: {str(e)}')
-    else:
-        initial = {}
-        if salle:
-            initial['salle'] = salle
-        form = ReservationForm(initial=initial, user=request.user, salle=salle)
-    
-    context = {
-        'form': form,
-        'salle': salle,
-    }
-    
-    return render(request, 'reservations/reservations/creer.html', context)
-
-
-@login_required
-def mes_reservations(request):
-    """Liste des réservations de l'utilisateur"""
-    statut_filtre = request.GET.get('statut')
-    
-    reservations = Reservation.objects.filter(
-        utilisateur=request.user
-    ).select_related('salle').order_by('-date_reservation', '-heure_debut')
-    
-    if statut_filtre:
-        reservations = reservations.filter(statut=statut_filtre)
-    
-    context = {
-        'reservations': reservations,
-        'statut_filtre': statut_filtre,
-    }
-    
-    return render(request, 'reservations/reservations/mes_reservations.html', context)
-
-
-@login_required
-def detail_reservation(request, pk):
-    """Détail d'une réservation"""
-    reservation = get_object_or_404(Reservation, pk=pk)
-    
-    # Vérifier les droits
-    if reservation.utilisateur != request.user and not request.user.is_staff:
-        messages.error(request, 'Vous n\'avez pas accès à cette réservation')
-        return redirect('mes_reservations')
-    
-    context = {
-        'reservation': reservation,
-    }
-    
-    return render(request, 'reservations/reservations/detail.html', context)
-
-
-@login_required
-def annuler_reservation(request, pk):
-    """Annuler une réservation"""
-    reservation = get_object_or_404(Reservation, pk=pk)
-    
-    # Vérifier les droits
-    if reservation.utilisateur != request.user and not request.user.is_staff:
-        messages.error(request, 'Vous ne pouvez pas annuler cette réservation')
-        return redirect('mes_reservations')
-    
-    # Vérifier le délai
-    if not reservation.peut_etre_modifiee():
-        messages.error(request, 'Impossible d\'annuler une réservation moins de 2h avant')
-        return redirect('detail_reservation', pk=pk)
-    
-    if request.method == 'POST':
-        reservation.annuler()
-        messages.success(request, 'Réservation annulée avec succès')
-        return redirect('mes_reservations')
-    
-    context = {
-        'reservation': reservation,
-    }
-    
-    return render(request, 'reservations/reservations/annuler.html', context)
-
-
-# ==================== NOTIFICATIONS ====================
-
-@login_required
-def liste_notifications(request):
-    """Liste des notifications de l'utilisateur"""
-    notifications = Notification.objects.filter(
-        utilisateur=request.user
-    ).order_by('-created_at')
-    
-    context = {
-        'notifications': notifications,
-    }
-    
-    return render(request, 'reservations/notifications/liste.html', context)
-
-
-@login_required
-def marquer_notification_lue(request, pk):
-    """Marquer une notification comme lue"""
-    notification = get_object_or_404(Notification, pk=pk, utilisateur=request.user)
-    notification.marquer_comme_lue()
-    
-    return redirect('liste_notifications')
-
-
-@login_required
-def marquer_toutes_lues(request):
-    """Marquer toutes les notifications comme lues"""
-    Notification.objects.filter(
-        utilisateur=request.user,
-        est_lue=False
-    ).update(est_lue=True)
-    
-    messages.success(request, 'Toutes les notifications ont été marquées comme lues')
-    return redirect('liste_notifications')
-
-
-# ==================== ADMIN ====================
-
-def est_administrateur(user):
-    """Vérifie si l'utilisateur est administrateur"""
-    return user.is_staff or user.type_utilisateur == 'administrateur'
-
-
-@login_required
-@user_passes_test(est_administrateur)
-def admin_dashboard(request):
-    """Dashboard administrateur"""
-    # Statistiques globales
-    total_reservations = Reservation.objects.count()
-    en_attente = Reservation.objects.filter(statut='en_attente').count()
-    total_salles = Salle.objects.count()
-    total_utilisateurs = Utilisateur.objects.filter(is_active=True).count()
-    
-    # Réservations en attente
-    reservations_attente = Reservation.objects.filter(
-        statut='en_attente'
-    ).select_related('utilisateur', 'salle').order_by('date_reservation')[:10]
-    
-    context = {
-        'total_reservations': total_reservations,
-        'en_attente': en_attente,
-        'total_salles': total_salles,
-        'total_utilisateurs': total_utilisateurs,
-        'reservations_attente': reservations_attente,
-    }
-    
-    return render(request, 'reservations/admin/dashboard.html', context)
-
-
-@login_required
-@user_passes_test(est_administrateur)
-def gestion_salles(request):
-    """Gestion des salles (admin)"""
-    salles = Salle.objects.all().order_by('batiment', 'nom')
-    
-    context = {
-        'salles': salles,
-    }
-    
-    return render(request, 'reservations/admin/salles.html', context)
-
-
-@login_required
-@user_passes_test(est_administrateur)
-def creer_salle(request):
-    """Créer une nouvelle salle (admin)"""
-    if request.method == 'POST':
-        form = SalleForm(request.POST)
-        if form.is_valid():
-            salle = form.save()
-            messages.success(request, f'Salle {salle.nom} créée avec succès')
-            return redirect('gestion_salles')
-    else:
-        form = SalleForm()
-    
-    context = {
-        'form': form,
-    }
-    
-    return render(request, 'reservations/admin/creer_salle.html', context)
-
-
-@login_required
-@user_passes_test(est_administrateur)
-def validation_reservations(request):
-    """Validation des réservations en attente (admin)"""
-    reservations = Reservation.objects.filter(
-        statut='en_attente'
-    ).select_related('utilisateur', 'salle').order_by('date_reservation')
-    
-    context = {
-        'reservations': reservations,
-    }
-    
-    return render(request, 'reservations/admin/validation.html', context)
-
-
-@login_required
-@user_passes_test(est_administrateur)
-def valider_reservation(request, pk):
-    """Valider une réservation (admin)"""
-    reservation = get_object_or_404(Reservation, pk=pk)
-    
-    if request.method == 'POST':
-        reservation.valider()
-        messages.success(request, 'Réservation validée')
-        return redirect('validation_reservations')
-    
-    return redirect('validation_reservations')
-
-
-@login_required
-@user_passes_test(est_administrateur)
-def refuser_reservation(request, pk):
-    """Refuser une réservation (admin)"""
-    reservation = get_object_or_404(Reservation, pk=pk)
-    
-    if request.method == 'POST':
-        reservation.refuser()
-        messages.warning(request, 'Réservation refusée')
-        return redirect('validation_reservations')
-    
-    return redirect('validation_reservations')
-
-
-@login_required
-@user_passes_test(est_administrateur)
-def generer_rapport(request):
-    """Générer un rapport statistique (admin)"""
-    if request.method == 'POST':
-        form = RapportForm(request.POST)
-        if form.is_valid():
-            date_debut = form.cleaned_data['date_debut']
-            date_fin = form.cleaned_data['date_fin']
-            
-            # Calculer les statistiques
-            from django.db.models import Count, Sum
-            
-            reservations = Reservation.objects.filter(
-                date_reservation__gte=date_debut,
-                date_reservation__lte=date_fin
-            )
-            
-            donnees = {
-                'total_reservations': reservations.count(),
-                'par_statut': dict(reservations.values('statut').annotate(count=Count('id')).values_list('statut', 'count')),
-                'par_type_utilisateur': dict(reservations.values('utilisateur__type_utilisateur').annotate(count=Count('id')).values_list('utilisateur__type_utilisateur', 'count')),
-                'salles_populaires': list(reservations.values('salle__nom').annotate(count=Count('id')).order_by('-count')[:10].values_list('salle__nom', 'count')),
-            }
-            
-            # Créer le rapport
-            rapport = Rapport.objects.create(
-                administrateur=request.user,
-                titre=f"Rapport du {date_debut} au {date_fin}",
-                type_rapport='utilisation',
-                date_debut=date_debut,
-                date_fin=date_fin,
-                donnees=donnees
-            )
-            
-            messages.success(request, 'Rapport généré avec succès')
-            return redirect('detail_rapport', pk=rapport.pk)
-    else:
-        form = RapportForm()
-    
-    context = {
-        'form': form,
-    }
-    
-    return render(request, 'reservations/admin/generer_rapport.html', context)
-
-
-@login_required
-@user_passes_test(est_administrateur)
-def detail_rapport(request, pk):
-    """Détail d'un rapport (admin)"""
-    rapport = get_object_or_404(Rapport, pk=pk)
-    
-    context = {
-        'rapport': rapport,
-    }
-    
-    return render(request, 'reservations/admin/detail_rapport.html', context)
\ No newline at end of file
+"""
+Views Django pour le système de réservation de salles
+Utilise les templates Django au lieu d'une API REST
+"""
+from django.shortcuts import render, redirect, get_object_or_404
+from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth.decorators import login_required, user_passes_test
+from django.conf import settings
+from django.contrib import messages
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q, Count, Sum
+from django.utils import timezone
+from django.utils.functional import SimpleLazyObject
+from django.http import JsonResponse
+from datetime import date, datetime, timedelta
+
+from .models import Utilisateur, Salle, Reservation, Notification, Rapport
+from .forms import (
+    LoginForm, InscriptionForm, ReservationForm, SalleForm,
+    SerieReservationForm, RechercheForm, CreneauxLibresForm, RapportForm,
+    ExportReservationsForm
+)
+from .recurrence import creer_serie
+from .statistiques import statistiques_utilisateur
+from .compteurs import lire_compteurs
+from .rapports import donnees_utilisation, donnees_occupation
+from .transitions import valider_reservations, refuser_reservations
+from .pagination import paginer, est_fragment
+from .calendrier import url_abonnement
+from .catalogue import version_salles, facettes_salles, DUREE_FRAGMENTS
+from .exports import reponse_csv, reservations_filtrees, lignes_reservations, lignes_rapport
+from .recherche import rechercher_salles as rechercher_salles_texte, rechercher_reservations
+from . import profilage
+
+
+# ==================== AUTHENTIFICATION ====================
+
+def login_view(request):
+    """Page de connexion"""
+    if request.user.is_authenticated:
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        form = LoginForm(request.POST)
+        if form.is_valid():
+            username = form.cleaned_data['username']
+            password = form.cleaned_data['password']
+            user = authenticate(request, username=username, password=password)
+            
+            if user is not None:
+                login(request, user)
+                messages.success(request, f'Bienvenue {user.get_full_name()} !')
+                return redirect('dashboard')
+            else:
+                messages.error(request, 'Identifiants incorrects')
+    else:
+        form = LoginForm()
+    
+    return render(request, 'reservations/login.html', {'form': form})
+
+
+def inscription_view(request):
+    """Page d'inscription"""
+    if request.user.is_authenticated:
+        return redirect('dashboard')
+    
+    if request.method == 'POST':
+        form = InscriptionForm(request.POST)
+        if form.is_valid():
+            user = form.save()
+            messages.success(request, 'Inscription réussie ! Vous pouvez maintenant vous connecter.')
+            return redirect('login')
+    else:
+        form = InscriptionForm()
+    
+    return render(request, 'reservations/inscription.html', {'form': form})
+
+
+@login_required
+def logout_view(request):
+    """Déconnexion"""
+    logout(request)
+    messages.info(request, 'Vous êtes déconnecté')
+    return redirect('login')
+
+
+# ==================== DASHBOARD ====================
+
+@login_required
+def dashboard(request):
+    """Tableau de bord principal"""
+    user = request.user
+    
+    # Statistiques utilisateur et prochaines réservations (en cache)
+    statistiques = statistiques_utilisateur(user)
+    
+    # Notifications non lues : compteur dénormalisé, déjà chargé avec l'utilisateur
+    notifications_count = user.notifications_non_lues
+    
+    context = {
+        'total_reservations': statistiques['total_reservations'],
+        'en_attente': statistiques['en_attente'],
+        'confirmees': statistiques['confirmees'],
+        'prochaines': statistiques['prochaines'],
+        'notifications_count': notifications_count,
+    }
+    
+    return render(request, 'reservations/dashboard.html', context)
+
+
+# ==================== SALLES ====================
+
+@login_required
+def liste_salles(request):
+    """Liste de toutes les salles"""
+    salles = Salle.objects.filter(est_disponible=True).order_by('batiment', 'nom')
+    
+    # Filtres
+    batiment = request.GET.get('batiment')
+    type_salle = request.GET.get('type_salle')
+    equipements = request.GET.getlist('equipements')
+    
+    if batiment:
+        salles = salles.filter(batiment=batiment)
+    if type_salle:
+        salles = salles.filter(type_salle=type_salle)
+    if equipements:
+        salles = salles.avec_equipements(equipements)
+    
+    context = {
+        # Évaluée seulement si les cartes ne sont pas en cache
+        'salles': salles,
+        # Pour les filtres, avec le nombre de salles disponibles
+        'facettes': facettes_salles(),
+        'equipements': Salle.EQUIPEMENT_CHOICES,
+        'equipements_choisis': equipements,
+        'version_salles': version_salles(),
+        'duree_fragments': DUREE_FRAGMENTS,
+    }
+    
+    return render(request, 'reservations/salles/liste.html', context)
+
+
+@login_required
+def detail_salle(request, pk):
+    """Détail d'une salle"""
+    salle = get_object_or_404(Salle, pk=pk)
+    
+    # Réservations de la salle (futures)
+    today = date.today()
+    reservations = salle.reservations.filter(
+        date_reservation__gte=today,
+        statut__in=['confirmee', 'en_attente']
+    ).select_related('utilisateur')
+    page = paginer(request, reservations, ['date_reservation', 'heure_debut'], taille=5)
+    
+    context = {
+        'salle': salle,
+        'reservations': page.elements,
+        'page': page,
+    }
+    
+    if est_fragment(request):
+        return render(request, 'reservations/partials/reservations_salle.html', context)
+    context['url_calendrier'] = url_abonnement(request, 'calendrier_salle', salle.pk)
+    return render(request, 'reservations/salles/detail.html', context)
+
+
+@login_required
+def rechercher_salles(request):
+    """Recherche de salles disponibles"""
+    form = RechercheForm(request.GET or None)
+    salles_disponibles = []
+    
+    if form.is_valid():
+        # Masques d'occupation du jour + une requête : filtres + exclusion des conflits
+        salles_disponibles = list(form.salles_disponibles())
+    
+    context = {
+        'form': form,
+        'salles': salles_disponibles,
+    }
+    
+    return render(request, 'reservations/salles/recherche.html', context)
+
+
+@login_required
+def creneaux_libres(request):
+    """Créneaux libres de toutes les salles sur une période"""
+    form = CreneauxLibresForm(request.GET or None)
+    resultats = None
+    
+    if form.is_valid():
+        resultats = form.creneaux_libres()
+    
+    context = {
+        'form': form,
+        'resultats': resultats,
+    }
+    
+    return render(request, 'reservations/salles/creneaux.html', context)
+
+
+# ==================== RECHERCHE ====================
+
+@login_required
+def recherche_globale(request):
+    """Recherche plein texte dans les salles et les motifs de réservation"""
+    texte = request.GET.get('q', '').strip()
+    salles = []
+    reservations = []
+    
+    if texte:
+        salles = rechercher_salles_texte(texte)
+        # Un administrateur cherche dans toutes les réservations, les autres dans les leurs
+        reservations = rechercher_reservations(
+            texte, utilisateur=None if est_administrateur(request.user) else request.user
+        )
+    
+    context = {
+        'texte': texte,
+        'salles': salles,
+        'reservations': reservations,
+    }
+    
+    return render(request, 'reservations/recherche.html', context)
+
+
+# ==================== RÉSERVATIONS ====================
+
+@login_required
+def creer_reservation(request, salle_id=None):
+    """Créer une nouvelle réservation"""
+    salle = None
+    if salle_id:
+        salle = get_object_or_404(Salle, pk=salle_id)
+    
+    if request.method == 'POST':
+        form = ReservationForm(request.POST, user=request.user, salle=salle)
+        if form.is_valid():
+            reservation = form.save(commit=False)
+            reservation.utilisateur = request.user
+            
+            try:
+                reservation.save()
+                messages.success(
+                    request,
+                    f'Réservation créée avec succès ! Statut: {reservation.get_statut_display()}'
+                )
+                return redirect('mes_reservations')
+            except ValidationError as e:
+                # Conflit détecté sous verrou (réservation concurrente)
+                form.add_error(None, e.messages)
+    else:
+        initial = {}
+        if salle:
+            initial['salle'] = salle
+        form = ReservationForm(initial=initial, user=request.user, salle=salle)
+    
+    context = {
+        'form': form,
+        'salle': salle,
+    }
+    
+    return render(request, 'reservations/reservations/creer.html', context)
+
+
+@login_required
+def creer_serie_reservations(request):
+    """Créer une série de réservations récurrentes"""
+    if request.method == 'POST':
+        form = SerieReservationForm(request.POST, user=request.user)
+        if form.is_valid():
+            try:
+                reservations, conflits = creer_serie(
+                    form.instance,
+                    ignorer_conflits=form.cleaned_data['ignorer_conflits']
+                )
+                messages.success(
+                    request,
+                    f'{len(reservations)} réservation(s) créée(s) avec succès !'
+                )
+                if conflits:
+                    messages.warning(
+                        request,
+                        'Dates ignorées (salle déjà réservée) : ' + ', '.join(
+                            jour.strftime('%d/%m/%Y') for jour in sorted(conflits)
+                        )
+                    )
+                return redirect('mes_reservations')
+            except ValidationError as e:
+                form.add_error(None, e.messages)
+    else:
+        form = SerieReservationForm(user=request.user)
+    
+    context = {
+        'form': form,
+    }
+    
+    return render(request, 'reservations/reservations/serie.html', context)
+
+
+@login_required
+def mes_reservations(request):
+    """Liste des réservations de l'utilisateur"""
+    statut_filtre = request.GET.get('statut')
+    
+    reservations = Reservation.objects.filter(
+        utilisateur=request.user
+    ).select_related('salle')
+    
+    if statut_filtre:
+        reservations = reservations.filter(statut=statut_filtre)
+    
+    page = paginer(request, reservations, ['-date_reservation', '-heure_debut'])
+    
+    context = {
+        'reservations': page.elements,
+        'page': page,
+        'statut_filtre': statut_filtre,
+    }
+    
+    if est_fragment(request):
+        return render(request, 'reservations/partials/mes_reservations.html', context)
+    context['url_calendrier'] = url_abonnement(request, 'calendrier_utilisateur', request.user.pk)
+    return render(request, 'reservations/reservations/mes_reservations.html', context)
+
+
+@login_required
+def detail_reservation(request, pk):
+    """Détail d'une réservation"""
+    reservation = get_object_or_404(Reservation, pk=pk)
+    
+    # Vérifier les droits
+    if reservation.utilisateur != request.user and not request.user.is_staff:
+        messages.error(request, 'Vous n\'avez pas accès à cette réservation')
+        return redirect('mes_reservations')
+    
+    context = {
+        'reservation': reservation,
+    }
+    
+    return render(request, 'reservations/reservations/detail.html', context)
+
+
+@login_required
+def annuler_reservation(request, pk):
+    """Annuler une réservation"""
+    reservation = get_object_or_404(Reservation, pk=pk)
+    
+    # Vérifier les droits
+    if reservation.utilisateur != request.user and not request.user.is_staff:
+        messages.error(request, 'Vous ne pouvez pas annuler cette réservation')
+        return redirect('mes_reservations')
+    
+    # Vérifier le délai
+    if not reservation.peut_etre_modifiee():
+        messages.error(request, 'Impossible d\'annuler une réservation moins de 2h avant')
+        return redirect('detail_reservation', pk=pk)
+    
+    if request.method == 'POST':
+        reservation.annuler()
+        messages.success(request, 'Réservation annulée avec succès')
+        return redirect('mes_reservations')
+    
+    context = {
+        'reservation': reservation,
+    }
+    
+    return render(request, 'reservations/reservations/annuler.html', context)
+
+
+# ==================== NOTIFICATIONS ====================
+
+@login_required
+def liste_notifications(request):
+    """Liste des notifications de l'utilisateur"""
+    notifications = Notification.objects.filter(
+        utilisateur=request.user
+    ).select_related('reservation')
+    page = paginer(request, notifications, ['-created_at'])
+    
+    context = {
+        'notifications': page.elements,
+        'page': page,
+    }
+    
+    if est_fragment(request):
+        return render(request, 'reservations/partials/notifications.html', context)
+    context['total_notifications'] = Notification.objects.filter(utilisateur=request.user).count()
+    return render(request, 'reservations/notifications/liste.html', context)
+
+
+@login_required
+def marquer_notification_lue(request, pk):
+    """Marquer une notification comme lue"""
+    notification = get_object_or_404(Notification, pk=pk, utilisateur=request.user)
+    notification.marquer_comme_lue()
+    
+    return redirect('liste_notifications')
+
+
+@login_required
+def marquer_toutes_lues(request):
+    """Marquer toutes les notifications comme lues"""
+    with transaction.atomic():
+        Notification.objects.filter(
+            utilisateur=request.user,
+            est_lue=False
+        ).update(est_lue=True)
+        Utilisateur.objects.filter(pk=request.user.pk).update(notifications_non_lues=0)
+    
+    messages.success(request, 'Toutes les notifications ont été marquées comme lues')
+    return redirect('liste_notifications')
+
+
+# ==================== ADMIN ====================
+
+def est_administrateur(user):
+    """Vérifie si l'utilisateur est administrateur"""
+    return user.is_staff or user.type_utilisateur == 'administrateur'
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def admin_dashboard(request):
+    """Dashboard administrateur"""
+    # Statistiques globales (compteurs maintenus par les signaux)
+    valeurs = lire_compteurs()
+    total_reservations = valeurs['reservations']
+    en_attente = valeurs['reservations_en_attente']
+    total_salles = valeurs['salles']
+    total_utilisateurs = valeurs['utilisateurs_actifs']
+    
+    # Réservations en attente
+    reservations_attente = Reservation.objects.filter(
+        statut='en_attente'
+    ).select_related('utilisateur', 'salle').order_by('date_reservation')[:10]
+    
+    context = {
+        'total_reservations': total_reservations,
+        'en_attente': en_attente,
+        'total_salles': total_salles,
+        'total_utilisateurs': total_utilisateurs,
+        'reservations_attente': reservations_attente,
+    }
+    
+    return render(request, 'reservations/admin/dashboard.html', context)
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def gestion_salles(request):
+    """Gestion des salles (admin)"""
+    def statistiques():
+        stats = Salle.objects.aggregate(
+            total=Count('id'),
+            disponibles=Count('id', filter=Q(est_disponible=True)),
+            capacite_totale=Sum('capacite'),
+        )
+        stats['hors_service'] = stats['total'] - stats['disponibles']
+        return stats
+    
+    # Page et statistiques lues seulement si leurs fragments ne sont pas en
+    # cache (clés : version du catalogue et curseur brut)
+    context = {
+        'page': SimpleLazyObject(lambda: paginer(request, Salle.objects.all(), ['batiment', 'nom'])),
+        'version_salles': version_salles(),
+        'duree_fragments': DUREE_FRAGMENTS,
+    }
+    
+    if est_fragment(request):
+        return render(request, 'reservations/partials/salles.html', context)
+    context['stats'] = SimpleLazyObject(statistiques)
+    return render(request, 'reservations/admin/salles.html', context)
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def creer_salle(request):
+    """Créer une nouvelle salle (admin)"""
+    if request.method == 'POST':
+        form = SalleForm(request.POST)
+        if form.is_valid():
+            salle = form.save()
+            messages.success(request, f'Salle {salle.nom} créée avec succès')
+            return redirect('gestion_salles')
+    else:
+        form = SalleForm()
+    
+    context = {
+        'form': form,
+    }
+    
+    return render(request, 'reservations/admin/creer_salle.html', context)
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def validation_reservations(request):
+    """Validation des réservations en attente (admin)"""
+    reservations = Reservation.objects.filter(
+        statut='en_attente'
+    ).select_related('utilisateur', 'salle')
+    page = paginer(request, reservations, ['date_reservation', 'heure_debut'])
+    
+    context = {
+        'reservations': page.elements,
+        'page': page,
+    }
+    
+    if est_fragment(request):
+        return render(request, 'reservations/partials/validation.html', context)
+    context['total_en_attente'] = reservations.count()
+    return render(request, 'reservations/admin/validation.html', context)
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def valider_reservation(request, pk):
+    """Valider une réservation (admin)"""
+    reservation = get_object_or_404(Reservation, pk=pk)
+    
+    if request.method == 'POST':
+        validees, rejets = valider_reservations([reservation.pk])
+        if validees:
+            messages.success(request, 'Réservation validée')
+        for motif in rejets.values():
+            messages.error(request, f'Réservation non validée : {motif}')
+        return redirect('validation_reservations')
+    
+    return redirect('validation_reservations')
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def refuser_reservation(request, pk):
+    """Refuser une réservation (admin)"""
+    reservation = get_object_or_404(Reservation, pk=pk)
+    
+    if request.method == 'POST':
+        if refuser_reservations([reservation.pk]):
+            messages.warning(request, 'Réservation refusée')
+        else:
+            messages.error(request, "Réservation non refusée : elle n'est plus en attente")
+        return redirect('validation_reservations')
+    
+    return redirect('validation_reservations')
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def traiter_lot_reservations(request):
+    """Valider ou refuser un lot de réservations en attente (admin)"""
+    if request.method == 'POST':
+        ids = [pk for pk in request.POST.getlist('reservations') if pk.isdigit()]
+        if not ids:
+            messages.warning(request, 'Aucune réservation sélectionnée')
+        elif request.POST.get('action') == 'refuser':
+            refusees = refuser_reservations(ids)
+            messages.warning(request, f'{len(refusees)} réservation(s) refusée(s)')
+        else:
+            validees, rejets = valider_reservations(ids)
+            messages.success(request, f'{len(validees)} réservation(s) validée(s)')
+            for reservation, motif in rejets.items():
+                messages.error(
+                    request,
+                    f'{reservation.salle.nom} le {reservation.date_reservation:%d/%m/%Y} '
+                    f'({reservation.heure_debut:%H:%M}-{reservation.heure_fin:%H:%M}) : {motif}'
+                )
+    
+    return redirect('validation_reservations')
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def generer_rapport(request):
+    """Générer un rapport statistique (admin)"""
+    if request.method == 'POST':
+        form = RapportForm(request.POST)
+        if form.is_valid():
+            date_debut = form.cleaned_data['date_debut']
+            date_fin = form.cleaned_data['date_fin']
+            
+            type_rapport = form.cleaned_data['type_rapport']
+            
+            # Calculer les statistiques une fois pour toutes : detail_rapport
+            # ne fait qu'afficher Rapport.donnees
+            if type_rapport == 'occupation':
+                donnees = donnees_occupation(date_debut, date_fin)
+                titre = f"Occupation du {date_debut} au {date_fin}"
+            else:
+                donnees = donnees_utilisation(date_debut, date_fin)
+                titre = f"Rapport du {date_debut} au {date_fin}"
+            
+            # Créer le rapport
+            rapport = Rapport.objects.create(
+                administrateur=request.user,
+                titre=titre,
+                type_rapport=type_rapport,
+                date_debut=date_debut,
+                date_fin=date_fin,
+                donnees=donnees
+            )
+            
+            messages.success(request, 'Rapport généré avec succès')
+            return redirect('detail_rapport', pk=rapport.pk)
+    else:
+        form = RapportForm()
+    
+    context = {
+        'form': form,
+    }
+    
+    return render(request, 'reservations/admin/generer_rapport.html', context)
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def detail_rapport(request, pk):
+    """Détail d'un rapport (admin)"""
+    rapport = get_object_or_404(Rapport, pk=pk)
+    
+    context = {
+        'rapport': rapport,
+    }
+    
+    return render(request, 'reservations/admin/detail_rapport.html', context)
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def exporter_reservations(request):
+    """Export CSV des réservations filtrées (admin)"""
+    form = ExportReservationsForm(request.GET or None)
+    
+    if form.is_valid():
+        reservations = reservations_filtrees(**form.cleaned_data)
+        return reponse_csv(
+            lignes_reservations(reservations),
+            f"reservations-{date.today():%Y%m%d}.csv"
+        )
+    
+    context = {
+        'form': form,
+    }
+    
+    return render(request, 'reservations/admin/exporter_reservations.html', context)
+
+
+@login_required
+@user_passes_test(est_administrateur)
+def exporter_rapport(request, pk):
+    """Export CSV des données d'un rapport (admin)"""
+    rapport = get_object_or_404(Rapport, pk=pk)
+    return reponse_csv(lignes_rapport(rapport), f"rapport-{rapport.pk}.csv")
+
+
+@login_required
+@user_passes_test(lambda user: user.is_staff)
+def rapport_profilage(request):
+    """Percentiles de durée et de requêtes SQL par vue (staff, profilage actif)"""
+    if request.method == 'POST':
+        profilage.registre.vider()
+        messages.success(request, 'Mesures de profilage effacées')
+        return redirect('rapport_profilage')
+    
+    context = {
+        'actif': settings.PROFILAGE_ACTIF,
+        'taille': settings.PROFILAGE_TAILLE,
+        'vues': profilage.registre.rapport(),
+    }
+    
+    return render(request, 'reservations/admin/profilage.html', context)
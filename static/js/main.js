@@ -1,113 +1,149 @@
-// Scripts JavaScript pour le système de réservation
-
-document.addEventListener('DOMContentLoaded', function() {
-    // Auto-dismiss alerts après 5 secondes
-    const alerts = document.querySelectorAll('.alert:not(.alert-permanent)');
-    alerts.forEach(function(alert) {
-        setTimeout(function() {
-            const bsAlert = new bootstrap.Alert(alert);
-            bsAlert.close();
-        }, 5000);
-    });
-
-    // Confirmation pour les actions de suppression/annulation
-    const deleteButtons = document.querySelectorAll('[data-confirm]');
-    deleteButtons.forEach(function(button) {
-        button.addEventListener('click', function(e) {
-            const message = this.getAttribute('data-confirm');
-            if (!confirm(message)) {
-                e.preventDefault();
-            }
-        });
-    });
-
-    // Animation fade-in pour les éléments
-    const fadeElements = document.querySelectorAll('.fade-in');
-    fadeElements.forEach(function(element) {
-        element.style.opacity = '0';
-        setTimeout(function() {
-            element.style.transition = 'opacity 0.3s ease-in';
-            element.style.opacity = '1';
-        }, 100);
-    });
-
-    // Validation des formulaires
-    const forms = document.querySelectorAll('.needs-validation');
-    forms.forEach(function(form) {
-        form.addEventListener('submit', function(event) {
-            if (!form.checkValidity()) {
-                event.preventDefault();
-                event.stopPropagation();
-            }
-            form.classList.add('was-validated');
-        }, false);
-    });
-
-    // Date minimale = aujourd'hui pour les champs de date
-    const dateInputs = document.querySelectorAll('input[type="date"]');
-    const today = new Date().toISOString().split('T')[0];
-    dateInputs.forEach(function(input) {
-        if (!input.hasAttribute('min')) {
-            input.setAttribute('min', today);
-        }
-    });
-
-    // Toggle password visibility
-    const togglePasswordButtons = document.querySelectorAll('.toggle-password');
-    togglePasswordButtons.forEach(function(button) {
-        button.addEventListener('click', function() {
-            const input = document.querySelector(this.getAttribute('data-target'));
-            if (input.type === 'password') {
-                input.type = 'text';
-                this.innerHTML = '<i class="bi bi-eye-slash"></i>';
-            } else {
-                input.type = 'password';
-                this.innerHTML = '<i class="bi bi-eye"></i>';
-            }
-        });
-    });
-
-    // Tooltips Bootstrap
-    const tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
-    tooltipTriggerList.map(function(tooltipTriggerEl) {
-        return new bootstrap.Tooltip(tooltipTriggerEl);
-    });
-
-    // Popovers Bootstrap
-    const popoverTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="popover"]'));
-    popoverTriggerList.map(function(popoverTriggerEl) {
-        return new bootstrap.Popover(popoverTriggerEl);
-    });
-});
-
-// Fonction pour formater les dates
-function formatDate(dateString) {
-    const date = new Date(dateString);
-    const options = { year: 'numeric', month: 'long', day: 'numeric' };
-    return date.toLocaleDateString('fr-FR', options);
-}
-
-// Fonction pour formater les heures
-function formatTime(timeString) {
-    return timeString.substring(0, 5); // HH:MM
-}
-
-// Fonction pour copier du texte dans le presse-papiers
-function copyToClipboard(text) {
-    navigator.clipboard.writeText(text).then(function() {
-        alert('Copié dans le presse-papiers !');
-    }, function(err) {
-        console.error('Erreur lors de la copie:', err);
-    });
-}
-
-// Fonction pour afficher/masquer des éléments
-function toggleElement(elementId) {
-    const element = document.getElementById(elementId);
-    if (element) {
-        element.classList.toggle('d-none');
-    }
-}
-
-// Log pour debug
+// Scripts JavaScript pour le système de réservation
+
+document.addEventListener('DOMContentLoaded', function() {
+    // Auto-dismiss alerts après 5 secondes
+    const alerts = document.querySelectorAll('.alert:not(.alert-permanent)');
+    alerts.forEach(function(alert) {
+        setTimeout(function() {
+            const bsAlert = new bootstrap.Alert(alert);
+            bsAlert.close();
+        }, 5000);
+    });
+
+    // Confirmation pour les actions de suppression/annulation
+    const deleteButtons = document.querySelectorAll('[data-confirm]');
+    deleteButtons.forEach(function(button) {
+        button.addEventListener('click', function(e) {
+            const message = this.getAttribute('data-confirm');
+            if (!confirm(message)) {
+                e.preventDefault();
+            }
+        });
+    });
+
+    // Animation fade-in pour les éléments
+    const fadeElements = document.querySelectorAll('.fade-in');
+    fadeElements.forEach(function(element) {
+        element.style.opacity = '0';
+        setTimeout(function() {
+            element.style.transition = 'opacity 0.3s ease-in';
+            element.style.opacity = '1';
+        }, 100);
+    });
+
+    // Validation des formulaires
+    const forms = document.querySelectorAll('.needs-validation');
+    forms.forEach(function(form) {
+        form.addEventListener('submit', function(event) {
+            if (!form.checkValidity()) {
+                event.preventDefault();
+                event.stopPropagation();
+            }
+            form.classList.add('was-validated');
+        }, false);
+    });
+
+    // Date minimale = aujourd'hui pour les champs de date
+    const dateInputs = document.querySelectorAll('input[type="date"]');
+    const today = new Date().toISOString().split('T')[0];
+    dateInputs.forEach(function(input) {
+        if (!input.hasAttribute('min')) {
+            input.setAttribute('min', today);
+        }
+    });
+
+    // Toggle password visibility
+    const togglePasswordButtons = document.querySelectorAll('.toggle-password');
+    togglePasswordButtons.forEach(function(button) {
+        button.addEventListener('click', function() {
+            const input = document.querySelector(this.getAttribute('data-target'));
+            if (input.type === 'password') {
+                input.type = 'text';
+                this.innerHTML = '<i class="bi bi-eye-slash"></i>';
+            } else {
+                input.type = 'password';
+                this.innerHTML = '<i class="bi bi-eye"></i>';
+            }
+        });
+    });
+
+    // Tooltips Bootstrap
+    const tooltipTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="tooltip"]'));
+    tooltipTriggerList.map(function(tooltipTriggerEl) {
+        return new bootstrap.Tooltip(tooltipTriggerEl);
+    });
+
+    // Popovers Bootstrap
+    const popoverTriggerList = [].slice.call(document.querySelectorAll('[data-bs-toggle="popover"]'));
+    popoverTriggerList.map(function(popoverTriggerEl) {
+        return new bootstrap.Popover(popoverTriggerEl);
+    });
+});
+
+// « Charger plus » : ajoute la page suivante d'une liste à la place du bouton
+document.addEventListener('click', function(e) {
+    const lien = e.target.closest('[data-charger-plus]');
+    if (!lien) {
+        return;
+    }
+    e.preventDefault();
+    const conteneur = lien.closest('.charger-plus');
+    const url = new URL(lien.href, window.location.href);
+    url.searchParams.set('fragment', '1');
+    lien.classList.add('disabled');
+    fetch(url, { headers: { 'X-Requested-With': 'XMLHttpRequest' } })
+        .then(function(reponse) {
+            if (!reponse.ok) {
+                throw new Error(reponse.status);
+            }
+            return reponse.text();
+        })
+        .then(function(html) {
+            conteneur.insertAdjacentHTML('beforebegin', html);
+            conteneur.remove();
+        })
+        .catch(function() {
+            window.location.href = lien.href;
+        });
+});
+
+// Modale de suppression partagée : affiche le nom de la salle du bouton qui l'ouvre
+document.addEventListener('show.bs.modal', function(e) {
+    const bouton = e.relatedTarget;
+    const nom = e.target.querySelector('[data-nom-salle]');
+    if (bouton && nom && bouton.hasAttribute('data-salle-nom')) {
+        nom.textContent = bouton.getAttribute('data-salle-nom');
+    }
+});
+
+// Fonction pour formater les dates
+function formatDate(dateString) {
+    const date = new Date(dateString);
+    const options = { year: 'numeric', month: 'long', day: 'numeric' };
+    return date.toLocaleDateString('fr-FR', options);
+}
+
+// Fonction pour formater les heures
+function formatTime(timeString) {
+    return timeString.substring(0, 5); // HH:MM
+}
+
+// Fonction pour copier du texte dans le presse-papiers
+function copyToClipboard(text) {
+    navigator.clipboard.writeText(text).then(function() {
+        alert('Copié dans le presse-papiers !');
+    }, function(err) {
+        console.error('Erreur lors de la copie:', err);
+    });
+}
+
+// Fonction pour afficher/masquer des éléments
+function toggleElement(elementId) {
+    const element = document.getElementById(elementId);
+    if (element) {
+        element.classList.toggle('d-none');
+    }
+}
+
+// Log pour debug
 console.log('Scripts du système de réservation chargés');
\ No newline at end of file